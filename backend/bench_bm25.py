@@ -0,0 +1,94 @@
+"""Benchmark: BM25 query latency vs corpus size, persistent index vs InMemoryBM25Retriever.
+
+The corpus is synthetic Zipf-distributed text, so common terms have long
+posting lists and rare terms short ones, as in real chunks. The index is
+built in batches (one segment each, merged as it grows) in a temp directory.
+
+Usage:
+    python bench_bm25.py                                  # 10k and 100k chunks
+    python bench_bm25.py --sizes 10000 100000 1000000 --baseline-max 0
+"""
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+sys.path.insert(0, '.')
+
+import numpy as np
+from haystack import Document
+from haystack.document_stores.in_memory import InMemoryDocumentStore
+
+from services.bm25_index import BM25DocumentStore
+
+
+def make_documents(n: int, vocab: int, words: int, seed: int = 7) -> list:
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.2, size=(n, words)), vocab) - 1
+    return [Document(id=f"chunk-{i}", content=" ".join(f"t{t}" for t in row)) for i, row in enumerate(ranks)]
+
+
+def make_queries(n: int, vocab: int, terms: int, seed: int = 11) -> list:
+    rng = np.random.default_rng(seed)
+    # Mid-frequency terms: neither stop-word-like nor unseen
+    picks = rng.integers(10, min(vocab, 5000), size=(n, terms))
+    return [" ".join(f"t{t}" for t in row) for row in picks]
+
+
+def time_queries(search, queries: list, k: int) -> dict:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": float(np.percentile(latencies, 50)), "p95_ms": float(np.percentile(latencies, 95))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--words", type=int, default=120, help="tokens per chunk")
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=5000, help="documents per write (segment)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--terms", type=int, default=3, help="terms per query")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--baseline-max", type=int, default=100000,
+                        help="largest corpus to also run InMemoryBM25Retriever on (0 disables)")
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries, args.vocab, args.terms)
+    print(f"BM25 benchmark: {args.words} tokens/chunk, {args.queries} × {args.terms}-term queries, top {args.k}")
+    print(f"{'chunks':>9} {'engine':>10} {'build s':>8} {'segments':>8} {'disk MB':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for size in args.sizes:
+        documents = make_documents(size, args.vocab, args.words)
+        directory = tempfile.mkdtemp(prefix="bench_bm25_")
+        try:
+            store = BM25DocumentStore("bench", directory=directory)
+            start = time.perf_counter()
+            for i in range(0, size, args.batch):
+                store.write_documents(documents[i:i + args.batch])
+            build_s = time.perf_counter() - start
+            # Reopen so queries run against the memory-mapped files (a store
+            # still open on the directory would hand over its loaded index)
+            store = None
+            store = BM25DocumentStore("bench", directory=directory)
+            stats = store.stats()
+            result = time_queries(lambda q, k: store.bm25_retrieval(q, top_k=k), queries, args.k)
+            print(f"{size:>9} {'index':>10} {build_s:>8.1f} {stats['segments']:>8} {stats['disk_mb']:>8.1f} "
+                  f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        if size <= args.baseline_max:
+            baseline = InMemoryDocumentStore(bm25_algorithm="BM25Okapi")
+            start = time.perf_counter()
+            baseline.write_documents(documents)
+            build_s = time.perf_counter() - start
+            result = time_queries(lambda q, k: baseline.bm25_retrieval(q, top_k=k), queries[:10], args.k)
+            print(f"{size:>9} {'in-memory':>10} {build_s:>8.1f} {'-':>8} {'-':>8} "
+                  f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark: recall@k and query latency per FAISS index type and search knob.
+
+Each index is built through TunedFAISSDocumentStore exactly as a deploy
+would (write in batches, then commit_index() trains IVF variants), and is
+searched with the efSearch / nprobe values of the tuning presets.
+
+Usage:
+    python bench_faiss.py                                 # 50k synthetic 384-d vectors
+    python bench_faiss.py --vectors 200000 --types hnsw ivf_pq
+"""
+import sys
+import time
+import argparse
+sys.path.insert(0, '.')
+
+import numpy as np
+from haystack import Document
+
+from services.faiss_store import TunedFAISSDocumentStore
+from services.tuning_presets import TUNING_PRESETS
+
+
+def make_vectors(n: int, dim: int, clusters: int, seed: int = 7) -> np.ndarray:
+    """Clustered Gaussian vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build(index_type: str, corpus: np.ndarray, batch: int) -> tuple:
+    store = TunedFAISSDocumentStore(spec=index_type)
+    start = time.perf_counter()
+    for i in range(0, len(corpus), batch):
+        store.write_documents([Document(id=str(j), content="", embedding=corpus[j].tolist())
+                               for j in range(i, min(i + batch, len(corpus)))])
+    store.commit_index()
+    return store, time.perf_counter() - start
+
+
+def run(store, queries: np.ndarray, truth: list, k: int) -> dict:
+    latencies, recall = [], 0.0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        hits = store.search(query.tolist(), top_k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recall += len({int(doc.id) for doc in hits} & expected) / k
+    return {
+        "recall": recall / len(queries),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=5000, help="documents per write")
+    parser.add_argument("--types", nargs="+", default=["flat", "hnsw", "ivf", "ivf_pq"])
+    args = parser.parse_args()
+
+    corpus = make_vectors(args.vectors, args.dim, args.clusters)
+    rng = np.random.default_rng(11)
+    queries = corpus[rng.integers(0, len(corpus), size=args.queries)]
+    queries = queries + 0.3 * rng.normal(size=queries.shape).astype(np.float32) / np.sqrt(args.dim)
+    truth = [set(np.argpartition(-(corpus @ q), args.k - 1)[:args.k].tolist()) for q in queries]
+
+    print(f"FAISS benchmark: {args.vectors} × {args.dim}-d vectors, {args.queries} queries, recall@{args.k}")
+    print(f"{'index':>16} {'preset':>14} {'build s':>8} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for index_type in args.types:
+        store, build_s = build(index_type, corpus, args.batch)
+        presets = TUNING_PRESETS.items() if index_type != "flat" else [("-", {})]
+        for name, preset in presets:
+            store.ef_search = preset.get("faissEfSearch", store.ef_search)
+            store.nprobe = preset.get("faissNprobe", store.nprobe)
+            store._apply_search_params()
+            result = run(store, queries, truth, args.k)
+            print(f"{store.index_string:>16} {name:>14} {build_s:>8.1f} {result['recall']:>7.3f} "
+                  f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark: MultiRetrieverAggregator latency per strategy and result-set size.
+
+Each retriever returns `size` candidates drawn from a shared pool, so sets
+overlap partially the way BM25 and dense results do in practice.
+
+Usage:
+    python bench_fusion.py                                  # 2 retrievers, 10 … 10000 candidates
+    python bench_fusion.py --retrievers 3 --sizes 100 1000 --top-k 20
+"""
+import sys
+import time
+import argparse
+sys.path.insert(0, '.')
+
+import numpy as np
+from haystack import Document
+
+from services.multi_retriever import MultiRetrieverAggregator, STRATEGIES
+
+
+def make_result_sets(size: int, retrievers: int, overlap: float, seed: int = 7) -> list:
+    """`retrievers` ranked lists of `size` documents; about `overlap` of each list is shared."""
+    rng = np.random.default_rng(seed)
+    pool = int(size / max(overlap, 1e-3))
+    result_sets = []
+    for _ in range(retrievers):
+        ids = rng.choice(pool, size=size, replace=False)
+        scores = np.sort(rng.random(size))[::-1]
+        result_sets.append([Document(id=f"doc-{i}", content=f"chunk {i}", score=float(s))
+                            for i, s in zip(ids, scores)])
+    return result_sets
+
+
+def run(strategy: str, result_sets: list, top_k: int, repeats: int) -> dict:
+    aggregator = MultiRetrieverAggregator(strategy=strategy, top_k=top_k)
+    aggregator.aggregate(result_sets)  # warm-up
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        aggregator.aggregate(result_sets)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="candidates per retriever")
+    parser.add_argument("--retrievers", type=int, default=2)
+    parser.add_argument("--overlap", type=float, default=0.5, help="expected shared fraction per list")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"Fusion benchmark: {args.retrievers} retrievers, top_k={args.top_k}, "
+          f"{args.repeats} runs per cell")
+    print(f"{'candidates':>10} {'strategy':>13} {'p50 ms':>9} {'p95 ms':>9}")
+    for size in args.sizes:
+        result_sets = make_result_sets(size, args.retrievers, args.overlap)
+        repeats = max(5, args.repeats * 100 // max(size, 100))
+        for strategy in STRATEGIES:
+            result = run(strategy, result_sets, args.top_k, repeats)
+            print(f"{size:>10} {strategy:>13} {result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: ingestion throughput (docs/sec) as the worker process count grows.
+
+Usage:
+    python bench_ingestion.py                       # 1, 2, 4, ... up to all cores
+    python bench_ingestion.py --docs 400 --workers 1 4 8 --model bge-local
+"""
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.insert(0, '.')
+
+from haystack import Document
+from haystack.document_stores.in_memory import InMemoryDocumentStore
+
+from services.embedding_service import get_document_embedder
+from services.ingestion import stream_ingest
+from services.ingestion_executor import IngestionExecutor
+
+WORDS = ("retrieval augmented generation pipeline vector store embedding chunk "
+         "document query answer context model latency throughput index search").split()
+
+
+def make_corpus(n_docs: int, words_per_doc: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        f"Source: bench://doc/{i}\n" + " ".join(rng.choice(WORDS) for _ in range(words_per_doc))
+        for i in range(n_docs)
+    ]
+
+
+def _warmup_docs() -> list:
+    return [Document(content="warm up") for _ in range(64)]
+
+
+def run(corpus: list, workers: int, model: str, chunk_size: int, batch_size: int) -> float:
+    executor = IngestionExecutor(workers, model) if workers > 1 else None
+    embedder = get_document_embedder(model)
+    try:
+        if executor:
+            # Warm the pool (spawn + model load) outside the timed region
+            executor.embed(_warmup_docs())
+        start = time.perf_counter()
+        stream_ingest(corpus, stores=[InMemoryDocumentStore()], embedder=embedder,
+                      chunk_size=chunk_size, batch_size=batch_size, executor=executor)
+        return len(corpus) / (time.perf_counter() - start)
+    finally:
+        if executor:
+            executor.shutdown()
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, *[2 ** i for i in range(1, 6) if 2 ** i <= cores], cores})
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--words", type=int, default=1500, help="words per document")
+    parser.add_argument("--chunk-size", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--model", default="bge-local")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs, args.words)
+    print(f"Ingestion benchmark: {args.docs} docs × {args.words} words, chunk={args.chunk_size}, "
+          f"model={args.model}, cores={cores}")
+    print(f"{'workers':>8} {'docs/sec':>10} {'speedup':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        rate = run(corpus, workers, args.model, args.chunk_size, args.batch_size)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: open time, RSS and query latency of the memory-mapped local store.
+
+Each collection is written in batches as a deploy would, then reopened in a
+fresh store object, so the open and the first queries run against the
+files (through the page cache) rather than anything kept from the build.
+
+Usage:
+    python bench_mmap_store.py                            # 100k and 500k 384-d chunks
+    python bench_mmap_store.py --sizes 1000000 --ann binary
+"""
+import sys
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+sys.path.insert(0, '.')
+
+import numpy as np
+from haystack import Document
+
+from services.mmap_store import MmapDocumentStore
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 500000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch", type=int, default=20000, help="documents per write")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ann", nargs="+", default=["none", "binary"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    queries = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+    print(f"Mmap store benchmark: {args.dim}-d vectors, {args.queries} queries, top {args.k}")
+    print(f"{'chunks':>9} {'ann':>7} {'build s':>8} {'open ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'peak RSS MB':>12}")
+    for size in args.sizes:
+        for ann in args.ann:
+            ann = None if ann == "none" else ann
+            directory = tempfile.mkdtemp(prefix="bench_mmap_")
+            try:
+                store = MmapDocumentStore("bench", directory=directory, ann=ann)
+                start = time.perf_counter()
+                for i in range(0, size, args.batch):
+                    block = rng.normal(size=(min(args.batch, size - i), args.dim)).astype(np.float32)
+                    store.write_documents([Document(id=str(i + j), content=f"chunk {i + j}", embedding=vector)
+                                           for j, vector in enumerate(block.tolist())])
+                build_s = time.perf_counter() - start
+                del store
+
+                start = time.perf_counter()
+                store = MmapDocumentStore("bench", directory=directory, ann=ann)
+                open_ms = (time.perf_counter() - start) * 1000
+                latencies = []
+                for query in queries:
+                    start = time.perf_counter()
+                    store.embedding_retrieval(query.tolist(), top_k=args.k)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                print(f"{size:>9} {ann or 'none':>7} {build_s:>8.1f} {open_ms:>8.2f} "
+                      f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} {rss_mb():>12.0f}")
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
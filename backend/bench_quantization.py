@@ -0,0 +1,93 @@
+"""Benchmark: vector memory, recall@k and query latency for each quantization mode.
+
+Memory is the in-RAM code size; "exact" rows also keep float32 vectors on
+disk and rescore rescore × k candidates from them.
+
+Usage:
+    python bench_quantization.py                          # 20k synthetic 384-d vectors
+    python bench_quantization.py --vectors 100000 --dim 768 --rescore 1 4 10
+"""
+import sys
+import time
+import argparse
+sys.path.insert(0, '.')
+
+import numpy as np
+
+from services.quantized_store import QuantizedVectorIndex
+
+
+def make_vectors(n: int, dim: int, clusters: int, seed: int = 7) -> np.ndarray:
+    """Clustered Gaussian vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    return centers[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+
+
+def make_queries(corpus: np.ndarray, n: int, noise: float, seed: int = 11) -> np.ndarray:
+    """Queries are perturbed corpus vectors, so each has a genuine nearest neighbourhood."""
+    rng = np.random.default_rng(seed)
+    picks = corpus[rng.integers(0, len(corpus), size=n)]
+    return picks + noise * rng.normal(size=picks.shape).astype(np.float32)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> list:
+    c = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = q @ c.T
+    return [set(np.argpartition(-row, k - 1)[:k].tolist()) for row in scores]
+
+
+def run(mode: str, rescore: int, exact: bool, corpus: np.ndarray, queries: np.ndarray, truth: list, k: int) -> dict:
+    index = QuantizedVectorIndex(mode, rescore_multiplier=rescore, exact_rescore=exact)
+    index.add([str(i) for i in range(len(corpus))], corpus)
+    latencies, recall = [], 0.0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        hits = index.search(query, top_k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recall += len({int(doc_id) for doc_id, _ in hits} & expected) / k
+    return {
+        "memory_mb": index.memory_bytes() / 1e6,
+        "recall": recall / len(queries),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.3, help="query perturbation")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, nargs="+", default=[1, 4, 10],
+                        help="binary rescore multipliers to try")
+    args = parser.parse_args()
+
+    corpus = make_vectors(args.vectors, args.dim, args.clusters)
+    queries = make_queries(corpus, args.queries, args.noise)
+    truth = exact_top_k(corpus, queries, args.k)
+
+    print(f"Quantization benchmark: {args.vectors} × {args.dim}-d vectors, "
+          f"{args.queries} queries, recall@{args.k}")
+    print(f"{'mode':>16} {'memory MB':>10} {'shrink':>7} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+
+    runs = [("float32", 1, False), ("float16", 1, False), ("int8", 1, False)]
+    runs += [("int8", r, True) for r in args.rescore]
+    runs += [("binary", r, exact) for exact in (False, True) for r in args.rescore]
+    baseline = None
+    for mode, rescore, exact in runs:
+        result = run(mode, rescore, exact, corpus, queries, truth, args.k)
+        baseline = baseline or result["memory_mb"]
+        label = f"{mode} {'exact' if exact else 'sign' if mode == 'binary' else ''} x{rescore}" \
+            if (exact or mode == "binary") else mode
+        print(f"{label:>16} {result['memory_mb']:>10.2f} {baseline / result['memory_mb']:>6.1f}x "
+              f"{result['recall']:>7.3f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ import os
 import logging
 from services.scraper import scrape_urls
 from services.rag_builder import deploy_rag_system
-from services.haystack_service import query_pipeline, get_pipeline_graph
+from services.haystack_service import query_pipeline, get_pipeline_graph, stop_pipeline
 from services.local_llm import chat as local_llm_chat, guide_chat as local_guide_chat, test_chat as local_test_chat, is_model_ready, get_model_info
 from services.llm_service import validate_api_key, list_available_models, detect_gpu_availability, validate_model_capabilities
 from services.tuning_presets import apply_tuning_preset, list_presets, get_rag_defaults
@@ -18,8 +18,16 @@ from services.security_middleware import SecurityMiddleware
 from services.observability_service import get_metrics, get_logs
 from services.deployment_manager import package_deployment
 from services.document_parser import parse_document, get_supported_extensions
+from services.ingestion_executor import get_ingestion_executor, resolve_workers, shutdown_executors
+from services.client_pool import get_client_pool
+from services.job_manager import (submit_job, get_job, cancel_job, list_jobs, collection_lock, is_deploying,
+                                  DeployInProgress, TERMINAL_STATES)
+from services.vector_store_manager import collection_key
+from services.corpus_store import get_corpus, corpus_exists
+from services.pipeline_restore import prewarm_pipelines, PREWARM_PIPELINES
 import requests
 import asyncio
+import json
 import uuid
 from contextlib import asynccontextmanager
 
@@ -115,9 +123,15 @@ async def lifespan(app: FastAPI):
     cleanup_task = asyncio.create_task(session_cleanup_loop())
     logger.info("🔁 Session cleanup background task started (every 30s)")
 
+    # Rebuild recently used pipelines in the background; the rest restore on first query
+    if PREWARM_PIPELINES > 0:
+        asyncio.create_task(asyncio.to_thread(prewarm_pipelines, PREWARM_PIPELINES))
+
     yield
 
     cleanup_task.cancel()
+    shutdown_executors()
+    get_client_pool().close_all()
 
 app = FastAPI(title="Agentic RAG Creator API", lifespan=lifespan)
 
@@ -152,6 +166,8 @@ class ChatRequest(BaseModel):
     pipeline_id: Optional[str] = None
     audio_base64: Optional[str] = None  # For Voice RAG pipeline
     llm_override: Optional[Dict[str, str]] = None  # {"model": "gpt-4o", "api_key": "sk-...", "base_url": "..."}
+    filters: Optional[Dict[str, Any]] = None  # Metadata filter, e.g. {"field": "meta.section", "operator": "==", "value": "/pricing"}
+    bypass_cache: bool = False  # Skip cached answers and run the pipeline
 
 class DeployRequest(BaseModel):
     ragName: str
@@ -221,17 +237,15 @@ async def api_ingest(req: IngestRequest):
         # Scrape
         texts = scrape_urls(req.urls, mode=req.mode)
         
-        # Save raw data
-        raw_file_path = os.path.join(base_dir, "scraped_data.txt")
-        with open(raw_file_path, "w", encoding="utf-8") as f:
-            for text in texts:
-                f.write(text + "\n\n" + "="*50 + "\n\n")
-                
+        # Scraped pages become the RAG's live corpus (replacing the previous set)
+        corpus_stats = get_corpus(req.ragName).replace_all(texts)
+
         logger.info(f"Ingested {len(req.urls)} URLs for RAG: {req.ragName}")
         return {
             "status": "success", 
             "message": f"Successfully ingested data for {req.ragName}",
             "texts_count": len(texts),
+            "corpus": corpus_stats,
             "data_dir": base_dir
         }
     except Exception as e:
@@ -255,16 +269,67 @@ async def api_upload(ragName: str = Form(...), file: UploadFile = File(...)):
         os.remove(temp_path)
         
         # Save parsed data alongside scraped data
-        raw_file_path = os.path.join(base_dir, "scraped_data.txt")
-        with open(raw_file_path, "a", encoding="utf-8") as f:
-             f.write(f"Source: {file.filename}\n{text}\n\n" + "="*50 + "\n\n")
+        added = get_corpus(ragName).add(f"Source: {file.filename}\n{text}")
 
-        return {"status": "success", "text": text}
+        return {"status": "success", "text": text, "duplicate": not added}
     except Exception as e:
         if temp_path and os.path.exists(temp_path):
             os.remove(temp_path)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/upload-batch")
+async def api_upload_batch(ragName: str = Form(...), files: List[UploadFile] = File(...)):
+    """Upload several files at once; parsing is spread across the ingestion worker pool."""
+    base_dir = os.path.join(os.path.dirname(__file__), "data", ragName)
+    os.makedirs(base_dir, exist_ok=True)
+    temp_paths = []
+    try:
+        for file in files:
+            temp_path = os.path.join(base_dir, f"temp_{uuid.uuid4().hex[:8]}_{file.filename}")
+            with open(temp_path, "wb") as buffer:
+                buffer.write(await file.read())
+            temp_paths.append(temp_path)
+
+        workers = resolve_workers()
+        if workers > 1 and len(temp_paths) > 1:
+            executor = get_ingestion_executor(workers)
+            try:
+                texts = await asyncio.to_thread(executor.parse, temp_paths)
+            finally:
+                executor.release()
+        else:
+            texts = await asyncio.to_thread(lambda: [parse_document(p) for p in temp_paths])
+
+        corpus_stats = get_corpus(ragName).add_many(
+            f"Source: {file.filename}\n{text}" for file, text in zip(files, texts)
+        )
+
+        return {
+            "status": "success",
+            "files": [{"filename": file.filename, "characters": len(text)} for file, text in zip(files, texts)],
+            "corpus": corpus_stats,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        for temp_path in temp_paths:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+@app.get("/api/corpus/{rag_name}")
+async def api_corpus_stats(rag_name: str):
+    """Record count, size and reclaimable space of a RAG's corpus."""
+    if not corpus_exists(rag_name):
+        raise HTTPException(status_code=404, detail="Corpus not found")
+    return get_corpus(rag_name).stats()
+
+@app.post("/api/corpus/{rag_name}/compact")
+async def api_corpus_compact(rag_name: str):
+    """Rewrite a RAG's corpus without superseded records."""
+    if not corpus_exists(rag_name):
+        raise HTTPException(status_code=404, detail="Corpus not found")
+    return await asyncio.to_thread(get_corpus(rag_name).compact)
+
 @app.get("/api/supported-formats")
 async def api_supported_formats():
     """Return list of supported file extensions."""
@@ -367,7 +432,8 @@ async def api_chat(req: ChatRequest):
                 
                 # We revert to Haystack query_pipeline to utilize the 13 RAG architectures!
                 overrides = req.llm_override or {"model": "qwen-local"}
-                result = query_pipeline(session["pipeline_id"], req.query, llm_override=overrides)
+                result = query_pipeline(session["pipeline_id"], req.query, llm_override=overrides,
+                                        filters=req.filters, bypass_cache=req.bypass_cache)
                 answer = _clean_markdown(result.get("answer", "No answer found."))
                 
                 return {
@@ -476,17 +542,12 @@ def _load_rag_context(pipeline_id: str, max_chars: int = 3000) -> str:
     if not rag_name:
         return "No documents loaded for this pipeline."
     
-    data_file = os.path.join(os.path.dirname(__file__), "data", rag_name, "scraped_data.txt")
-    if not os.path.exists(data_file):
+    if not corpus_exists(rag_name):
         return "No documents found."
     
     try:
-        with open(data_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        # Truncate to fit in context window
-        if len(content) > max_chars:
-            content = content[:max_chars] + "\n... [truncated]"
-        return content
+        # Reads only as many records as fit in the context window
+        return get_corpus(rag_name).read_text_prefix(max_chars)
     except Exception as e:
         logger.warning(f"Failed to load context for {rag_name}: {e}")
         return "Error loading documents."
@@ -727,7 +788,9 @@ def api_test_chat(req: ChatRequest):
             req.pipeline_id,
             req.query,
             audio_base64=req.audio_base64,
-            llm_override=overrides
+            llm_override=overrides,
+            filters=req.filters,
+            bypass_cache=req.bypass_cache
         )
         
         if isinstance(result, dict):
@@ -768,35 +831,57 @@ async def api_transcribe(file: UploadFile = File(...)):
 #  RAG Management Endpoints
 # ═══════════════════════════════════════════════════════════
 
+def _prepare_deploy_config(req: DeployRequest) -> dict:
+    config = req.model_dump()
+    # Apply tuning preset if in Simple mode
+    config = apply_tuning_preset(config)
+
+    # Look up any previously ingested data for this RAG if extracted_texts is empty
+    if not config.get("extracted_texts") and config.get("ragName"):
+        if corpus_exists(config["ragName"]):
+            corpus = get_corpus(config["ragName"])
+            if len(corpus):
+                # Records are streamed one at a time during ingestion, never loaded all at once
+                config["extracted_texts"] = corpus.iter_texts()
+                logger.info(f"Streaming {len(corpus)} corpus records for {config['ragName']}")
+    return config
+
+
+def _deploy_key(config: dict) -> Optional[str]:
+    """Collection a deploy writes to; deploys of unnamed RAGs get fresh collections and need no lock."""
+    return collection_key(config) if config.get("ragName") else None
+
+
+def _run_deploy_locked(config: dict) -> dict:
+    """Blocking deploy holding its collection's lock, so it never overlaps a deploy job of the same RAG."""
+    key = _deploy_key(config)
+    if not key:
+        return _run_deploy(config)
+    with collection_lock(key):
+        return _run_deploy(config)
+
+
+def _run_deploy(config: dict, progress_callback=None) -> dict:
+    """Blocking deploy (runs in a worker thread, never on the event loop)."""
+    deployment_info = deploy_rag_system(config, progress_callback=progress_callback)
+    pipeline_id = deployment_info.get("pipeline_id", "mock_pipeline_123")
+
+    # Store pipeline → ragName mapping for direct LLM test chat
+    _pipeline_rag_map[pipeline_id] = config.get("ragName", "")
+    logger.info(f"📌 Mapped pipeline {pipeline_id} → {config.get('ragName', '')}")
+    return deployment_info
+
+
 @app.post("/api/deploy")
 async def api_deploy(req: DeployRequest):
     try:
-        config = req.model_dump()
-        # Apply tuning preset if in Simple mode
-        config = apply_tuning_preset(config)
-        
-        # Look up any previously ingested data for this RAG if extracted_texts is empty
-        if not config.get("extracted_texts") and config.get("ragName"):
-            rag_dir = os.path.join(os.path.dirname(__file__), "data", config["ragName"])
-            scraped_file = os.path.join(rag_dir, "scraped_data.txt")
-            if os.path.exists(scraped_file):
-                # We optionally just pass the file path to haystack service, but for now we read it back 
-                # to keep haystack_service.py untouched. If the file is huge, this might OOM, 
-                # but it matches the previous flow exactly.
-                with open(scraped_file, "r", encoding="utf-8") as f:
-                     content = f.read()
-                     # Split by our delimiter
-                     parts = [p.strip() for p in content.split("="*50) if p.strip()]
-                     config["extracted_texts"] = parts
-                     logger.info(f"Loaded {len(parts)} local texts for {config['ragName']}")
-
-        deployment_info = deploy_rag_system(config)
+        config = _prepare_deploy_config(req)
+        key = _deploy_key(config)
+        if key and is_deploying(key):
+            raise DeployInProgress(None, key)
+        deployment_info = await asyncio.to_thread(_run_deploy_locked, config)
         pipeline_id = deployment_info.get("pipeline_id", "mock_pipeline_123")
         
-        # Store pipeline → ragName mapping for direct LLM test chat
-        _pipeline_rag_map[pipeline_id] = config.get("ragName", "")
-        logger.info(f"📌 Mapped pipeline {pipeline_id} → {config.get('ragName', '')}")
-        
         return {
             "status": "success",
             "message": "Agentic RAG deployed successfully.",
@@ -804,10 +889,80 @@ async def api_deploy(req: DeployRequest):
             "theme": req.theme,
             "pipeline_id": pipeline_id
         }
+    except DeployInProgress:
+        raise HTTPException(status_code=409, detail=f"{req.ragName} is already being deployed")
     except Exception as e:
         logger.error(f"Deploy error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+# ═══════════════════════════════════════════════════════════
+#  Background Deployment Jobs
+# ═══════════════════════════════════════════════════════════
+
+@app.post("/api/deploy/jobs", status_code=202)
+async def api_deploy_job_submit(req: DeployRequest):
+    """Queue a deploy as a background job and return its id immediately."""
+    try:
+        config = _prepare_deploy_config(req)
+    except Exception as e:
+        logger.error(f"Deploy job error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    try:
+        job = submit_job(lambda progress: _run_deploy(config, progress), rag_name=req.ragName,
+                         key=_deploy_key(config))
+    except DeployInProgress as e:
+        raise HTTPException(status_code=409, detail={
+            "message": f"{req.ragName} is already being deployed", "job_id": e.job.id if e.job else None})
+    return {"status": "queued", "job_id": job.id, "theme": req.theme}
+
+@app.get("/api/deploy/jobs")
+async def api_deploy_job_list(limit: int = 50):
+    """List recent deployment jobs (newest first)."""
+    return {"status": "success", "jobs": list_jobs(limit)}
+
+@app.get("/api/deploy/jobs/{job_id}")
+async def api_deploy_job_status(job_id: str):
+    """Poll a deployment job: status, per-stage timings, progress and result."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/api/deploy/jobs/{job_id}/events")
+async def api_deploy_job_events(job_id: str):
+    """Stream job snapshots as Server-Sent Events until the job finishes."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        version = -1
+        while True:
+            version = await job.next_update(version)
+            snapshot = job.to_dict()
+            yield f"data: {json.dumps(snapshot, default=str)}\n\n"
+            if snapshot["status"] in TERMINAL_STATES:
+                break
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.delete("/api/deploy/jobs/{job_id}")
+async def api_deploy_job_cancel(job_id: str):
+    """Cancel a queued or running deployment job."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    cancelled = cancel_job(job_id)
+    return {"status": "cancelling" if cancelled else job.status, "job_id": job_id}
+
+@app.delete("/api/pipelines/{pipeline_id}")
+async def api_pipeline_stop(pipeline_id: str):
+    """Stop a deployed pipeline: it stops answering, its cached answers are dropped and it is not restored."""
+    if not stop_pipeline(pipeline_id):
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return {"status": "stopped", "pipeline_id": pipeline_id}
+
 @app.get("/api/visualize/{pipeline_id}")
 async def api_visualize(pipeline_id: str):
     """Returns real pipeline graph data for visualization."""
@@ -0,0 +1,600 @@
+"""
+BM25 Index — Persistent, incremental inverted index for keyword retrieval.
+Unlike InMemoryBM25Retriever, whose statistics are rebuilt on every deploy
+and lost on restart, documents live in immutable on-disk segments under
+STORES_DIR/bm25. Each segment holds a term dictionary, term-sorted posting
+lists (document ordinal + term frequency), document lengths and the stored
+documents, and its arrays are memory-mapped on load. A query reads only the
+posting lists of its own terms, so latency tracks how many documents match
+those terms, not how large the corpus is. Segments also keep a metadata
+index (see metadata_index), so filters on source fields restrict scoring
+to the matching documents.
+"""
+import os
+import re
+import json
+import shutil
+import logging
+import tempfile
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from haystack import Document, component, default_from_dict, default_to_dict
+from haystack.document_stores.errors import DuplicateDocumentError
+from haystack.document_stores.types import DuplicatePolicy
+from haystack.utils.filters import document_matches_filter
+
+from .metadata_index import MetadataIndex, resolve_filter
+from .multi_retriever import top_k_indices
+from .vector_store_manager import STORES_DIR
+
+logger = logging.getLogger(__name__)
+
+BM25_DIR = os.path.join(STORES_DIR, "bm25")
+
+# Same tokenization as Haystack's InMemoryDocumentStore (lowercased \w+ runs)
+_TOKEN = re.compile(r"(?u)\b\w+\b")
+
+# Tail segments are merged while the previous one holds at most this many
+# times as many live documents, which keeps O(log n) segments in total
+MERGE_FACTOR = 2
+# A segment is rewritten once this share of its documents has been deleted
+MAX_DEAD_RATIO = 0.5
+
+_ARRAYS = ("offsets", "post_docs", "post_tfs", "lengths", "doc_offsets")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _write_json(path: str, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _load_array(path: str) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        return np.load(path)  # empty arrays cannot be memory-mapped
+
+
+def _release(file, arrays: dict, path: str, state: dict):
+    """Close a segment's file and memory maps (Windows cannot delete open files), then drop it if retired."""
+    file.close()
+    arrays.clear()
+    if state["retired"]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _remove_store(path: str, segment_handles: list):
+    for release in segment_handles:
+        release()
+    shutil.rmtree(path, ignore_errors=True)
+
+
+# ═══════════════════════════════════════════════════════════
+#  Segment
+# ═══════════════════════════════════════════════════════════
+
+def _write_segment(path: str, terms: List[str], offsets: np.ndarray, post_docs: np.ndarray,
+                   post_tfs: np.ndarray, lengths: np.ndarray, ids: List[str], records: Iterator[bytes],
+                   meta_index: MetadataIndex):
+    """Write a complete segment into path (which must not exist yet)."""
+    tmp = f"{path}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    doc_offsets = [0]
+    with open(os.path.join(tmp, "docs.jsonl"), "wb") as f:
+        for record in records:
+            f.write(record)
+            doc_offsets.append(doc_offsets[-1] + len(record))
+    arrays = {
+        "offsets": offsets.astype(np.int64), "post_docs": post_docs.astype(np.int32),
+        "post_tfs": post_tfs.astype(np.int32), "lengths": lengths.astype(np.int32),
+        "doc_offsets": np.asarray(doc_offsets, dtype=np.int64),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), array)
+    np.save(os.path.join(tmp, "live.npy"), np.ones(len(ids), dtype=bool))
+    with open(os.path.join(tmp, "terms.json"), "w", encoding="utf-8") as f:
+        json.dump(terms, f)
+    with open(os.path.join(tmp, "ids.json"), "w", encoding="utf-8") as f:
+        json.dump(ids, f)
+    with open(os.path.join(tmp, "meta_index.json"), "w", encoding="utf-8") as f:
+        json.dump(meta_index.to_json(), f)
+    os.replace(tmp, path)
+
+
+def _postings_by_term(term_ids: np.ndarray, docs: np.ndarray, tfs: np.ndarray,
+                      n_terms: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sort postings by (term, doc) and compute each term's slice offsets."""
+    order = np.lexsort((docs, term_ids))
+    offsets = np.zeros(n_terms + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=n_terms), out=offsets[1:])
+    return offsets, docs[order], tfs[order]
+
+
+class _Segment:
+    """One immutable batch of indexed documents; only its live bitmap changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, "terms.json"), encoding="utf-8") as f:
+            self.terms: List[str] = json.load(f)
+        with open(os.path.join(path, "ids.json"), encoding="utf-8") as f:
+            self.ids: List[str] = json.load(f)
+        self.term_index = {term: i for i, term in enumerate(self.terms)}
+        # Kept in one dict so releasing the segment unmaps them all
+        self._arrays = {name: _load_array(os.path.join(path, f"{name}.npy")) for name in _ARRAYS}
+        self.live = np.load(os.path.join(path, "live.npy"))
+        # Segments written before metadata indexing have none and are scanned in full
+        self.meta_index: Optional[MetadataIndex] = None
+        if os.path.exists(os.path.join(path, "meta_index.json")):
+            with open(os.path.join(path, "meta_index.json"), encoding="utf-8") as f:
+                self.meta_index = MetadataIndex.from_json(json.load(f))
+        self.live_count = int(self.live.sum())
+        self.live_length = int(self.lengths[self.live].sum()) if self.live_count else 0
+        # Positioned reads share one handle (no os.pread on Windows)
+        self._file = open(os.path.join(path, "docs.jsonl"), "rb")
+        self._read_lock = threading.Lock()
+        # Retired (merged away) segments are removed once no query holds them
+        self._state = {"retired": False}
+        self._finalizer = weakref.finalize(self, _release, self._file, self._arrays, path, self._state)
+
+    def __getattr__(self, name: str):
+        if name in _ARRAYS:
+            try:
+                return self.__dict__["_arrays"][name]
+            except KeyError:
+                raise AttributeError(f"BM25 segment {self.path} is closed") from None
+        raise AttributeError(name)
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.ids)
+
+    def postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        i = self.term_index.get(term)
+        if i is None:
+            return None
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.post_docs[start:end], self.post_tfs[start:end]
+
+    def raw(self, ordinal: int) -> bytes:
+        start, end = int(self.doc_offsets[ordinal]), int(self.doc_offsets[ordinal + 1])
+        with self._read_lock:
+            self._file.seek(start)
+            return self._file.read(end - start)
+
+    def document(self, ordinal: int, score: Optional[float] = None) -> Document:
+        record = json.loads(self.raw(ordinal))
+        return Document(id=record["id"], content=record["content"], meta=record["meta"], score=score)
+
+    def kill(self, ordinal: int):
+        if self.live[ordinal]:
+            self.live[ordinal] = False
+            self.live_count -= 1
+            self.live_length -= int(self.lengths[ordinal])
+
+    def save_live(self):
+        tmp = os.path.join(self.path, "live.tmp.npy")
+        np.save(tmp, self.live)
+        os.replace(tmp, os.path.join(self.path, "live.npy"))
+
+    def retire(self):
+        self._state["retired"] = True
+
+    def close(self):
+        """Release the file handle and memory maps now rather than when the segment is collected."""
+        self._finalizer()
+
+
+def _build_segment(path: str, documents: List[Document]):
+    vocab: Dict[str, int] = {}
+    term_ids, docs, tfs, lengths = [], [], [], []
+    meta_index = MetadataIndex()
+    for ordinal, doc in enumerate(documents):
+        meta_index.add(ordinal, doc.meta)
+        tokens = tokenize(doc.content or "")
+        lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            term_ids.append(vocab.setdefault(term, len(vocab)))
+            docs.append(ordinal)
+            tfs.append(tf)
+
+    terms = sorted(vocab)
+    remap = np.empty(len(vocab), dtype=np.int64)
+    remap[[vocab[t] for t in terms]] = np.arange(len(terms))
+    offsets, post_docs, post_tfs = _postings_by_term(
+        remap[np.asarray(term_ids, dtype=np.int64)], np.asarray(docs, dtype=np.int64),
+        np.asarray(tfs, dtype=np.int64), len(terms))
+    records = (
+        (json.dumps({"id": doc.id, "content": doc.content, "meta": doc.meta}, default=str) + "\n").encode("utf-8")
+        for doc in documents
+    )
+    _write_segment(path, terms, offsets, post_docs, post_tfs, np.asarray(lengths),
+                   [doc.id for doc in documents], records, meta_index)
+
+
+def _merge_segments(path: str, segments: List[_Segment]):
+    """Write the live documents of segments into one new segment at path."""
+    vocabulary = sorted(set().union(*(segment.terms for segment in segments)))
+    lookup = {term: i for i, term in enumerate(vocabulary)}
+    term_parts, doc_parts, tf_parts, length_parts, ids, base = [], [], [], [], [], 0
+    meta_index = MetadataIndex()
+    for segment in segments:
+        renumber = np.cumsum(segment.live) - 1 + base
+        if segment.meta_index is not None:
+            for term, rows in segment.meta_index.postings():
+                meta_index.add_postings(term, renumber[rows[segment.live[rows]]].tolist())
+        else:
+            for ordinal in np.flatnonzero(segment.live).tolist():
+                meta_index.add(int(renumber[ordinal]), json.loads(segment.raw(ordinal))["meta"])
+        posting_terms = np.repeat(
+            np.fromiter((lookup[t] for t in segment.terms), dtype=np.int64, count=len(segment.terms)),
+            np.diff(segment.offsets))
+        keep = segment.live[segment.post_docs]
+        term_parts.append(posting_terms[keep])
+        doc_parts.append(renumber[segment.post_docs[keep]])
+        tf_parts.append(np.asarray(segment.post_tfs)[keep])
+        length_parts.append(np.asarray(segment.lengths)[segment.live])
+        ids.extend(doc_id for doc_id, alive in zip(segment.ids, segment.live) if alive)
+        base += segment.live_count
+
+    term_ids = np.concatenate(term_parts) if term_parts else np.empty(0, dtype=np.int64)
+    # Drop terms whose every posting belonged to a deleted document
+    used = np.bincount(term_ids, minlength=len(vocabulary)) > 0
+    terms = [term for term, keep in zip(vocabulary, used) if keep]
+    offsets, post_docs, post_tfs = _postings_by_term(
+        (np.cumsum(used) - 1)[term_ids], np.concatenate(doc_parts), np.concatenate(tf_parts), len(terms))
+    records = (
+        segment.raw(ordinal)
+        for segment in segments for ordinal in np.flatnonzero(segment.live).tolist()
+    )
+    _write_segment(path, terms, offsets, post_docs, post_tfs, np.concatenate(length_parts), ids, records,
+                   meta_index)
+
+
+# ═══════════════════════════════════════════════════════════
+#  Document Store
+# ═══════════════════════════════════════════════════════════
+
+class _SegmentIndex:
+    """
+    The segments of one index directory and their bookkeeping (id locations,
+    manifest). Persistent stores on the same directory share one instance, so
+    writes and deletes made through any of them are seen by all and the
+    manifest has a single writer.
+    """
+
+    def __init__(self, path: str, name: Optional[str]):
+        self.path = path
+        self.name = name
+        self.lock = threading.RLock()
+        # Release callbacks of the open segments, run before a temporary index is removed
+        self.segment_handles: List[weakref.finalize] = []
+        self.segments: List[_Segment] = []
+        self.locations: Dict[str, Tuple[_Segment, int]] = {}
+        self.next_segment = 0
+        self._load()
+
+    # ── Persistence ──────────────────────────────────────
+    @property
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    def _load(self):
+        manifest = {"segments": [], "next_segment": 0}
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        self.next_segment = manifest["next_segment"]
+        self.segments = [self._open_segment(os.path.join(self.path, name)) for name in manifest["segments"]]
+
+        # Leftovers of interrupted writes or merges
+        for entry in os.listdir(self.path):
+            if entry.startswith("seg_") and entry not in manifest["segments"]:
+                shutil.rmtree(os.path.join(self.path, entry), ignore_errors=True)
+
+        # A crash between a write and its overwrite bookkeeping can leave an
+        # id live twice; the newest copy wins
+        stale = set()
+        for segment in self.segments:
+            for ordinal in np.flatnonzero(segment.live).tolist():
+                doc_id = segment.ids[ordinal]
+                previous = self.locations.get(doc_id)
+                if previous is not None:
+                    previous[0].kill(previous[1])
+                    stale.add(previous[0])
+                self.locations[doc_id] = (segment, ordinal)
+        for segment in stale:
+            segment.save_live()
+        if self.segments:
+            logger.info(f"BM25 index '{self.name}' loaded: {len(self.locations)} documents "
+                        f"in {len(self.segments)} segments")
+
+    def _save_manifest(self):
+        _write_json(self._manifest_path, {
+            "version": 1,
+            "segments": [segment.name for segment in self.segments],
+            "next_segment": self.next_segment,
+        })
+
+    def _open_segment(self, path: str) -> _Segment:
+        segment = _Segment(path)
+        self.segment_handles[:] = [h for h in self.segment_handles if h.alive]
+        self.segment_handles.append(segment._finalizer)
+        return segment
+
+    def _new_segment_path(self) -> str:
+        name = f"seg_{self.next_segment:06d}"
+        self.next_segment += 1
+        return os.path.join(self.path, name)
+
+    # ── Writes ───────────────────────────────────────────
+    def write(self, documents: List[Document], policy: DuplicatePolicy) -> int:
+        batch = {doc.id: doc for doc in documents}  # last copy of an id wins
+        with self.lock:
+            existing = [doc_id for doc_id in batch if doc_id in self.locations]
+            if existing and policy == DuplicatePolicy.SKIP:
+                for doc_id in existing:
+                    del batch[doc_id]
+            elif existing and policy in (DuplicatePolicy.FAIL, DuplicatePolicy.NONE):
+                raise DuplicateDocumentError(f"IDs '{existing[:5]}' already exist in the BM25 index.")
+            if not batch:
+                return 0
+
+            path = self._new_segment_path()
+            _build_segment(path, list(batch.values()))
+            segment = self._open_segment(path)
+            self.segments = self.segments + [segment]
+            self._save_manifest()
+
+            # Overwritten documents die only after the new segment is durable
+            touched = set()
+            for doc_id in existing:
+                old, ordinal = self.locations[doc_id]
+                old.kill(ordinal)
+                touched.add(old)
+            for ordinal, doc_id in enumerate(segment.ids):
+                self.locations[doc_id] = (segment, ordinal)
+            for old in touched:
+                old.save_live()
+            self._compact(touched)
+            self._merge_tail()
+            return len(batch)
+
+    def delete(self, document_ids: List[str]) -> None:
+        with self.lock:
+            touched = set()
+            for doc_id in document_ids:
+                location = self.locations.pop(doc_id, None)
+                if location is not None:
+                    location[0].kill(location[1])
+                    touched.add(location[0])
+            for segment in touched:
+                segment.save_live()
+            self._compact(touched)
+
+    def _replace(self, old: List[_Segment], merged: Optional[_Segment]):
+        """Swap old segments for merged (None drops them) and repoint their ids."""
+        position = self.segments.index(old[0])
+        segments = [s for s in self.segments if s not in old]
+        if merged is not None:
+            segments.insert(position, merged)
+            for ordinal, doc_id in enumerate(merged.ids):
+                self.locations[doc_id] = (merged, ordinal)
+        self.segments = segments
+        self._save_manifest()
+        for segment in old:
+            segment.retire()
+
+    def _merge(self, segments: List[_Segment]):
+        if not any(segment.live_count for segment in segments):
+            self._replace(segments, None)
+            return
+        path = self._new_segment_path()
+        _merge_segments(path, segments)
+        self._replace(segments, self._open_segment(path))
+
+    def _compact(self, segments):
+        for segment in segments:
+            if segment in self.segments and segment.live_count <= segment.n_docs * (1 - MAX_DEAD_RATIO):
+                self._merge([segment])
+
+    def _merge_tail(self):
+        while (len(self.segments) >= 2
+               and self.segments[-2].live_count <= MERGE_FACTOR * self.segments[-1].live_count):
+            self._merge(self.segments[-2:])
+
+    def optimize(self):
+        with self.lock:
+            if len(self.segments) > 1 or any(s.live_count < s.n_docs for s in self.segments):
+                self._merge(list(self.segments))
+
+
+# Open persistent indexes by directory; an index is closed once no store uses it
+_indexes: "weakref.WeakValueDictionary[str, _SegmentIndex]" = weakref.WeakValueDictionary()
+_indexes_lock = threading.Lock()
+
+
+def _shared_index(path: str, name: str) -> _SegmentIndex:
+    """The open index for path, loaded on first use."""
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _SegmentIndex(path, name)
+            _indexes[path] = index
+        return index
+
+
+class BM25DocumentStore:
+    """
+    Keyword-only document store backed by a segmented BM25 inverted index.
+
+    Every write_documents() call becomes a new segment; small tail segments
+    are merged as they accumulate and heavily deleted ones are rewritten.
+    Deletes flip a per-segment live bitmap. Scoring is BM25 Okapi with the
+    non-negative (Lucene) idf, using live document counts and lengths only.
+    Embeddings are not stored.
+
+    With a collection name the index persists under BM25_DIR/<collection>
+    and is reopened by the next store using that name; stores open on the
+    same collection at the same time share one index, each with its own
+    k1 / b. Without a name it lives in a temporary directory that is removed
+    with the store.
+    """
+
+    def __init__(self, collection: Optional[str] = None, directory: str = BM25_DIR,
+                 k1: float = 1.5, b: float = 0.75):
+        os.makedirs(directory, exist_ok=True)
+        self.collection = collection
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.persistent = bool(collection)
+        if self.persistent:
+            self.path = os.path.abspath(os.path.join(directory, re.sub(r"[^\w.-]", "_", collection)))
+            os.makedirs(self.path, exist_ok=True)
+            self._index = _shared_index(self.path, collection)
+        else:
+            self.path = tempfile.mkdtemp(prefix="bm25_", dir=directory)
+            self._index = _SegmentIndex(self.path, None)
+            self._finalizer = weakref.finalize(self, _remove_store, self.path, self._index.segment_handles)
+
+    # ── Writes ───────────────────────────────────────────
+    def write_documents(self, documents: List[Document], policy: DuplicatePolicy = DuplicatePolicy.NONE) -> int:
+        return self._index.write(documents, policy)
+
+    def delete_documents(self, document_ids: List[str]) -> None:
+        self._index.delete(document_ids)
+
+    def optimize(self):
+        """Merge every segment into one (drops all deleted documents)."""
+        self._index.optimize()
+
+    # ── Reads ────────────────────────────────────────────
+    def count_documents(self) -> int:
+        return len(self._index.locations)
+
+    def _iter_live(self) -> Iterator[Document]:
+        for segment in list(self._index.segments):
+            for ordinal in np.flatnonzero(segment.live).tolist():
+                yield segment.document(ordinal)
+
+    def filter_documents(self, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        if not filters:
+            return list(self._iter_live())
+        return [doc for doc in self._iter_live() if document_matches_filter(filters=filters, document=doc)]
+
+    def bm25_retrieval(self, query: str, filters: Optional[Dict[str, Any]] = None, top_k: int = 10) -> List[Document]:
+        """
+        Top-k documents for query; filters are applied to the scored candidates.
+        Where the metadata index resolves the filters only matching documents
+        are scored (term statistics still cover the whole collection).
+        """
+        segments = self._index.segments  # snapshot; writers swap in new lists
+        n_docs = sum(segment.live_count for segment in segments)
+        terms = set(tokenize(query))
+        if not n_docs or not terms:
+            return []
+        avg_length = max(sum(segment.live_length for segment in segments) / n_docs, 1e-9)
+        bases = np.cumsum([0] + [segment.n_docs for segment in segments])
+        allowed = [
+            resolve_filter(filters, segment.meta_index.lookup) if filters and segment.meta_index else None
+            for segment in segments
+        ]
+        if all(rows is not None and not rows.size for rows in allowed):
+            return []
+
+        # Only the posting lists of the query terms are read
+        keys, scores = [], []
+        for term in terms:
+            hits = []
+            for base, segment, rows in zip(bases, segments, allowed):
+                postings = segment.postings(term)
+                if postings is None:
+                    continue
+                docs, tfs = postings
+                alive = segment.live[docs]
+                docs, tfs = docs[alive], tfs[alive]
+                if docs.size:
+                    hits.append((base, segment, rows, docs, tfs))
+            df = sum(docs.size for _, _, _, docs, _ in hits)
+            if not df:
+                continue
+            idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            for base, segment, rows, docs, tfs in hits:
+                if rows is not None:
+                    keep = np.isin(docs, rows, assume_unique=True)
+                    docs, tfs = docs[keep], tfs[keep]
+                    if not docs.size:
+                        continue
+                norm = self.k1 * (1.0 - self.b + self.b * segment.lengths[docs] / avg_length)
+                keys.append(docs.astype(np.int64) + base)
+                scores.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+        if not keys:
+            return []
+
+        candidates, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(scores))
+        # Filters are checked lazily along the ranking, so fetch everything then
+        order = top_k_indices(totals, totals.size if filters else top_k)
+        results = []
+        for i in order.tolist():
+            key = int(candidates[i])
+            s = int(np.searchsorted(bases, key, side="right")) - 1
+            doc = segments[s].document(key - int(bases[s]), score=float(totals[i]))
+            if filters and not document_matches_filter(filters=filters, document=doc):
+                continue
+            results.append(doc)
+            if len(results) >= top_k:
+                break
+        return results
+
+    def stats(self) -> dict:
+        segments = self._index.segments
+        disk = sum(
+            os.path.getsize(os.path.join(s.path, f)) for s in segments for f in os.listdir(s.path)
+        )
+        return {
+            "documents": sum(s.live_count for s in segments),
+            "deleted": sum(s.n_docs - s.live_count for s in segments),
+            "segments": len(segments),
+            "terms": sum(len(s.terms) for s in segments),
+            "postings": sum(int(s.offsets[-1]) for s in segments if len(s.offsets)),
+            "disk_mb": round(disk / 1e6, 2),
+            "persistent": self.persistent,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return default_to_dict(self, collection=self.collection, directory=self.directory, k1=self.k1, b=self.b)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25DocumentStore":
+        return default_from_dict(cls, data)
+
+
+@component
+class PersistentBM25Retriever:
+    """Keyword retriever over a BM25DocumentStore (drop-in for InMemoryBM25Retriever)."""
+
+    def __init__(self, document_store: BM25DocumentStore, top_k: int = 10,
+                 filters: Optional[Dict[str, Any]] = None):
+        self.document_store = document_store
+        self.top_k = top_k
+        self.filters = filters
+
+    @component.output_types(documents=List[Document])
+    def run(self, query: str, filters: Optional[Dict[str, Any]] = None, top_k: Optional[int] = None):
+        documents = self.document_store.bm25_retrieval(
+            query, filters=filters or self.filters, top_k=top_k or self.top_k)
+        return {"documents": documents}
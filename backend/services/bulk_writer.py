@@ -0,0 +1,146 @@
+"""
+Bulk Writer — Batched, concurrent and retried document writes.
+Remote stores get documents in batches of writeBatchSize, with up to
+writeConcurrency batches in flight, and transient failures (timeouts, lost
+connections, 429/5xx answers) are retried with exponential backoff.
+In-process stores (memory, FAISS, mmap, BM25, Chroma) keep one write call:
+they have no request limits, and a BM25 segment is created per call.
+Several stores (hybrid mode) are written concurrently.
+"""
+import time
+import random
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+from typing import Any, Dict, List, Optional
+
+from haystack import Document
+from haystack.document_stores.types import DuplicatePolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+BACKOFF_S = 0.5
+MAX_BACKOFF_S = 10.0
+
+# Remote stores by base class name; only the first group can take concurrent
+# writes (a pgvector store serializes its operations, Weaviate has one batch context per store)
+PARALLEL_STORES = ("QdrantDocumentStore", "ElasticsearchDocumentStore", "PineconeDocumentStore")
+SEQUENTIAL_STORES = ("PgvectorDocumentStore", "WeaviateDocumentStore")
+
+_TRANSIENT_STATUS = (408, 429, 500, 502, 503, 504)
+_TRANSIENT_NAMES = ("Timeout", "Connection", "Transport", "Unavailable", "TooManyRequests", "RateLimit",
+                    "OperationalError", "ProtocolError")
+
+
+def _store_kind(store) -> Optional[str]:
+    """"parallel", "sequential" or None (in-process store)."""
+    names = {cls.__name__ for cls in type(store).__mro__}
+    if "QdrantDocumentStore" in names and (store.path or store.location == ":memory:"):
+        return None  # Qdrant local mode runs in-process and is not thread-safe
+    if names.intersection(PARALLEL_STORES):
+        return "parallel"
+    if names.intersection(SEQUENTIAL_STORES):
+        return "sequential"
+    return None
+
+
+def is_transient(error: BaseException) -> bool:
+    """Worth retrying: network trouble, timeouts, throttling and 5xx answers."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if isinstance(status, int) and status in _TRANSIENT_STATUS:
+        return True
+    return any(name in cls.__name__ for cls in type(error).__mro__ for name in _TRANSIENT_NAMES)
+
+
+class BulkWriter:
+    """Writes document lists to stores; every call returns a per-store throughput report."""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, concurrency: int = DEFAULT_CONCURRENCY,
+                 retries: int = DEFAULT_RETRIES, backoff_s: float = BACKOFF_S):
+        self.batch_size = max(1, int(batch_size))
+        self.concurrency = max(1, int(concurrency))
+        self.retries = max(0, int(retries))
+        self.backoff_s = backoff_s
+
+    @classmethod
+    def from_config(cls, dynamic_cfg: Dict[str, Any]) -> "BulkWriter":
+        """Writer tuned by dynamicConfig.writeBatchSize / writeConcurrency / writeRetries."""
+        return cls(
+            batch_size=dynamic_cfg.get("writeBatchSize", DEFAULT_BATCH_SIZE),
+            concurrency=dynamic_cfg.get("writeConcurrency", DEFAULT_CONCURRENCY),
+            retries=dynamic_cfg.get("writeRetries", DEFAULT_RETRIES),
+        )
+
+    # ── Single store ─────────────────────────────────────
+    def write(self, store, documents: List[Document], policy: DuplicatePolicy = DuplicatePolicy.OVERWRITE) -> dict:
+        kind = _store_kind(store)
+        start = time.perf_counter()
+        if kind is None:
+            chunks, workers = [documents], 1
+        else:
+            chunks = [documents[i:i + self.batch_size] for i in range(0, len(documents), self.batch_size)]
+            workers = min(self.concurrency, len(chunks)) if kind == "parallel" else 1
+        batches = self._write_batches(store, chunks, policy, workers)
+        elapsed = time.perf_counter() - start
+        report = {
+            "store": type(store).__name__,
+            "documents": len(documents),
+            "batches": len(batches),
+            "concurrency": workers,
+            "retries": sum(b["attempts"] - 1 for b in batches),
+            "ms": round(elapsed * 1000, 2),
+            "docs_per_s": round(len(documents) / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        if kind is not None:
+            report["batch_stats"] = batches
+        return report
+
+    def _write_batches(self, store, chunks: List[List[Document]], policy: DuplicatePolicy, workers: int) -> List[dict]:
+        if workers <= 1:
+            return [self._write_batch(store, chunk, policy, i) for i, chunk in enumerate(chunks)]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-write") as pool:
+            futures = [pool.submit(self._write_batch, store, chunk, policy, i) for i, chunk in enumerate(chunks)]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            # Re-raises the first failure once the batches in flight are done
+            return [future.result() for future in futures]
+
+    def _write_batch(self, store, documents: List[Document], policy: DuplicatePolicy, index: int) -> dict:
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            attempt += 1
+            try:
+                store.write_documents(documents, policy=policy)
+                break
+            except Exception as e:
+                if attempt > self.retries or not is_transient(e):
+                    raise
+                # Full jitter keeps retrying batches from hitting the store in lockstep
+                delay = random.uniform(0, min(MAX_BACKOFF_S, self.backoff_s * 2 ** (attempt - 1)))
+                logger.warning(f"Write batch {index + 1} to {type(store).__name__} failed "
+                               f"(attempt {attempt}/{self.retries + 1}): {e} — retrying in {delay:.2f}s")
+                time.sleep(delay)
+        elapsed = time.perf_counter() - start
+        return {
+            "batch": index + 1,
+            "documents": len(documents),
+            "attempts": attempt,
+            "ms": round(elapsed * 1000, 2),
+            "docs_per_s": round(len(documents) / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    # ── Several stores ───────────────────────────────────
+    def write_all(self, stores: List, documents: List[Document],
+                  policy: DuplicatePolicy = DuplicatePolicy.OVERWRITE) -> List[dict]:
+        """Write the same documents to every store, the stores concurrently."""
+        if len(stores) <= 1:
+            return [self.write(store, documents, policy) for store in stores]
+        with ThreadPoolExecutor(max_workers=len(stores), thread_name_prefix="store-write") as pool:
+            futures = [pool.submit(self.write, store, documents, policy) for store in stores]
+            return [future.result() for future in futures]
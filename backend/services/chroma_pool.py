@@ -0,0 +1,172 @@
+"""
+Chroma Pool — One shared Chroma client per persist path.
+Every ChromaDocumentStore would otherwise build its own PersistentClient on
+the same STORES_DIR/chroma directory, each with its own SQLite handles and
+segment cache. Pooled stores borrow the process-wide client for their path,
+open their collection on first use and let go of it after CHROMA_IDLE_UNLOAD_S
+without queries; the HNSW segments behind released collections are then
+evicted by the client's LRU segment cache (CHROMA_MEMORY_LIMIT_MB).
+Writes are sent in batches instead of one document per call.
+"""
+import os
+import time
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Optional
+
+from haystack import Document, default_from_dict, default_to_dict
+from haystack.document_stores.types import DuplicatePolicy
+from haystack_integrations.document_stores.chroma import ChromaDocumentStore
+
+from .vector_store_manager import STORES_DIR
+
+logger = logging.getLogger(__name__)
+
+CHROMA_DIR = os.path.join(STORES_DIR, "chroma")
+IDLE_UNLOAD_S = float(os.environ.get("CHROMA_IDLE_UNLOAD_S", "600"))
+MEMORY_LIMIT_MB = int(os.environ.get("CHROMA_MEMORY_LIMIT_MB", "1024"))
+DEFAULT_BATCH_SIZE = 256
+
+# dynamicConfig key -> Chroma collection metadata key (fixed when a collection is created,
+# except search_ef which is also applied to existing collections)
+HNSW_PARAMS = {
+    "chromaHnswM": "hnsw:M",
+    "chromaEfConstruction": "hnsw:construction_ef",
+    "chromaEfSearch": "hnsw:search_ef",
+}
+
+# Idle collections are looked for at most this often
+_SWEEP_INTERVAL_S = 60.0
+
+_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+_stores: "weakref.WeakSet[PooledChromaDocumentStore]" = weakref.WeakSet()
+_last_sweep = 0.0
+_unloads = 0
+
+
+def get_client(persist_path: str):
+    """The shared PersistentClient for persist_path, created on first use."""
+    with _lock:
+        client = _clients.get(persist_path)
+        if client is None:
+            import chromadb
+            from chromadb.config import Settings
+            os.makedirs(persist_path, exist_ok=True)
+            client = chromadb.PersistentClient(path=persist_path, settings=Settings(
+                anonymized_telemetry=False,
+                chroma_segment_cache_policy="LRU",
+                chroma_memory_limit_bytes=MEMORY_LIMIT_MB * 1024 * 1024,
+            ))
+            _clients[persist_path] = client
+            logger.info(f"Chroma client opened: {persist_path}")
+        return client
+
+
+def unload_idle(max_idle_s: float = IDLE_UNLOAD_S) -> int:
+    """Release the collections of pooled stores idle for max_idle_s; returns how many."""
+    global _last_sweep, _unloads
+    now = time.monotonic()
+    with _lock:
+        _last_sweep = now
+        idle = [s for s in list(_stores) if s._collection is not None and now - s._last_used > max_idle_s]
+        for store in idle:
+            store._collection = None
+        _unloads += len(idle)
+    if idle:
+        logger.info(f"Chroma: released {len(idle)} idle collection(s)")
+    return len(idle)
+
+
+def _batches(payloads: List[dict], size: int):
+    """Merge single-document payloads into add/upsert calls of up to size documents."""
+    for start in range(0, len(payloads), size):
+        group: Dict[str, list] = {}
+        for payload in payloads[start:start + size]:
+            # Chroma wants metadatas / embeddings for all documents of a call or none
+            if group and group.keys() != payload.keys():
+                yield group
+                group = {}
+            for key, values in payload.items():
+                group.setdefault(key, []).extend(values)
+        if group:
+            yield group
+
+
+class PooledChromaDocumentStore(ChromaDocumentStore):
+    """
+    ChromaDocumentStore on a pooled client, opened lazily and released when idle.
+
+    hnsw holds Chroma collection metadata ("hnsw:M", "hnsw:construction_ef",
+    "hnsw:search_ef"), applied when the collection is created; search_ef is
+    also updated on an existing collection. batch_size caps the documents
+    per add/upsert call (and never exceeds the client's own limit).
+    """
+
+    def __init__(self, collection_name: str = "documents", persist_path: str = CHROMA_DIR,
+                 hnsw: Optional[Dict[str, Any]] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(collection_name=collection_name, persist_path=persist_path, metadata=hnsw or None)
+        self.hnsw = dict(hnsw or {})
+        self.batch_size = max(1, int(batch_size))
+        self._last_used = time.monotonic()
+        _stores.add(self)
+
+    def _ensure_initialized(self) -> None:
+        self._last_used = time.monotonic()
+        if self._last_used - _last_sweep > _SWEEP_INTERVAL_S:
+            unload_idle()
+        if self._collection is not None:
+            return
+        client = get_client(self._persist_path)
+        metadata = {"hnsw:space": self._distance_function, **self.hnsw}
+        collection = client.get_or_create_collection(
+            name=self._collection_name, metadata=metadata, embedding_function=self._embedding_func)
+        if "hnsw:search_ef" in self.hnsw and (collection.metadata or {}).get("hnsw:search_ef") != self.hnsw["hnsw:search_ef"]:
+            try:
+                collection.modify(configuration={"hnsw": {"ef_search": int(self.hnsw["hnsw:search_ef"])}})
+            except Exception as e:
+                logger.warning(f"Chroma collection '{self._collection_name}' keeps its ef_search: {e}")
+        self._client = client
+        self._collection = collection
+        self.batch_size = min(self.batch_size, client.get_max_batch_size())
+
+    def write_documents(self, documents: List[Document], policy: DuplicatePolicy = DuplicatePolicy.NONE) -> int:
+        self._ensure_initialized()
+        if policy == DuplicatePolicy.NONE:
+            policy = DuplicatePolicy.FAIL
+        payloads = [p for p in (self._convert_document_to_chroma(doc) for doc in documents) if p is not None]
+        if not payloads:
+            return 0
+        if policy in (DuplicatePolicy.FAIL, DuplicatePolicy.SKIP):
+            existing = set(self._collection.get(ids=[p["ids"][0] for p in payloads], include=[])["ids"])
+            payloads = self._apply_duplicate_policy(payloads, existing, policy)
+        write = self._collection.upsert if policy == DuplicatePolicy.OVERWRITE else self._collection.add
+        for batch in _batches(payloads, self.batch_size):
+            write(**batch)
+        return len(payloads)
+
+    def close(self) -> None:
+        """Release the collection; the shared client stays open for other stores."""
+        self._collection = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return default_to_dict(self, collection_name=self._collection_name, persist_path=self._persist_path,
+                               hnsw=self.hnsw, batch_size=self.batch_size)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PooledChromaDocumentStore":
+        return default_from_dict(cls, data)
+
+
+def get_chroma_pool_stats() -> dict:
+    with _lock:
+        stores = list(_stores)
+        return {
+            "clients": list(_clients),
+            "stores": len(stores),
+            "open_collections": sum(1 for s in stores if s._collection is not None),
+            "idle_unloads": _unloads,
+            "idle_unload_s": IDLE_UNLOAD_S,
+            "memory_limit_mb": MEMORY_LIMIT_MB,
+        }
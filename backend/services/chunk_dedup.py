@@ -0,0 +1,140 @@
+"""
+Chunk Dedup — Near-duplicate chunk elimination during ingestion.
+Scraped sites repeat boilerplate (cookie banners, footers, sidebars) on every
+page. Each chunk gets a MinHash signature over its word shingles; LSH bands
+find earlier chunks that are likely similar, and the estimated Jaccard
+similarity of their signatures decides. Near-duplicates are dropped before
+embedding; the first copy (the representative) lists the sources of the
+dropped ones in meta["duplicate_sources"]. Only signatures, ids and sources
+are kept per representative, so memory stays small next to the corpus.
+Enabled with dynamicConfig.dedupChunks; dedupThreshold sets the similarity.
+"""
+import zlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from haystack import Document
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.85
+NUM_PERM = 64
+SHINGLE_WORDS = 3
+# Sources listed on one representative
+MAX_SOURCES = 100
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; a < 2^31
+# keeps a * x + b inside uint64. Fixed seed: signatures are stable across runs.
+_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(7)
+_A = _rng.randint(1, 2 ** 31, NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 2 ** 31, NUM_PERM).astype(np.uint64)
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32) of the lower-cased word shingles of text."""
+    words = text.lower().split()
+    if len(words) > SHINGLE_WORDS:
+        shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    else:
+        shingles = {" ".join(words)}
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def lsh_bands(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """
+    (bands, rows) splitting the signature so that pairs at the threshold
+    become candidates: the banding curve's midpoint (1/b)^(1/r) is the
+    largest one not above the threshold, erring toward recall.
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold]
+    return max(below, key=lambda o: (1 / o[0]) ** (1 / o[1])) if below else options[-1]
+
+
+class ChunkDeduplicator:
+    """
+    Streaming near-duplicate filter over the chunks of one ingestion.
+
+    filter() returns the chunks of a batch that are not near-duplicates of
+    a chunk seen before. Representatives that gained sources are returned
+    once by take_updates() as {chunk id: sources}, to be read back from the
+    store and rewritten where the stored copy lacks them.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        # Per representative: signature, chunk id, source; duplicate sources only where found
+        self._signatures: List[np.ndarray] = []
+        self._ids: List[str] = []
+        self._sources: List[Optional[str]] = []
+        self._duplicate_sources: Dict[int, List[str]] = {}
+        self._updated: set = set()
+        self.chunks = 0
+        self.duplicates = 0
+
+    def filter(self, chunks: List[Document]) -> List[Document]:
+        kept = []
+        first = len(self._ids)  # representatives from here on are still in this batch
+        for chunk in chunks:
+            self.chunks += 1
+            signature = minhash(chunk.content or "")
+            match = self._match(signature)
+            if match is None:
+                self._add(chunk, signature)
+                kept.append(chunk)
+                continue
+            self.duplicates += 1
+            source = chunk.meta.get("source")
+            sources = self._duplicate_sources.get(match, [])
+            if source and source != self._sources[match] and source not in sources \
+                    and len(sources) < MAX_SOURCES:
+                self._duplicate_sources[match] = sources = [*sources, source]
+                # Also when the representative is in this batch: an incremental deploy
+                # may skip writing it as unchanged
+                self._updated.add(match)
+                if match >= first:
+                    kept[match - first].meta["duplicate_sources"] = sources
+        return kept
+
+    def _match(self, signature: np.ndarray):
+        candidates = set()
+        for band, buckets in enumerate(self._buckets):
+            candidates.update(buckets.get(self._band_key(signature, band), ()))
+        best, best_similarity = None, self.threshold
+        for index in candidates:
+            similarity = float(np.mean(self._signatures[index] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = index, similarity
+        return best
+
+    def _add(self, chunk: Document, signature: np.ndarray):
+        index = len(self._ids)
+        self._ids.append(chunk.id)
+        self._sources.append(chunk.meta.get("source"))
+        self._signatures.append(signature)
+        for band, buckets in enumerate(self._buckets):
+            buckets.setdefault(self._band_key(signature, band), []).append(index)
+
+    def _band_key(self, signature: np.ndarray, band: int) -> bytes:
+        return signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def take_updates(self) -> Dict[str, List[str]]:
+        """{chunk id: duplicate sources} of representatives that gained sources since the last call."""
+        updated, self._updated = self._updated, set()
+        return {self._ids[index]: self._duplicate_sources[index] for index in sorted(updated)}
+
+    def stats(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "bands": self.bands,
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "duplicates": self.duplicates,
+            "representatives": len(self._ids),
+            "representatives_with_duplicates": len(self._duplicate_sources),
+        }
@@ -0,0 +1,204 @@
+"""
+Client Pool — Shared clients for external vector databases.
+Pipelines on the same cluster reuse one client instead of each opening their
+own, keyed by (backend, endpoint, credential fingerprint) so different API
+keys never share a connection. HTTP clients keep VECTOR_POOL_CONNECTIONS
+keep-alive connections per host; Postgres gets a psycopg_pool ConnectionPool
+of VECTOR_POOL_PG_MIN..VECTOR_POOL_PG_MAX connections. Stores check their
+client out before every operation: a client unchecked for VECTOR_POOL_HEALTH_S
+is health-checked first and rebuilt if the check fails.
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+POOL_CONNECTIONS = int(os.environ.get("VECTOR_POOL_CONNECTIONS", "10"))
+PG_POOL_MIN = int(os.environ.get("VECTOR_POOL_PG_MIN", "1"))
+PG_POOL_MAX = int(os.environ.get("VECTOR_POOL_PG_MAX", "20"))
+HEALTH_CHECK_S = float(os.environ.get("VECTOR_POOL_HEALTH_S", "30"))
+
+# Checkout latencies kept per backend for the percentiles in stats()
+_LATENCY_WINDOW = 1000
+
+
+def credential_fingerprint(credential: Any) -> str:
+    """Short, non-reversible tag of a credential (API key, connection string...)."""
+    if not credential:
+        return ""
+    return hashlib.sha256(str(credential).encode()).hexdigest()[:12]
+
+
+class _Entry:
+    __slots__ = ("client", "create", "health_check", "close", "connections", "lock",
+                 "created", "checked", "checkouts", "rebuilds", "failed_checks")
+
+    def __init__(self, create, health_check, close, connections):
+        self.client = None
+        self.create = create
+        self.health_check = health_check
+        self.close = close
+        self.connections = connections
+        self.lock = threading.Lock()
+        self.created = 0.0
+        self.checked = 0.0
+        self.checkouts = 0
+        self.rebuilds = 0
+        self.failed_checks = 0
+
+
+class ClientPool:
+    """Thread-safe registry of long-lived clients, one per (backend, endpoint, credential)."""
+
+    def __init__(self, health_check_s: float = HEALTH_CHECK_S):
+        self.health_check_s = health_check_s
+        self._entries: Dict[tuple, _Entry] = {}
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+
+    def checkout(self, backend: str, endpoint: str, credential: Any, create: Callable[[], Any],
+                 health_check: Optional[Callable[[Any], Any]] = None,
+                 close: Optional[Callable[[Any], None]] = None,
+                 connections: Optional[Callable[[Any], dict]] = None):
+        """
+        The pooled client for (backend, endpoint, credential), created with
+        create() on first use. health_check(client) must raise or return
+        False for a dead client; close(client) releases a replaced one and
+        connections(client) reports its connection counts in stats().
+        """
+        start = time.perf_counter()
+        key = (backend, endpoint, credential_fingerprint(credential))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(create, health_check, close, connections)
+        with entry.lock:
+            now = time.monotonic()
+            if entry.client is not None and entry.health_check and now - entry.checked > self.health_check_s:
+                if not self._healthy(entry):
+                    entry.failed_checks += 1
+                    logger.warning(f"{backend} client for {endpoint} failed its health check — reconnecting")
+                    self._close(entry)
+                    entry.rebuilds += 1
+                entry.checked = now
+            if entry.client is None:
+                entry.client = entry.create()
+                entry.created = entry.checked = now
+                logger.info(f"{backend} client opened: {endpoint}")
+            entry.checkouts += 1
+            client = entry.client
+        with self._lock:
+            self._latencies.setdefault(backend, deque(maxlen=_LATENCY_WINDOW)).append(
+                (time.perf_counter() - start) * 1000)
+        return client
+
+    @staticmethod
+    def _healthy(entry: _Entry) -> bool:
+        try:
+            return entry.health_check(entry.client) is not False
+        except Exception as e:
+            logger.debug(f"Health check failed: {e}")
+            return False
+
+    @staticmethod
+    def _close(entry: _Entry):
+        client, entry.client = entry.client, None
+        if client is not None and entry.close:
+            try:
+                entry.close(client)
+            except Exception as e:
+                logger.debug(f"Closing pooled client failed: {e}")
+
+    def close_all(self):
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            with entry.lock:
+                self._close(entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = list(self._entries.items())
+            latencies = {backend: list(samples) for backend, samples in self._latencies.items()}
+        clients = []
+        for (backend, endpoint, fingerprint), entry in entries:
+            item = {
+                "backend": backend,
+                "endpoint": endpoint,
+                "credential": fingerprint,
+                "open": entry.client is not None,
+                "checkouts": entry.checkouts,
+                "rebuilds": entry.rebuilds,
+                "failed_health_checks": entry.failed_checks,
+                "age_s": round(time.monotonic() - entry.created, 1) if entry.client is not None else 0.0,
+            }
+            if entry.client is not None and entry.connections:
+                try:
+                    item["connections"] = entry.connections(entry.client)
+                except Exception as e:
+                    logger.debug(f"Connection stats unavailable: {e}")
+            clients.append(item)
+        return {
+            "clients": clients,
+            "checkout_ms": {
+                backend: {
+                    "count": len(samples),
+                    "p50": round(float(np.percentile(samples, 50)), 3),
+                    "p95": round(float(np.percentile(samples, 95)), 3),
+                }
+                for backend, samples in latencies.items() if samples
+            },
+            "http_connections_per_host": POOL_CONNECTIONS,
+            "pg_pool": {"min": PG_POOL_MIN, "max": PG_POOL_MAX},
+            "health_check_s": self.health_check_s,
+        }
+
+
+_pool = ClientPool()
+
+
+def get_client_pool() -> ClientPool:
+    return _pool
+
+
+# ═══════════════════════════════════════════════════════════
+#  Postgres
+# ═══════════════════════════════════════════════════════════
+
+def open_pg_pool(conninfo: str, create_extension: bool = True):
+    """
+    psycopg_pool ConnectionPool whose connections are set up like the ones
+    PgvectorDocumentStore opens itself (autocommit, pgvector types) and
+    validated each time they are handed out.
+    """
+    from psycopg_pool import ConnectionPool
+    from pgvector.psycopg import register_vector
+
+    def configure(connection):
+        connection.autocommit = True
+        if create_extension:
+            connection.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        register_vector(connection)
+
+    def reset(connection):
+        # Stores change session settings (hnsw.ef_search) on their connection
+        connection.execute("RESET ALL")
+
+    return ConnectionPool(
+        conninfo, min_size=PG_POOL_MIN, max_size=PG_POOL_MAX, configure=configure, reset=reset,
+        check=ConnectionPool.check_connection, name="pgvector", open=True,
+    )
+
+
+def pg_pool_connections(pool) -> dict:
+    stats = pool.get_stats()
+    return {"size": stats.get("pool_size", 0), "idle": stats.get("pool_available", 0),
+            "waiting": stats.get("requests_waiting", 0)}
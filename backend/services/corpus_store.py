@@ -0,0 +1,326 @@
+"""
+Corpus Store — Indexed, append-only per-RAG corpus of ingested sources.
+Replaces the free-text scraped_data.txt: every source (URL or filename) is one
+JSON record in data/<ragName>/corpus.jsonl, and corpus.idx.json keeps the
+byte offset, length, content hash and liveness of each record. Records can be
+read lazily or streamed one at a time, identical records are deduplicated by
+hash, and superseded records are dropped by compaction, which waits until no
+reader is streaming the file.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+CORPUS_FILE = "corpus.jsonl"
+INDEX_FILE = "corpus.idx.json"
+LEGACY_FILE = "scraped_data.txt"
+LEGACY_DELIMITER = "=" * 50
+
+# Compact once dead records exceed this share of the file (and this many bytes)
+COMPACT_DEAD_RATIO = 0.5
+COMPACT_MIN_DEAD_BYTES = 1024 * 1024
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def source_of(text: str) -> Optional[str]:
+    """Source named by a 'Source: <url or filename>' first line, if any."""
+    first_line = text.split("\n", 1)[0].strip()
+    if first_line.startswith("Source:"):
+        return first_line[len("Source:"):].strip() or None
+    return None
+
+
+# ═══════════════════════════════════════════════════════════
+#  Corpus Store
+# ═══════════════════════════════════════════════════════════
+
+class CorpusStore:
+    """
+    Append-only record file plus an offset index.
+
+    Index entries: {"hash", "source", "offset", "length", "chars", "live"}.
+    Adding a record whose source already exists supersedes the old record;
+    adding one whose hash already exists just revives it. Liveness changes are
+    logged as small {"op", "hash"} marker lines so the index can be rebuilt.
+    """
+
+    def __init__(self, rag_dir: str):
+        self.rag_dir = rag_dir
+        self.corpus_path = os.path.join(rag_dir, CORPUS_FILE)
+        self.index_path = os.path.join(rag_dir, INDEX_FILE)
+        self._lock = threading.RLock()
+        # Open iter_records() streams; compaction is deferred while any is active
+        self._readers = 0
+        self._compact_pending = False
+        os.makedirs(rag_dir, exist_ok=True)
+        self._load_index()
+
+    # ── Index persistence ────────────────────────────────
+    def _load_index(self):
+        self._entries: List[dict] = []
+        self._by_hash: Dict[str, dict] = {}
+        self._by_source: Dict[str, dict] = {}
+        self._marker_bytes = 0
+        if os.path.exists(self.index_path) and os.path.exists(self.corpus_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self._entries = index.get("records", [])
+            self._marker_bytes = index.get("marker_bytes", 0)
+        elif os.path.exists(self.corpus_path):
+            self._rebuild_index()
+        elif os.path.exists(os.path.join(self.rag_dir, LEGACY_FILE)):
+            self._migrate_legacy()
+        for entry in self._entries:
+            self._track(entry)
+
+    def _track(self, entry: dict):
+        self._by_hash[entry["hash"]] = entry
+        if entry["live"] and entry.get("source"):
+            self._by_source[entry["source"]] = entry
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "marker_bytes": self._marker_bytes, "records": self._entries}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _rebuild_index(self):
+        """Recreate the index by replaying the record file (index lost or corrupt)."""
+        logger.warning(f"Rebuilding corpus index for {self.rag_dir}")
+        entries, by_hash = [], {}
+        marker_bytes = 0
+        with open(self.corpus_path, "rb") as f:
+            offset = 0
+            for line in f:
+                record = json.loads(line)
+                if "op" in record:
+                    # Liveness marker written when a record was superseded or revived
+                    if record["hash"] in by_hash:
+                        by_hash[record["hash"]]["live"] = record["op"] == "keep"
+                    marker_bytes += len(line)
+                else:
+                    entry = {"hash": record["hash"], "source": record.get("source"), "offset": offset,
+                             "length": len(line), "chars": len(record["text"]), "live": True}
+                    entries.append(entry)
+                    by_hash[entry["hash"]] = entry
+                offset += len(line)
+        self._entries = entries
+        self._marker_bytes = marker_bytes
+        self._save_index()
+
+    def _migrate_legacy(self):
+        """Import a legacy scraped_data.txt, streaming it one delimited part at a time."""
+        legacy_path = os.path.join(self.rag_dir, LEGACY_FILE)
+
+        def legacy_parts():
+            buffer = []
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip() == LEGACY_DELIMITER:
+                        yield "".join(buffer).strip()
+                        buffer = []
+                    else:
+                        buffer.append(line)
+            yield "".join(buffer).strip()
+
+        stats = self._append(legacy_parts())
+        logger.info(f"Migrated {LEGACY_FILE} for {self.rag_dir}: {stats['added']} records")
+
+    # ── Writes ───────────────────────────────────────────
+    def _set_live(self, f, entry: dict, live: bool):
+        """Flip a record's liveness and log it so the index can be rebuilt exactly."""
+        entry["live"] = live
+        marker = json.dumps({"op": "keep" if live else "drop", "hash": entry["hash"]}).encode("utf-8") + b"\n"
+        f.write(marker)
+        self._marker_bytes += len(marker)
+        if live:
+            self._track(entry)
+        elif entry.get("source") and self._by_source.get(entry["source"]) is entry:
+            del self._by_source[entry["source"]]
+
+    def _append(self, texts: Iterable[str], replace: bool = False) -> dict:
+        stats = {"added": 0, "duplicates": 0, "replaced": 0}
+        with open(self.corpus_path, "ab") as f:
+            if replace:
+                for entry in self._entries:
+                    if entry["live"]:
+                        self._set_live(f, entry, False)
+            for text in texts:
+                if not text or not text.strip():
+                    continue
+                digest = _hash_text(text)
+                source = source_of(text)
+                existing = self._by_hash.get(digest)
+                if existing is not None and existing["live"]:
+                    stats["duplicates"] += 1
+                    continue
+
+                previous = self._by_source.get(source) if source else None
+                if previous is not None:
+                    self._set_live(f, previous, False)
+                    stats["replaced"] += 1
+
+                if existing is not None:
+                    # Same content seen before: revive the stored record
+                    self._set_live(f, existing, True)
+                    stats["added"] += 1
+                    continue
+
+                line = json.dumps({"source": source, "hash": digest, "added_at": time.time(), "text": text},
+                                  ensure_ascii=False).encode("utf-8") + b"\n"
+                entry = {"hash": digest, "source": source, "offset": f.tell(),
+                         "length": len(line), "chars": len(text), "live": True}
+                f.write(line)
+                self._entries.append(entry)
+                self._track(entry)
+                stats["added"] += 1
+        self._save_index()
+        return stats
+
+    def add(self, text: str) -> bool:
+        """Add one source text. Returns False if an identical record is already live."""
+        return self.add_many([text])["added"] == 1
+
+    def add_many(self, texts: Iterable[str]) -> dict:
+        """Add several source texts; returns {"added", "duplicates", "replaced"}."""
+        with self._lock:
+            stats = self._append(texts)
+            self._maybe_compact()
+            return stats
+
+    def replace_all(self, texts: Iterable[str]) -> dict:
+        """Make exactly these texts the live corpus (previous records become dead)."""
+        with self._lock:
+            stats = self._append(texts, replace=True)
+            self._maybe_compact()
+            return stats
+
+    # ── Reads ────────────────────────────────────────────
+    def _live_entries(self) -> List[dict]:
+        with self._lock:
+            return [dict(e) for e in self._entries if e["live"]]
+
+    def iter_records(self) -> Iterator[dict]:
+        """Stream live records in insertion order, reading one record at a time."""
+        # Snapshot and open together, so the offsets belong to the file being read
+        with self._lock:
+            entries = self._live_entries()
+            if not entries:
+                return
+            f = open(self.corpus_path, "rb")
+            self._readers += 1
+        try:
+            for entry in entries:
+                f.seek(entry["offset"])
+                yield json.loads(f.read(entry["length"]))
+        finally:
+            f.close()
+            with self._lock:
+                self._readers -= 1
+                if not self._readers and self._compact_pending:
+                    self.compact()
+
+    def iter_texts(self) -> Iterator[str]:
+        for record in self.iter_records():
+            yield record["text"]
+
+    def read_text_prefix(self, max_chars: int) -> str:
+        """Concatenate records until max_chars, reading only the records needed."""
+        parts, total = [], 0
+        for text in self.iter_texts():
+            parts.append(text)
+            total += len(text) + 2
+            if total >= max_chars:
+                break
+        content = "\n\n".join(parts)
+        if len(content) > max_chars:
+            content = content[:max_chars] + "\n... [truncated]"
+        return content
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for e in self._entries if e["live"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            live = [e for e in self._entries if e["live"]]
+            dead_bytes = self._dead_bytes()
+            return {
+                "records": len(live),
+                "characters": sum(e["chars"] for e in live),
+                "file_bytes": os.path.getsize(self.corpus_path) if os.path.exists(self.corpus_path) else 0,
+                "dead_records": len(self._entries) - len(live),
+                "dead_bytes": dead_bytes,
+            }
+
+    # ── Compaction ───────────────────────────────────────
+    def _dead_bytes(self) -> int:
+        return self._marker_bytes + sum(e["length"] for e in self._entries if not e["live"])
+
+    def _maybe_compact(self):
+        dead_bytes = self._dead_bytes()
+        total = self._marker_bytes + sum(e["length"] for e in self._entries)
+        if dead_bytes >= COMPACT_MIN_DEAD_BYTES and dead_bytes > total * COMPACT_DEAD_RATIO:
+            self.compact()
+
+    def compact(self) -> dict:
+        """Rewrite the record file with live records only (once no reader streams it)."""
+        with self._lock:
+            if self._readers:
+                self._compact_pending = True
+                return {"deferred": True, "readers": self._readers}
+            self._compact_pending = False
+            before = os.path.getsize(self.corpus_path) if os.path.exists(self.corpus_path) else 0
+            tmp_path = self.corpus_path + ".tmp"
+            entries = []
+            with open(self.corpus_path, "rb") as src, open(tmp_path, "wb") as dst:
+                for entry in self._entries:
+                    if not entry["live"]:
+                        continue
+                    src.seek(entry["offset"])
+                    data = src.read(entry["length"])
+                    entries.append({**entry, "offset": dst.tell()})
+                    dst.write(data)
+            os.replace(tmp_path, self.corpus_path)
+            self._entries = entries
+            self._marker_bytes = 0
+            self._by_hash, self._by_source = {}, {}
+            for entry in entries:
+                self._track(entry)
+            self._save_index()
+            after = os.path.getsize(self.corpus_path)
+            logger.info(f"Compacted corpus {self.rag_dir}: {before} → {after} bytes")
+            return {"bytes_before": before, "bytes_after": after, "records": len(entries)}
+
+
+# ═══════════════════════════════════════════════════════════
+#  Public API
+# ═══════════════════════════════════════════════════════════
+
+_stores: Dict[str, CorpusStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_corpus(rag_name: str) -> CorpusStore:
+    """Return the (shared) corpus store for a RAG, creating it on first use."""
+    rag_dir = os.path.join(DATA_DIR, rag_name)
+    with _stores_lock:
+        if rag_dir not in _stores:
+            _stores[rag_dir] = CorpusStore(rag_dir)
+        return _stores[rag_dir]
+
+
+def corpus_exists(rag_name: str) -> bool:
+    rag_dir = os.path.join(DATA_DIR, rag_name)
+    return any(os.path.exists(os.path.join(rag_dir, name)) for name in (CORPUS_FILE, LEGACY_FILE))
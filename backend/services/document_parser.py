@@ -119,13 +119,18 @@ def parse_document(file_path: str) -> str:
 # ═══════════════════════════════════════════════════════════
 
 def _parse_pdf(file_path: str) -> str:
-    """Extract text from PDF, falling back to OCR for image-based PDFs."""
+    """
+    Extract text from PDF, falling back to OCR for image-based PDFs.
+    Pages (each followed by its tables) are separated by form feeds, which the
+    splitter turns into a page_number on every chunk.
+    """
     if not PDF_AVAILABLE:
         return "PDF library (pdfplumber) is not installed."
 
-    text_parts = []
+    pages = []
     with pdfplumber.open(file_path) as pdf:
         for page in pdf.pages:
+            text_parts = []
             text = page.extract_text()
             if text:
                 text_parts.append(text)
@@ -133,16 +138,14 @@ def _parse_pdf(file_path: str) -> str:
                 img = page.to_image(resolution=300).original
                 text_parts.append(pytesseract.image_to_string(img))
 
-    # Also extract tables
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            tables = page.extract_tables()
-            for table in tables:
+            # Also extract tables
+            for table in page.extract_tables():
                 for row in table:
                     clean_row = [str(cell or '') for cell in row]
                     text_parts.append(' | '.join(clean_row))
+            pages.append('\n'.join(text_parts))
 
-    return '\n'.join(text_parts)
+    return '\f'.join(pages)
 
 
 def _parse_text(file_path: str) -> str:
@@ -0,0 +1,49 @@
+"""
+Elasticsearch Store — ElasticsearchDocumentStore on a pooled Elasticsearch client.
+Stores on the same hosts and API key share one client, whose node pool keeps
+VECTOR_POOL_CONNECTIONS keep-alive connections per node.
+"""
+import logging
+import threading
+
+from haystack_integrations.document_stores.elasticsearch import ElasticsearchDocumentStore
+
+from .client_pool import POOL_CONNECTIONS, get_client_pool
+
+logger = logging.getLogger(__name__)
+
+
+class PooledElasticsearchDocumentStore(ElasticsearchDocumentStore):
+    """ElasticsearchDocumentStore that checks its client out of the shared pool before each operation."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._index_ready = False
+        self._setup_lock = threading.Lock()
+
+    def _ensure_initialized(self) -> None:
+        from elasticsearch import Elasticsearch
+
+        api_key = self._handle_auth()
+        hosts = self._hosts if isinstance(self._hosts, (list, tuple)) else [self._hosts]
+        self._client = get_client_pool().checkout(
+            "elasticsearch", ",".join(str(host) for host in hosts), api_key,
+            create=lambda: Elasticsearch(self._hosts, api_key=api_key, headers=self._headers,
+                                         **{"connections_per_node": POOL_CONNECTIONS, **self._kwargs}),
+            health_check=lambda client: client.ping(),
+            close=lambda client: client.close(),
+        )
+        if self._index_ready:
+            return
+        with self._setup_lock:
+            if not self._index_ready:
+                # Raises if the cluster is unreachable
+                self._client.info()
+                mappings = self._custom_mapping if self._custom_mapping else self._default_mappings
+                if not self._client.indices.exists(index=self._index):
+                    self._client.indices.create(index=self._index, mappings=mappings)
+                self._index_ready = True
+
+    def close(self) -> None:
+        """Drop the reference; the pooled client stays open for other stores."""
+        self._client = None
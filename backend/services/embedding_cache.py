@@ -0,0 +1,138 @@
+"""
+Embedding Cache — Persistent, content-addressed cache of document embeddings.
+Vectors are keyed by (embedding model id, chunk content hash) and stored as
+float32 blobs in SQLite under data/stores, with size-bounded LRU eviction.
+Redeploying an unchanged corpus only embeds the chunks that are new.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .vector_store_manager import STORES_DIR
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.path.join(STORES_DIR, "embedding_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "500000"))
+
+# SQLite limits the number of bound parameters per statement
+_SQL_CHUNK = 500
+
+
+def content_hash(text: str) -> str:
+    """Stable content address for a chunk of text."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def cache_model_id(embedding_model: str, embedder=None) -> str:
+    """Identify an embedding model for cache keys (config id + underlying model name)."""
+    underlying = getattr(embedder, "model", None) if embedder is not None else None
+    return f"{embedding_model}:{underlying}" if underlying else embedding_model
+
+
+# ═══════════════════════════════════════════════════════════
+#  SQLite-backed LRU Cache
+# ═══════════════════════════════════════════════════════════
+
+class EmbeddingCache:
+    """
+    Persistent LRU cache of embedding vectors.
+    Thread-safe; a single SQLite connection is shared behind a lock.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL, PRIMARY KEY (model, hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_lru ON embeddings(last_used)")
+        self._conn.commit()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """Return {hash: vector} for every cached hash and refresh their LRU position."""
+        keys = list(dict.fromkeys(hashes))
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), _SQL_CHUNK):
+                part = keys[i:i + _SQL_CHUNK]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({marks})",
+                    [model, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(now, model, h) for h in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, List[float]]]):
+        """Insert or refresh vectors, then evict least-recently-used entries over the limit."""
+        now = time.time()
+        rows = [(model, h, np.asarray(v, dtype=np.float32).tobytes(), now) for h, v in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            logger.info(f"Embedding cache evicted {excess} least-recently-used vectors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {"entries": count, "max_entries": self.max_entries, "path": self.path}
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the process-wide embedding cache (None if it cannot be opened)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = EmbeddingCache()
+            except Exception as e:
+                logger.warning(f"Embedding cache unavailable: {e}")
+                return None
+        return _cache
@@ -1,6 +1,7 @@
 """
 Embedding Service — Factory for creating embedding models.
 Supports local BGE-m3, OpenAI Ada, and Mistral embeddings.
+Local models are loaded once per process through the shared model registry.
 """
 import logging
 from typing import Optional
@@ -39,10 +40,13 @@ def get_text_embedder(model_id: str, api_key: Optional[str] = None):
 
 
 # ── Local BGE-m3 (sentence-transformers) ──────────────────
+LOCAL_BGE_MODEL = "BAAI/bge-small-en-v1.5"
+
+
 def _local_bge_doc_embedder():
     try:
-        from haystack.components.embedders import SentenceTransformersDocumentEmbedder
-        return SentenceTransformersDocumentEmbedder(model="BAAI/bge-small-en-v1.5")
+        from .model_registry import SharedDocumentEmbedder
+        return SharedDocumentEmbedder(model=LOCAL_BGE_MODEL)
     except ImportError:
         logger.error("sentence-transformers not installed")
         return None
@@ -50,8 +54,8 @@ def _local_bge_doc_embedder():
 
 def _local_bge_text_embedder():
     try:
-        from haystack.components.embedders import SentenceTransformersTextEmbedder
-        return SentenceTransformersTextEmbedder(model="BAAI/bge-small-en-v1.5")
+        from .model_registry import SharedTextEmbedder
+        return SharedTextEmbedder(model=LOCAL_BGE_MODEL)
     except ImportError:
         logger.error("sentence-transformers not installed")
         return None
@@ -0,0 +1,469 @@
+"""
+FAISS Store — Configurable ANN index types for the FAISS document store.
+dynamicConfig.faissIndex selects Flat, HNSW(M, efSearch), IVF(nlist, nprobe)
+or IVF-PQ(nlist, m, nbits, nprobe, optional exact refine). IVF variants are trained during deploy on
+a sample of the embeddings being ingested; named collections are persisted
+under STORES_DIR/faiss and reloaded memory-mapped. Vectors are L2-normalized
+and searched by inner product, so scores are cosine similarities. Filters on
+indexed source fields (see metadata_index) are resolved to candidate ids
+first: small candidate sets are scored exactly from their stored vectors,
+larger ones are searched through a FAISS ID selector. Deploys of the same
+named collection share one open store (see open_faiss_store).
+"""
+import os
+import json
+import math
+import time
+import logging
+import threading
+import weakref
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from haystack import Document
+from haystack.document_stores.errors import DuplicateDocumentError
+from haystack.document_stores.types import DuplicatePolicy
+
+import faiss
+from haystack_integrations.document_stores.faiss import FAISSDocumentStore
+
+from .metadata_index import MetadataIndex
+from .multi_retriever import top_k_indices
+from .vector_store_manager import STORES_DIR
+
+logger = logging.getLogger(__name__)
+
+FAISS_DIR = os.path.join(STORES_DIR, "faiss")
+
+INDEX_TYPES = ("flat", "hnsw", "ivf", "ivf_pq")
+DEFAULT_EF_SEARCH = 64
+DEFAULT_NPROBE = 16
+# Upper bound on buffered vectors before IVF training is forced mid-deploy
+MAX_TRAIN_POINTS = 100_000
+# Deleted vectors stay in the index (excluded by an ID selector at search
+# time) until commit_index() rebuilds it once this share is dead
+MAX_TOMBSTONE_RATIO = 0.2
+# Without selector support, searches over tombstones fetch this many times
+# top_k and double it while too few live hits come back
+TOMBSTONE_OVERFETCH = 2
+# Filter candidates up to this many are scored exactly from reconstructed vectors
+EXACT_FILTER_MAX = 20_000
+
+# Memory-map flat codes too where the installed FAISS supports it
+_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+
+def parse_index_spec(spec: Union[str, Dict[str, Any], None]) -> Dict[str, Any]:
+    """Normalize "hnsw" or {"type": "ivf_pq", "nlist": 1024, ...} into a spec dict."""
+    if not spec:
+        return {"type": "flat"}
+    parsed = {"type": spec} if isinstance(spec, str) else dict(spec)
+    parsed["type"] = str(parsed.get("type", "flat")).lower().replace("-", "_")
+    if parsed["type"] not in INDEX_TYPES:
+        logger.warning(f"Unknown FAISS index type '{parsed['type']}', using flat")
+        parsed["type"] = "flat"
+    return parsed
+
+
+def _pq_subquantizers(dim: int, wanted: int) -> int:
+    """Largest divisor of dim not above wanted (PQ splits vectors evenly)."""
+    for m in range(min(wanted, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+class TunedFAISSDocumentStore(FAISSDocumentStore):
+    """
+    FAISSDocumentStore with a selectable ANN index, train-on-deploy and
+    memory-mapped persistence.
+
+    The index is created on the first write, from the actual embedding size.
+    Trainable (IVF) indexes buffer vectors until commit_index() or until
+    MAX_TRAIN_POINTS are pending, then train on a random sample and add the
+    buffer. commit_index() also persists the store when it has an index_path.
+    A memory-mapped index is read-only; the first write reloads it into RAM.
+    Documents are kept without their embeddings, which live in the index.
+    """
+
+    def __init__(self, index_path: Optional[str] = None, spec: Union[str, Dict[str, Any], None] = None,
+                 ef_search: int = DEFAULT_EF_SEARCH, nprobe: int = DEFAULT_NPROBE):
+        self.spec = parse_index_spec(spec)
+        self.ef_search = int(self.spec.get("efSearch", ef_search))
+        self.nprobe = int(self.spec.get("nprobe", nprobe))
+        self.persistent = bool(index_path)
+        self._lock = threading.RLock()
+        self._pending_ids: List[np.ndarray] = []
+        self._pending_vectors: List[np.ndarray] = []
+        self._mmapped = False
+        self._meta_index: Optional[MetadataIndex] = None  # over int ids, built on first filtered search
+        self._dead: Optional[np.ndarray] = None  # tombstoned int ids, collected on first search
+        super().__init__(index_path=index_path, index_string=self.spec["type"], embedding_dim=0)
+
+    # ── Index construction ───────────────────────────────
+    def _create_new_index(self) -> None:
+        self.index = None  # built lazily once the embedding size is known
+
+    def _factory_string(self, dim: int, n_train: int) -> str:
+        kind = self.spec["type"]
+        if kind == "hnsw":
+            return f"HNSW{int(self.spec.get('M', 32))}"
+        if kind == "flat":
+            return "Flat"
+        # ~39 training points per centroid is FAISS' minimum; default to 4·sqrt(n) lists
+        nlist = int(self.spec.get("nlist") or 4 * math.sqrt(max(n_train, 1)))
+        nlist = max(1, min(nlist, n_train // 39 or 1))
+        if kind == "ivf":
+            return f"IVF{nlist},Flat"
+        # Default of 8 dimensions per sub-quantizer; coarser codes lose too much recall
+        m = _pq_subquantizers(dim, int(self.spec.get("m", max(1, dim // 8))))
+        nbits = min(int(self.spec.get("nbits", 8)), max(1, int(math.log2(max(n_train, 2)))))
+        # "refine" re-ranks PQ candidates exactly (keeps float vectors in RAM)
+        return f"IVF{nlist},PQ{m}x{nbits}{',RFlat' if self.spec.get('refine') else ''}"
+
+    def _build_index(self, dim: int, n_train: int = 0):
+        self.embedding_dim = dim
+        self.index_string = self._factory_string(dim, n_train)
+        base = faiss.index_factory(dim, self.index_string, faiss.METRIC_INNER_PRODUCT)
+        if self.spec["type"] == "hnsw":
+            base.hnsw.efConstruction = int(self.spec.get("efConstruction", 40))
+        # IDMap2 can reconstruct vectors, which HNSW rebuilds rely on
+        self.index = faiss.IndexIDMap2(base)
+        self._apply_search_params()
+
+    def set_search_params(self, ef_search: int, nprobe: int):
+        with self._lock:
+            self.ef_search = int(ef_search)
+            self.nprobe = int(nprobe)
+            if self.index is not None:
+                self._apply_search_params()
+
+    def _apply_search_params(self):
+        inner = faiss.downcast_index(self.index.index)
+        if isinstance(inner, faiss.IndexRefine):
+            inner.k_factor = float(self.spec.get("rescoreMultiplier", 4))
+            inner = faiss.downcast_index(inner.base_index)
+        if isinstance(inner, faiss.IndexHNSW):
+            inner.hnsw.efSearch = self.ef_search
+        ivf = faiss.try_extract_index_ivf(inner)
+        if ivf is not None:
+            ivf.nprobe = min(self.nprobe, ivf.nlist)
+
+    def _train(self):
+        """Train the (IVF) index on a sample of the buffered vectors and add them all."""
+        if not self._pending_vectors:
+            return
+        vectors = np.concatenate(self._pending_vectors)
+        ids = np.concatenate(self._pending_ids)
+        self._pending_vectors, self._pending_ids = [], []
+        start = time.perf_counter()
+        if self.index is None or self.index.ntotal == 0:
+            # Size nlist / PQ codebooks from the data actually available
+            self._build_index(vectors.shape[1], len(vectors))
+        if not self.index.is_trained:
+            sample_size = min(len(vectors), MAX_TRAIN_POINTS)
+            sample = vectors[np.random.default_rng(0).choice(len(vectors), sample_size, replace=False)]
+            self.index.train(sample)
+        self.index.add_with_ids(vectors, ids)
+        logger.info(f"FAISS {self.index_string} trained on {min(len(vectors), MAX_TRAIN_POINTS)} vectors, "
+                    f"{len(vectors)} added in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def _trainable(self) -> bool:
+        return self.spec["type"] in ("ivf", "ivf_pq")
+
+    def _ensure_writable(self):
+        if self._mmapped:
+            self.index = faiss.read_index(f"{self.index_path}.faiss")
+            self._apply_search_params()
+            self._mmapped = False
+
+    # ── Writes ───────────────────────────────────────────
+    def write_documents(self, documents: List[Document], policy: DuplicatePolicy = DuplicatePolicy.FAIL) -> int:
+        with self._lock:
+            self._ensure_writable()
+            self._meta_index = None
+            self._dead = None
+            if policy in (DuplicatePolicy.FAIL, DuplicatePolicy.NONE):
+                existing = [doc.id for doc in documents if doc.id in self.documents]
+                if existing:
+                    raise DuplicateDocumentError(f"Document with id '{existing[0]}' already exists.")
+
+            ids, vectors, written = [], [], 0
+            for doc in documents:
+                if doc.id in self.documents:
+                    if policy == DuplicatePolicy.SKIP:
+                        continue
+                    self.delete_documents([doc.id])
+                self.documents[doc.id] = replace(doc, embedding=None)
+                if doc.embedding is not None:
+                    int_id = self._next_id
+                    self._next_id += 1
+                    self.id_map[int_id] = doc.id
+                    self.inverse_id_map[doc.id] = int_id
+                    ids.append(int_id)
+                    vectors.append(doc.embedding)
+                written += 1
+            if vectors:
+                self._add(np.asarray(ids, dtype=np.int64), np.asarray(vectors, dtype=np.float32))
+            return written
+
+    def _add(self, ids: np.ndarray, vectors: np.ndarray):
+        faiss.normalize_L2(vectors)
+        if self._trainable() and (self.index is None or not self.index.is_trained):
+            self._pending_ids.append(ids)
+            self._pending_vectors.append(vectors)
+            if sum(len(v) for v in self._pending_vectors) >= MAX_TRAIN_POINTS:
+                self._train()
+            return
+        if self.index is None:
+            self._build_index(vectors.shape[1])
+        self.index.add_with_ids(vectors, ids)
+
+    def delete_documents(self, document_ids: List[str]) -> None:
+        with self._lock:
+            self._ensure_writable()
+            self._meta_index = None
+            self._dead = None
+            removed = []
+            for doc_id in document_ids:
+                if self.documents.pop(doc_id, None) is None:
+                    continue
+                int_id = self.inverse_id_map.pop(doc_id, None)
+                if int_id is not None:
+                    del self.id_map[int_id]
+                    removed.append(int_id)
+            if not removed:
+                return
+            removed = np.asarray(removed, dtype=np.int64)
+            # Drop still-buffered (untrained) vectors
+            for i, ids in enumerate(self._pending_ids):
+                keep = ~np.isin(ids, removed)
+                self._pending_ids[i], self._pending_vectors[i] = ids[keep], self._pending_vectors[i][keep]
+            # Indexed vectors are only unmapped: remove_ids on an IDMap-wrapped
+            # IVF index breaks the id map (FAISS aborts), HNSW cannot remove at all.
+            # commit_index() compacts them away.
+
+    def delete_all_documents(self) -> None:
+        with self._lock:
+            super().delete_all_documents()
+            self._pending_ids, self._pending_vectors = [], []
+            self._mmapped = False
+            self._meta_index = None
+            self._dead = None
+
+    @property
+    def _tombstones(self) -> int:
+        """Vectors in the index whose documents were deleted or overwritten."""
+        if self.index is None:
+            return 0
+        pending = sum(len(ids) for ids in self._pending_ids)
+        return max(0, self.index.ntotal - (len(self.id_map) - pending))
+
+    def _dead_ids(self) -> np.ndarray:
+        """Int ids of the tombstoned vectors, cached until the next write or delete."""
+        with self._lock:
+            if self._dead is None:
+                live = np.fromiter(self.id_map.keys(), dtype=np.int64, count=len(self.id_map))
+                self._dead = np.setdiff1d(faiss.vector_to_array(self.index.id_map), live)
+            return self._dead
+
+    def _rebuild(self):
+        """Rebuild the index from its live vectors (nothing pending); IVF variants keep their training."""
+        live = np.fromiter(self.id_map.keys(), dtype=np.int64, count=len(self.id_map))
+        ivf = faiss.try_extract_index_ivf(faiss.downcast_index(self.index.index))
+        if ivf is not None:
+            ivf.make_direct_map(True)  # IVF lists keep no id -> vector map otherwise
+        vectors = self.index.reconstruct_batch(live) if live.size else None
+        if self._trainable():
+            base = faiss.clone_index(self.index.index)
+            base.reset()
+            self.index = faiss.IndexIDMap2(base)
+            self._apply_search_params()
+        else:
+            self._build_index(self.embedding_dim)
+        if vectors is not None:
+            self.index.add_with_ids(vectors, live)
+
+    def commit_index(self):
+        """Finish a deploy: train pending vectors, compact, and persist if named."""
+        with self._lock:
+            if self._pending_vectors:
+                self._ensure_writable()
+                self._train()
+            if self.index is not None and self._tombstones > MAX_TOMBSTONE_RATIO * max(self.index.ntotal, 1):
+                self._ensure_writable()
+                dead = self._tombstones
+                self._rebuild()
+                self._dead = None
+                logger.info(f"FAISS {self.index_string} compacted: {dead} deleted vectors dropped")
+            if self.index_path:
+                self.save(self.index_path)
+
+    # ── Persistence ──────────────────────────────────────
+    def save(self, index_path: str) -> None:
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        if self.index is not None and not self._mmapped:
+            faiss.write_index(self.index, f"{index_path}.faiss.tmp")
+            os.replace(f"{index_path}.faiss.tmp", f"{index_path}.faiss")
+        data = {
+            "documents": [doc.to_dict() for doc in self.documents.values()],
+            "id_map": self.id_map,
+            "inverse_id_map": self.inverse_id_map,
+            "next_id": self._next_id,
+            "spec": self.spec,
+            "index_string": self.index_string,
+        }
+        with open(f"{index_path}.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(f"{index_path}.json.tmp", f"{index_path}.json")
+
+    def load(self, index_path: str) -> None:
+        # Memory-mapped instead of copied into RAM; documents carry no embeddings
+        self.index = faiss.read_index(f"{index_path}.faiss", _MMAP_FLAGS)
+        self._mmapped = True
+        self._meta_index = None
+        self._dead = None
+        with open(f"{index_path}.json", encoding="utf-8") as f:
+            data = json.load(f)
+        self.documents = {d["id"]: Document.from_dict(d) for d in data["documents"]}
+        self.id_map = {int(k): v for k, v in data["id_map"].items()}
+        self.inverse_id_map = data["inverse_id_map"]
+        self._next_id = data["next_id"]
+        self.index_string = data.get("index_string", self.index_string)
+        self.embedding_dim = self.index.d
+        self._apply_search_params()
+        logger.info(f"FAISS index loaded (mmap): {index_path} — {self.index.ntotal} vectors, {self.index_string}")
+
+    # ── Search ───────────────────────────────────────────
+    def _candidate_ids(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Int ids of the vectors that can match filters, or None if the metadata index cannot tell."""
+        with self._lock:
+            if self._meta_index is None:
+                self._meta_index = MetadataIndex()
+                self._meta_index.add_many(
+                    (int_id, self.documents[doc_id].meta) for doc_id, int_id in self.inverse_id_map.items())
+            return self._meta_index.candidates(filters)
+
+    def _selector_params(self, selector, inner=None):
+        inner = faiss.downcast_index(self.index.index) if inner is None else inner
+        if isinstance(inner, faiss.IndexRefine):
+            base = self._selector_params(selector, faiss.downcast_index(inner.base_index))
+            params = faiss.IndexRefineSearchParameters(sel=selector, k_factor=inner.k_factor, base_index_params=base)
+            params.referenced_objects = [base]  # params hold a raw pointer to base
+            return params
+        if isinstance(inner, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+        ivf = faiss.try_extract_index_ivf(inner)
+        if ivf is not None:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=min(self.nprobe, ivf.nlist))
+        return faiss.SearchParameters(sel=selector)
+
+    def _search_candidates(self, index, query: np.ndarray, candidates: np.ndarray,
+                           fetch_k: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(scores, ids) of the best candidates, or None if the index supports neither path."""
+        if len(candidates) <= EXACT_FILTER_MAX:
+            try:
+                scores = index.reconstruct_batch(candidates) @ query[0]
+                order = top_k_indices(scores, min(fetch_k, len(scores)))
+                return scores[order], candidates[order]
+            except RuntimeError:
+                pass  # IVF indexes keep no id -> vector map
+        try:
+            selector = faiss.IDSelectorBatch(candidates)
+            scores, ids = index.search(query, min(fetch_k, len(candidates)), params=self._selector_params(selector))
+            return scores[0], ids[0]
+        except RuntimeError as e:
+            logger.debug(f"FAISS {self.index_string} cannot search an id subset: {e}")
+            return None
+
+    def _search_live(self, index, query: np.ndarray, fetch_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(scores, ids) of the best fetch_k vectors whose documents still exist."""
+        if not self._tombstones:
+            scores, ids = index.search(query, min(fetch_k, index.ntotal))
+            return scores[0], ids[0]
+        dead = self._dead_ids()
+        live = index.ntotal - len(dead)
+        if live <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        try:
+            batch = faiss.IDSelectorBatch(dead)
+            selector = faiss.IDSelectorNot(batch)  # does not own batch; both stay referenced here
+            scores, ids = index.search(query, min(fetch_k, live), params=self._selector_params(selector))
+            return scores[0], ids[0]
+        except RuntimeError as e:
+            logger.debug(f"FAISS {self.index_string} cannot exclude deleted ids: {e}")
+        k = min(fetch_k * TOMBSTONE_OVERFETCH, index.ntotal)
+        while True:
+            scores, ids = index.search(query, k)
+            found = sum(1 for int_id in ids[0].tolist() if int_id in self.id_map)
+            if found >= min(fetch_k, live) or k >= index.ntotal:
+                return scores[0], ids[0]
+            k = min(k * 2, index.ntotal)
+
+    def search(self, query_embedding: List[float], top_k: int = 10,
+               filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        if self._pending_vectors:
+            with self._lock:
+                self._train()
+        index = self.index
+        if index is None or index.ntotal == 0:
+            return []
+        query = np.asarray([query_embedding], dtype=np.float32)
+        faiss.normalize_L2(query)
+        # Post-filtered searches need more than top_k hits to fill top_k
+        fetch_k = top_k * 10 if filters else top_k
+        candidates = self._candidate_ids(filters) if filters else None
+        hits = None
+        if candidates is not None:
+            if not candidates.size:
+                return []
+            hits = self._search_candidates(index, query, candidates, fetch_k)
+        if hits is None:
+            hits = self._search_live(index, query, fetch_k)
+
+        results = []
+        for score, int_id in zip(*hits):
+            doc_id = self.id_map.get(int(int_id))
+            doc = self.documents.get(doc_id) if doc_id else None
+            if doc is None or (filters and not self._matches_filters(doc, filters)):
+                continue
+            results.append(replace(doc, score=float(score)))
+            if len(results) >= top_k:
+                break
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "index": self.index_string,
+            "vectors": self.index.ntotal if self.index is not None else 0,
+            "pending": sum(len(v) for v in self._pending_vectors),
+            "tombstones": self._tombstones,
+            "mmapped": self._mmapped,
+            "ef_search": self.ef_search,
+            "nprobe": self.nprobe,
+        }
+
+
+# Open persistent stores by index path; a store is closed once no pipeline uses it
+_stores: "weakref.WeakValueDictionary[str, TunedFAISSDocumentStore]" = weakref.WeakValueDictionary()
+_stores_lock = threading.Lock()
+
+
+def open_faiss_store(index_path: str, spec: Union[str, Dict[str, Any], None] = None,
+                     ef_search: int = DEFAULT_EF_SEARCH, nprobe: int = DEFAULT_NPROBE) -> TunedFAISSDocumentStore:
+    """
+    The open store for index_path, loaded on first use. Separate instances on
+    one path would each hold their own copy of the index and overwrite each
+    other's saves; a store that is already open takes the latest search
+    settings instead (its index type is fixed by what was built).
+    """
+    with _stores_lock:
+        store = _stores.get(index_path)
+        if store is None:
+            store = TunedFAISSDocumentStore(index_path=index_path, spec=spec, ef_search=ef_search, nprobe=nprobe)
+            _stores[index_path] = store
+        else:
+            params = parse_index_spec(spec)
+            store.set_search_params(params.get("efSearch", ef_search), params.get("nprobe", nprobe))
+        return store
@@ -4,22 +4,35 @@ Builds and manages Haystack 2.0 pipelines based on user configuration.
 Routes specialized RAG types to dedicated pipeline modules.
 """
 import os
+import time
 import uuid
 import logging
 from typing import Optional, Tuple
 
-from haystack import Pipeline, Document
+from haystack import Pipeline
 from haystack.components.builders import PromptBuilder
-from haystack.components.preprocessors import DocumentSplitter
-from haystack.components.retrievers.in_memory import InMemoryBM25Retriever
+from haystack.components.retrievers.in_memory import InMemoryBM25Retriever, InMemoryEmbeddingRetriever
 from haystack.document_stores.in_memory import InMemoryDocumentStore
-from haystack.document_stores.types import DuplicatePolicy
 
-from .vector_store_manager import create_document_store, write_documents
+from .vector_store_manager import create_document_store, is_persistent_store, count_documents, collection_key
+from .quantized_store import QuantizedDocumentStore
+from .bm25_index import BM25DocumentStore, PersistentBM25Retriever
+from .mmap_store import MmapDocumentStore, MmapEmbeddingRetriever
+from .hybrid_retriever import HybridRetriever, build_hybrid_retriever
 from .embedding_service import get_document_embedder, get_text_embedder
+from .ingestion import stream_ingest, DEFAULT_BATCH_SIZE
+from .bulk_writer import BulkWriter
+from .chunk_dedup import ChunkDeduplicator, DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD
+from .embedding_cache import get_embedding_cache, cache_model_id
+from .index_manifest import get_index_manifest
+from .ingestion_executor import get_ingestion_executor, resolve_workers
 from .llm_service import get_generator, get_model_display_name
 from .pipeline_modules import get_pipeline_builder, STANDARD_RAG_TYPES
 from .observability_service import track_query
+from .pipeline_restore import restore_pipeline, mark_used, forget_pipeline
+from .semantic_cache import (UNCACHED_RAG_TYPES, cache_variant, configure_semantic_cache, drop_semantic_cache,
+                             get_semantic_cache, invalidate_scope)
+from .response_cache import get_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -124,10 +137,85 @@ def _get_prompt_template(rag_type: str, config: dict) -> str:
 #  Pipeline Builder
 # ═══════════════════════════════════════════════════════════
 
-def build_and_deploy_pipeline(config: dict) -> Tuple[str, Pipeline]:
+def _index_key(config: dict) -> str:
+    """Identify the persistent collection(s) a named RAG is indexed into."""
+    return collection_key(config)
+
+
+class _GraphBuilder:
+    """Feeds streamed source documents into a graph store in small batches."""
+
+    def __init__(self, graph_store, extractor, batch_size: int):
+        self.graph_store = graph_store
+        self.extractor = extractor
+        self.batch_size = max(1, int(batch_size))
+        self.elapsed_ms = 0.0
+        self._pending = []
+
+    def add(self, document):
+        self._pending.append(document)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        start = time.perf_counter()
+        try:
+            self.graph_store.build_from_documents(self._pending, self.extractor)
+        except Exception as e:
+            logger.warning(f"Graph building failed: {e}")
+        self.elapsed_ms += (time.perf_counter() - start) * 1000
+        self._pending = []
+
+
+def _release_shared_models(pipeline):
+    """Release registry references held by a pipeline's shared model components."""
+    if pipeline is None:
+        return
+    for name in list(pipeline.graph.nodes):
+        instance = pipeline.get_component(name)
+        if hasattr(instance, "release"):
+            instance.release()
+
+
+def _restored_ingestion(pipeline, stores, graph_builder, saved: dict) -> dict:
+    """Check that a restored pipeline's data survived the restart; return its ingestion summary."""
+    problem = None
+    if graph_builder is not None and type(graph_builder.graph_store).__name__ == "LocalGraphStore":
+        problem = "its knowledge graph was kept in process memory"
+    elif not all(is_persistent_store(s) for s in stores):
+        problem = "its document store is in-process"
+    else:
+        chunks = count_documents(stores[0])
+        if not chunks:
+            problem = "its document store is empty"
+    if problem:
+        _release_shared_models(pipeline)
+        raise ValueError(f"Pipeline cannot be restored: {problem}")
+    return {"documents": saved.get("documents", 0), "chunks": chunks, **saved, "restored": True}
+
+
+def _emit(progress_callback, **event):
+    """Forward a stage event to the deploy's progress callback, if any."""
+    if progress_callback:
+        progress_callback(event)
+
+
+def build_and_deploy_pipeline(config: dict, progress_callback=None, pipeline_id: Optional[str] = None,
+                              restore: Optional[dict] = None) -> Tuple[str, Pipeline]:
     """
     Builds and deploys a Haystack 2.0 pipeline based on the frontend configuration.
     Routes specialized RAG types to dedicated pipeline modules.
+    Documents are streamed into the store in batches of dynamicConfig.ingestBatchSize
+    chunks, optionally across dynamicConfig.ingestWorkers processes; with
+    dynamicConfig.dedupChunks near-duplicate chunks are dropped before embedding.
+    progress_callback (if given) receives each batch summary.
+
+    restore (the saved ingestion summary) re-registers an existing deployment
+    under pipeline_id on top of its persisted stores: nothing is parsed,
+    embedded or written, and a ValueError is raised if the stores did not
+    survive (in-process or empty).
     Returns (pipeline_id, pipeline).
     """
     texts = config.get("extracted_texts", [])
@@ -138,6 +226,8 @@ def build_and_deploy_pipeline(config: dict) -> Tuple[str, Pipeline]:
     llm_model = config.get("llmModel", "qwen-local")
     embedding_model = config.get("embeddingModel", "bge-local")
     api_keys = config.get("apiKeys", {})
+    dynamic_cfg = config.get("dynamicConfig", {})
+    ingest_batch_size = dynamic_cfg.get("ingestBatchSize", DEFAULT_BATCH_SIZE)
 
     # ── 1. Create document store ─────────────────────────
     store = create_document_store(config)
@@ -148,41 +238,17 @@ def build_and_deploy_pipeline(config: dict) -> Tuple[str, Pipeline]:
     if isinstance(store, tuple):
         primary_store, secondary_store = store
 
-    # ── 2. Process documents ─────────────────────────────
-    documents = [Document(content=text) for text in texts if text.strip()]
-
-    if documents:
-        # Split documents by chunk size
-        splitter = DocumentSplitter(
-            split_by="word",
-            split_length=chunk_size,
-            split_overlap=int(chunk_size * 0.1),  # 10% overlap
-        )
-        split_result = splitter.run(documents=documents)
-        split_docs = split_result.get("documents", documents)
-
-        # 2. Embed documents (Required for FAISS/Vector search)
-        from .embedding_service import get_document_embedder
-        embedder = get_document_embedder(embedding_model, api_keys.get("openai"))
-        if embedder:
-            logger.info(f"Embedding {len(split_docs)} documents using {embedding_model}...")
-            embedded_result = embedder.run(documents=split_docs)
-            embedded_docs = embedded_result.get("documents", split_docs)
-        else:
-            embedded_docs = split_docs
-
-        # 3. Write to primary store
-        write_documents(primary_store, embedded_docs)
-
-        # 4. Write to secondary store (hybrid mode)
-        if secondary_store:
-            write_documents(secondary_store, embedded_docs)
-
-    # ── 3. Prepare shared components ─────────────────────
+    # ── 2. Prepare shared components ─────────────────────
     # Retriever
     db_type = config.get("localDb", "chroma") if config.get("dbType") == "local" else config.get("cloudDb")
     
-    if isinstance(primary_store, InMemoryDocumentStore):
+    if isinstance(primary_store, QuantizedDocumentStore):
+        retriever = InMemoryEmbeddingRetriever(document_store=primary_store, top_k=top_k)
+    elif isinstance(primary_store, BM25DocumentStore):
+        retriever = PersistentBM25Retriever(document_store=primary_store, top_k=top_k)
+    elif isinstance(primary_store, MmapDocumentStore):
+        retriever = MmapEmbeddingRetriever(document_store=primary_store, top_k=top_k)
+    elif isinstance(primary_store, InMemoryDocumentStore):
         retriever = InMemoryBM25Retriever(document_store=primary_store, top_k=top_k)
     elif "ChromaDocumentStore" in str(type(primary_store)):
         from haystack_integrations.components.retrievers.chroma import ChromaEmbeddingRetriever
@@ -201,9 +267,11 @@ def build_and_deploy_pipeline(config: dict) -> Tuple[str, Pipeline]:
     llm_key = api_keys.get("openai") or api_keys.get("anthropic") or api_keys.get("mistral") or api_keys.get("gemini")
     generator = get_generator(llm_model, llm_key)
 
-    # ── 4. Route to specialized or standard pipeline ─────
-    pipeline_id = f"pipe_{uuid.uuid4().hex[:8]}"
+    # ── 3. Route to specialized or standard pipeline ─────
+    pipeline_id = pipeline_id or f"pipe_{uuid.uuid4().hex[:8]}"
     specialized_builder = get_pipeline_builder(rag_type)
+    graph_builder = None
+    keyword_store = None
 
     if specialized_builder:
         # ── SPECIALIZED pipeline (modular backend) ───────
@@ -211,26 +279,27 @@ def build_and_deploy_pipeline(config: dict) -> Tuple[str, Pipeline]:
         pipeline_result = specialized_builder(primary_store, config, retriever, generator)
         pipeline = pipeline_result["pipeline"]
 
-        # Store specialized info for custom query execution
-        specialized_pipeline_info[pipeline_id] = {
-            "rag_type": rag_type,
-            **pipeline_result,
-        }
-
-        # For graph RAG, build the graph from documents
-        if rag_type == "structured" and documents:
-            try:
-                graph_store = pipeline_result.get("graph_store")
-                extractor = pipeline_result.get("extractor")
-                if graph_store and extractor:
-                    graph_store.build_from_documents(documents, extractor)
-            except Exception as e:
-                logger.warning(f"Graph building failed: {e}")
+        # For graph RAG, build the graph from source documents as they stream in
+        if rag_type == "structured":
+            graph_store = pipeline_result.get("graph_store")
+            extractor = pipeline_result.get("extractor")
+            if graph_store and extractor:
+                graph_builder = _GraphBuilder(graph_store, extractor, ingest_batch_size)
 
     else:
         # ── STANDARD pipeline (shared prompt-based) ──────
         logger.info(f"Building STANDARD pipeline for '{rag_type}'")
         pipeline = Pipeline()
+
+        # Hybrid RAG fuses BM25 and dense retrieval run side by side
+        if rag_type == "hybrid" or dynamic_cfg.get("hybridRetrieval", False):
+            dense_retriever = retriever if "EmbeddingRetriever" in type(retriever).__name__ else None
+            hybrid_retriever, keyword_store = build_hybrid_retriever(
+                primary_store, dense_retriever, top_k, dynamic_cfg,
+                collection=_index_key(config) if config.get("ragName") else None,
+            )
+            if hybrid_retriever is not None:
+                retriever = hybrid_retriever
         pipeline.add_component("retriever", retriever)
 
         # LLM
@@ -244,10 +313,20 @@ def build_and_deploy_pipeline(config: dict) -> Tuple[str, Pipeline]:
         # Optional reranker
         if use_reranker:
             try:
-                from haystack.components.rankers import TransformersSimilarityRanker
-                reranker = TransformersSimilarityRanker(
+                from .model_registry import SharedRanker
+                from .rerank_service import DEFAULT_CASCADE_MARGIN, DEFAULT_CASCADE_BAND
+                # Cascade: rerank only when the first stage has no clear winner
+                cascade = None
+                if dynamic_cfg.get("rerankCascade", False):
+                    cascade = (dynamic_cfg.get("cascadeMargin", DEFAULT_CASCADE_MARGIN),
+                               dynamic_cfg.get("cascadeBand", DEFAULT_CASCADE_BAND))
+                reranker = SharedRanker(
                     model="cross-encoder/ms-marco-MiniLM-L-6-v2",
                     top_k=top_k,
+                    backend=dynamic_cfg.get("rerankBackend"),
+                    cascade=cascade,
+                    budget_ms=dynamic_cfg.get("rerankBudgetMs"),
+                    pipeline_id=pipeline_id,
                 )
                 pipeline.add_component("reranker", reranker)
                 logger.info("✅ Reranker added to pipeline")
@@ -255,10 +334,10 @@ def build_and_deploy_pipeline(config: dict) -> Tuple[str, Pipeline]:
                 logger.warning(f"Reranker initialization failed: {e} — skipping")
                 use_reranker = False
 
-        # ── 5. Connect Components (Haystack 2.x style) ────
+        # ── 4. Connect Components (Haystack 2.x style) ────
         
         # Check if we need an embedder for the retriever
-        is_embedding_retriever = any(x in str(type(retriever)) for x in ["EmbeddingRetriever", "ChromaEmbeddingRetriever", "FAISSEmbeddingRetriever"])
+        is_embedding_retriever = isinstance(retriever, HybridRetriever) or any(x in str(type(retriever)) for x in ["EmbeddingRetriever", "ChromaEmbeddingRetriever", "FAISSEmbeddingRetriever"])
         logger.info(f"Retriever type: {type(retriever)}, is_embedding_retriever: {is_embedding_retriever}")
         
         if is_embedding_retriever:
@@ -276,8 +355,95 @@ def build_and_deploy_pipeline(config: dict) -> Tuple[str, Pipeline]:
 
         pipeline.connect("prompt_builder.prompt", "llm.prompt")
 
-    # ── 5. Register pipeline ─────────────────────────────
+    # ── 5. Stream documents into the store(s) ────────────
+    stores = [s for s in (primary_store, secondary_store, keyword_store) if s is not None]
+    if restore is not None:
+        ingestion = _restored_ingestion(pipeline, stores, graph_builder, restore)
+    else:
+        # Keyword-only stores never see a vector, so skip embedding entirely for them
+        needs_embeddings = any(not isinstance(s, BM25DocumentStore) for s in stores)
+        embedder = get_document_embedder(embedding_model, api_keys.get("openai")) if texts and needs_embeddings else None
+        # Unchanged chunks reuse vectors from the persistent embedding cache
+        embedding_cache = get_embedding_cache() if embedder and dynamic_cfg.get("embeddingCache", True) else None
+
+        # Persistent collections of a named RAG are reindexed incrementally
+        manifest, index_key = None, None
+        if (config.get("ragName") and dynamic_cfg.get("incrementalIndex", True)
+                and all(is_persistent_store(s) for s in stores)):
+            manifest = get_index_manifest()
+            index_key = _index_key(config)
+            # A wiped keyword sidecar must be refilled even if the primary store is intact
+            if keyword_store is not None and count_documents(keyword_store) != count_documents(primary_store):
+                manifest.reset(index_key)
+
+        # Repeated boilerplate chunks are stored (and embedded) once
+        dedup = None
+        if dynamic_cfg.get("dedupChunks", False):
+            dedup = ChunkDeduplicator(float(dynamic_cfg.get("dedupThreshold", DEFAULT_DEDUP_THRESHOLD)))
+
+        # CPU-bound split/embed work can be spread across a process pool
+        executor = None
+        workers = resolve_workers(dynamic_cfg.get("ingestWorkers"))
+        if texts and workers > 1:
+            executor = get_ingestion_executor(workers, embedding_model, api_keys.get("openai"))
+
+        try:
+            ingestion = stream_ingest(
+                texts,
+                stores=stores,
+                embedder=embedder,
+                chunk_size=chunk_size,
+                batch_size=ingest_batch_size,
+                cache=embedding_cache,
+                embedding_model_id=cache_model_id(embedding_model, embedder),
+                manifest=manifest,
+                index_key=index_key,
+                executor=executor,
+                writer=BulkWriter.from_config(dynamic_cfg),
+                dedup=dedup,
+                on_document=graph_builder.add if graph_builder else None,
+                progress_callback=progress_callback,
+            )
+            # Stores that defer work (e.g. FAISS IVF training) finish and persist here
+            commit_start = time.perf_counter()
+            for s in stores:
+                if hasattr(s, "commit_index"):
+                    s.commit_index()
+            ingestion["commit_ms"] = round((time.perf_counter() - commit_start) * 1000, 2)
+            if graph_builder:
+                graph_builder.flush()
+                _emit(progress_callback, stage="build_graph", status="completed", ms=graph_builder.elapsed_ms)
+            else:
+                _emit(progress_callback, stage="build_graph", status="skipped")
+        except BaseException:
+            # The pipeline will never be registered: hand its shared models back
+            _release_shared_models(pipeline)
+            raise
+        finally:
+            # The document embedder is only needed while indexing
+            if embedder is not None and hasattr(embedder, "release"):
+                embedder.release()
+            if executor is not None:
+                executor.release()
+
+    # ── 6. Register pipeline ─────────────────────────────
+    # Only reached when ingestion succeeded, so a pipeline never becomes
+    # queryable while its documents are still loading. The "running" event is
+    # the last point a deploy can be cancelled at: once registration starts it
+    # completes, so a cancelled job never leaves a registered pipeline behind.
+    try:
+        _emit(progress_callback, stage="register", status="running")
+    except BaseException:
+        _release_shared_models(pipeline)
+        raise
+    register_start = time.perf_counter()
     active_pipelines[pipeline_id] = pipeline
+    if specialized_builder:
+        # Store specialized info for custom query execution
+        specialized_pipeline_info[pipeline_id] = {
+            "rag_type": rag_type,
+            **pipeline_result,
+        }
 
     # Store metadata for visualization
     pipeline_metadata[pipeline_id] = {
@@ -291,25 +457,69 @@ def build_and_deploy_pipeline(config: dict) -> Tuple[str, Pipeline]:
         "chunk_size": chunk_size,
         "top_k": top_k,
         "use_reranker": use_reranker,
+        "hybrid_retrieval": isinstance(retriever, HybridRetriever),
         "features": config.get("features", []),
         "explainability": config.get("explainability", False),
         "privacy_mode": config.get("privacyMode", False),
         "deployment_type": config.get("deploymentType", "api"),
         "scrape_mode": config.get("scrapeMode", "static"),
-        "documents_count": len(documents),
+        "documents_count": ingestion["documents"],
+        "chunks_count": ingestion["chunks"],
+        "ingestion": ingestion,
         "is_specialized": specialized_builder is not None,
         "dynamic_config": config.get("dynamicConfig", {}),
     }
 
+    # Answers cached by any pipeline on these collections are stale once their documents change
+    cache_scope = _index_key(config) if config.get("ragName") else pipeline_id
+    changes = ingestion.get("index_changes", {})
+    if restore is None and (changes.get("mode") != "incremental"
+                            or any(changes.get(k) for k in ("added", "updated", "deleted"))):
+        invalidate_scope(cache_scope)
+        get_response_cache().invalidate_scope(cache_scope)
+    configure_semantic_cache(pipeline_id, cache_scope, rag_type, dynamic_cfg)
+    if dynamic_cfg.get("responseCache", True) and rag_type not in UNCACHED_RAG_TYPES:
+        get_response_cache().register(pipeline_id, cache_scope)
+
+    try:
+        _emit(progress_callback, stage="register", status="completed",
+              ms=(time.perf_counter() - register_start) * 1000)
+    except Exception as e:
+        # Already registered: a cancel requested meanwhile no longer applies
+        logger.info(f"Pipeline {pipeline_id} registered despite a late cancel request: {e}")
     logger.info(f"Pipeline {pipeline_id} built: {rag_type} | {llm_model} | {config.get('dbType')} | {'SPECIALIZED' if specialized_builder else 'STANDARD'}")
     return pipeline_id, pipeline
 
 
+def stop_pipeline(pipeline_id: str) -> bool:
+    """
+    Unregister a deployed pipeline, release its shared models and drop its
+    cached answers. Its stores stay in place; its deployment record is marked
+    stopped so it is not restored. Returns False if the pipeline was neither
+    running nor restorable.
+    """
+    # Marked first: a restore in progress finishes before, later ones see the mark
+    recorded = forget_pipeline(pipeline_id)
+    pipeline = active_pipelines.pop(pipeline_id, None)
+    pipeline_metadata.pop(pipeline_id, None)
+    specialized_pipeline_info.pop(pipeline_id, None)
+    drop_semantic_cache(pipeline_id)
+    get_response_cache().forget(pipeline_id)
+    if pipeline is None:
+        if recorded:
+            logger.info(f"Pipeline {pipeline_id} stopped (was not loaded)")
+        return recorded
+    _release_shared_models(pipeline)
+    logger.info(f"Pipeline {pipeline_id} stopped")
+    return True
+
+
 # ═══════════════════════════════════════════════════════════
 #  Query Execution
 # ═══════════════════════════════════════════════════════════
 
-def query_pipeline(pipeline_id: str, query: str, audio_base64: str = None, llm_override: dict = None) -> dict:
+def query_pipeline(pipeline_id: str, query: str, audio_base64: str = None, llm_override: dict = None,
+                   filters: dict = None, bypass_cache: bool = False) -> dict:
     """
     Runs a query through the deployed pipeline.
     Routes to specialized query executors for modular pipelines.
@@ -317,14 +527,34 @@ def query_pipeline(pipeline_id: str, query: str, audio_base64: str = None, llm_o
     
     llm_override: Optional dict {"model": str, "api_key": str, "base_url": str}
                   Lets users test with their own LLM instead of the platform default.
+    filters: Optional Haystack metadata filter for the retriever of standard pipelines,
+             e.g. {"field": "meta.section", "operator": "==", "value": "/pricing"}.
+    bypass_cache: Skip the response and semantic caches (the fresh answer is still cached).
     """
+    # ── Exact-match response cache ───────────────────────
+    variant = cache_variant(llm_override, filters)
+    responses = get_response_cache()
+    if not bypass_cache:
+        cached = responses.get(pipeline_id, query, variant)
+        if cached is not None:
+            meta = pipeline_metadata.get(pipeline_id, {})
+            with track_query(pipeline_id, query, meta.get("rag_type", "basic"), meta.get("llm_model", "unknown")) as ctx:
+                ctx.response = cached.get("answer")
+                ctx.cache = "exact"
+            return {**cached, "cached": True}
+
     pipeline = active_pipelines.get(pipeline_id)
+    if not pipeline:
+        # After a restart, rebuild the pipeline on top of its persisted stores
+        if restore_pipeline(pipeline_id):
+            pipeline = active_pipelines.get(pipeline_id)
     if not pipeline and llm_override:
         # Build a fallback pipeline using the override LLM directly
         return _query_with_override_llm(query, llm_override)
 
     if not pipeline:
         return {"answer": "Error: Pipeline not found or has been stopped."}
+    mark_used(pipeline_id)
 
     # If user provided an LLM override, swap the generator at query time
     if llm_override:
@@ -344,81 +574,131 @@ def query_pipeline(pipeline_id: str, query: str, audio_base64: str = None, llm_o
     model = meta.get("llm_model", "unknown")
     spec_info = specialized_pipeline_info.get(pipeline_id)
 
+    cache = get_semantic_cache(pipeline_id)
     try:
         with track_query(pipeline_id, query, rag_type, model) as ctx:
-            # ── Specialized pipeline execution ───────────────
-            if spec_info:
-                if rag_type == "crosslingual":
-                    from .pipeline_modules.cross_lingual_pipeline import execute_cross_lingual_query
-                    answer = execute_cross_lingual_query(spec_info, query)
-                    ctx.response = answer
-                    return {"answer": answer}
-
-                elif rag_type == "voice":
-                    from .pipeline_modules.voice_pipeline import execute_voice_query
-                    result = execute_voice_query(spec_info, query, audio_base64)
-                    ctx.response = result["text_answer"]
-                    return {
-                        "answer": result["text_answer"],
-                        "text_query": result["text_query"],
-                        "audio_response": result.get("audio_response", ""),
-                    }
-
-                elif rag_type == "agentic":
-                    from .pipeline_modules.agentic_pipeline import execute_agentic_query
-                    answer = execute_agentic_query(spec_info, query)
-                    ctx.response = answer
-                    return {"answer": answer}
-
-                elif rag_type == "structured":
-                    from .pipeline_modules.graph_pipeline import execute_graph_query
-                    answer = execute_graph_query(spec_info, query)
-                    ctx.response = answer
-                    return {"answer": answer}
-
-                elif rag_type == "conversational":
-                    from .pipeline_modules.conversational_pipeline import execute_conversational_query
-                    answer = execute_conversational_query(spec_info, pipeline_id, query)
-                    ctx.response = answer
-                    return {"answer": answer}
-
-            # ── Standard pipeline execution ──────────────────
-            run_params = {
-                "prompt_builder": {"query": query},
+            # ── Semantic answer cache ────────────────────────
+            vector = None
+            if cache is not None:
+                lookup_start = time.perf_counter()
+                cached = None
+                try:
+                    vector = _embed_query(pipeline, cache, meta, query)
+                    if not bypass_cache:
+                        cached = cache.lookup(query, vector, variant)
+                except Exception as e:
+                    logger.warning(f"Semantic cache lookup failed for {pipeline_id}: {e}")
+                if cached is not None:
+                    answer, similarity = cached
+                    cache.record_saved((time.perf_counter() - lookup_start) * 1000)
+                    ctx.response = answer.get("answer")
+                    ctx.cache = "semantic"
+                    return {**answer, "cached": True, "cache_similarity": round(similarity, 4)}
+
+            run_start = time.perf_counter()
+            result = _execute_query(pipeline, pipeline_id, query, audio_base64, filters,
+                                    meta, rag_type, spec_info, ctx)
+            # Only real answers are cached (not run errors or empty generations)
+            if ctx.response and ctx.response != "No response generated.":
+                responses.put(pipeline_id, query, result, variant)
+                if vector is not None:
+                    cache.put(query, vector, result, variant, latency_ms=(time.perf_counter() - run_start) * 1000)
+            return result
+
+    except Exception as e:
+        logger.error(f"Pipeline execution error: {e}")
+        return {"answer": f"Error executing pipeline: {str(e)}"}
+
+
+def _embed_query(pipeline, cache, meta: dict, query: str):
+    """Question embedding for the semantic cache, from the pipeline's own query embedder."""
+    if "query_embedder" in pipeline.graph.nodes:
+        embedder = pipeline.get_component("query_embedder")
+    else:
+        if cache.embedder is None:
+            cache.embedder = get_text_embedder(meta.get("embedding_model", "bge-local"))
+            if hasattr(cache.embedder, "warm_up"):
+                cache.embedder.warm_up()
+        embedder = cache.embedder
+    return embedder.run(text=query)["embedding"]
+
+
+def _execute_query(pipeline, pipeline_id: str, query: str, audio_base64: Optional[str], filters: Optional[dict],
+                   meta: dict, rag_type: str, spec_info: Optional[dict], ctx) -> dict:
+    """Run one query through a specialized executor or the standard pipeline."""
+    # ── Specialized pipeline execution ───────────────
+    if spec_info:
+        if rag_type == "crosslingual":
+            from .pipeline_modules.cross_lingual_pipeline import execute_cross_lingual_query
+            answer = execute_cross_lingual_query(spec_info, query)
+            ctx.response = answer
+            return {"answer": answer}
+
+        elif rag_type == "voice":
+            from .pipeline_modules.voice_pipeline import execute_voice_query
+            result = execute_voice_query(spec_info, query, audio_base64)
+            ctx.response = result["text_answer"]
+            return {
+                "answer": result["text_answer"],
+                "text_query": result["text_query"],
+                "audio_response": result.get("audio_response", ""),
             }
 
-            # Route query to embedder or retriever based on what the pipeline expects
-            node_names = list(pipeline.graph.nodes)
-            if "query_embedder" in node_names:
-                run_params["query_embedder"] = {"text": query}
-            elif "retriever" in node_names:
-                run_params["retriever"] = {"query": query}
+        elif rag_type == "agentic":
+            from .pipeline_modules.agentic_pipeline import execute_agentic_query
+            answer = execute_agentic_query(spec_info, query)
+            ctx.response = answer
+            return {"answer": answer}
+
+        elif rag_type == "structured":
+            from .pipeline_modules.graph_pipeline import execute_graph_query
+            answer = execute_graph_query(spec_info, query)
+            ctx.response = answer
+            return {"answer": answer}
+
+        elif rag_type == "conversational":
+            from .pipeline_modules.conversational_pipeline import execute_conversational_query
+            answer = execute_conversational_query(spec_info, pipeline_id, query)
+            ctx.response = answer
+            return {"answer": answer}
+
+    # ── Standard pipeline execution ──────────────────
+    run_params = {
+        "prompt_builder": {"query": query},
+    }
 
-            if "reranker" in node_names:
-                run_params["reranker"] = {"query": query}
+    # Route query to embedder or retriever based on what the pipeline expects
+    node_names = list(pipeline.graph.nodes)
+    if "query_embedder" in node_names:
+        run_params["query_embedder"] = {"text": query}
+        if meta.get("hybrid_retrieval"):
+            run_params["retriever"] = {"query": query}
+    elif "retriever" in node_names:
+        run_params["retriever"] = {"query": query}
+    if filters and "retriever" in node_names:
+        run_params.setdefault("retriever", {})["filters"] = filters
 
-            try:
-                result = pipeline.run(run_params)
-            except Exception as run_err:
-                logger.error(f"Pipeline run error: {run_err}")
-                return {"answer": "⚠️ Model temporarily unavailable. Try again."}
-
-            replies = result.get("llm", {}).get("replies", [])
-            if replies:
-                ctx.response = replies[0]
-                # Try to extract tokens if meta is available
-                meta_list = result.get("llm", {}).get("meta", [])
-                if meta_list and isinstance(meta_list[0], dict):
-                    usage = meta_list[0].get("usage", {})
-                    ctx.tokens = usage.get("total_tokens", 0)
-                return {"answer": replies[0]}
-                
-            ctx.response = "No response generated."
-            return {"answer": "No response generated."}
+    if "reranker" in node_names:
+        run_params["reranker"] = {"query": query}
 
-    except Exception as e:
-        logger.error(f"Pipeline execution error: {e}")
-        return {"answer": f"Error executing pipeline: {str(e)}"}
+    try:
+        result = pipeline.run(run_params)
+    except Exception as run_err:
+        logger.error(f"Pipeline run error: {run_err}")
+        return {"answer": "⚠️ Model temporarily unavailable. Try again."}
+
+    replies = result.get("llm", {}).get("replies", [])
+    if replies:
+        ctx.response = replies[0]
+        # Try to extract tokens if meta is available
+        meta_list = result.get("llm", {}).get("meta", [])
+        if meta_list and isinstance(meta_list[0], dict):
+            usage = meta_list[0].get("usage", {})
+            ctx.tokens = usage.get("total_tokens", 0)
+        return {"answer": replies[0]}
+        
+    ctx.response = "No response generated."
+    return {"answer": "No response generated."}
 
 
 # ═══════════════════════════════════════════════════════════
@@ -477,7 +757,7 @@ def get_pipeline_graph(pipeline_id: str) -> dict:
     # Retriever node
     nodes.append({
         "id": "retriever",
-        "label": f"Retriever (Top-{meta.get('top_k', 5)})",
+        "label": f"{'Hybrid BM25 + Dense Retriever' if meta.get('hybrid_retrieval') else 'Retriever'} (Top-{meta.get('top_k', 5)})",
         "type": "retriever",
     })
     edges.append({"source": "doc_store", "target": "retriever"})
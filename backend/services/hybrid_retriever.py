@@ -0,0 +1,112 @@
+"""
+Hybrid Retriever — Parallel BM25 + dense retrieval with rank fusion.
+Runs a keyword retriever and an embedding retriever concurrently, fuses the
+two result lists with MultiRetrieverAggregator (reciprocal rank fusion or
+weighted score fusion) and reports how long each branch took.
+"""
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from haystack import Document, component
+from haystack.components.retrievers.in_memory import InMemoryBM25Retriever, InMemoryEmbeddingRetriever
+from haystack.document_stores.in_memory import InMemoryDocumentStore
+
+from .bm25_index import BM25DocumentStore, PersistentBM25Retriever
+from .multi_retriever import MultiRetrieverAggregator
+from .observability_service import record_retrieval_latency
+
+logger = logging.getLogger(__name__)
+
+# Shared by all hybrid pipelines; each query uses two threads (one per branch)
+_branch_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("HYBRID_RETRIEVAL_THREADS", "16")),
+    thread_name_prefix="hybrid-branch",
+)
+
+
+def _timed(fn, **kwargs) -> Tuple[List[Document], float]:
+    start = time.perf_counter()
+    documents = fn(**kwargs).get("documents", [])
+    return documents, (time.perf_counter() - start) * 1000
+
+
+@component
+class HybridRetriever:
+    """
+    Keyword and dense retrieval in parallel, fused into one ranked list.
+    Each branch fetches candidate_k documents; the aggregator keeps top_k.
+    A failing branch is logged and treated as empty so the other still answers.
+    """
+
+    def __init__(self, keyword_retriever, dense_retriever, aggregator: MultiRetrieverAggregator,
+                 candidate_k: int = 10):
+        self.keyword_retriever = keyword_retriever
+        self.dense_retriever = dense_retriever
+        self.aggregator = aggregator
+        self.candidate_k = candidate_k
+
+    @component.output_types(documents=List[Document], branch_latency_ms=Dict[str, float])
+    def run(self, query: str, query_embedding: List[float], filters: Optional[Dict[str, Any]] = None):
+        extra = {"filters": filters} if filters else {}
+        futures = {
+            "bm25": _branch_pool.submit(_timed, self.keyword_retriever.run,
+                                        query=query, top_k=self.candidate_k, **extra),
+            "dense": _branch_pool.submit(_timed, self.dense_retriever.run,
+                                         query_embedding=query_embedding, top_k=self.candidate_k, **extra),
+        }
+        results, latency = {}, {}
+        for branch, future in futures.items():
+            try:
+                results[branch], latency[branch] = future.result()
+            except Exception as e:
+                logger.warning(f"Hybrid {branch} branch failed: {e}")
+                results[branch], latency[branch] = [], 0.0
+            record_retrieval_latency(branch, latency[branch])
+
+        documents = self.aggregator.aggregate([results["bm25"], results["dense"]])
+        logger.debug(f"Hybrid retrieval: bm25={len(results['bm25'])} ({latency['bm25']:.1f} ms), "
+                     f"dense={len(results['dense'])} ({latency['dense']:.1f} ms) → {len(documents)}")
+        return {"documents": documents, "branch_latency_ms": {k: round(v, 2) for k, v in latency.items()}}
+
+
+def build_hybrid_retriever(store, dense_retriever, top_k: int, dynamic_cfg: dict,
+                           collection: Optional[str] = None) -> Tuple[Optional[HybridRetriever], Optional[BM25DocumentStore]]:
+    """
+    Wrap a store's retrievers into a HybridRetriever.
+
+    Returns (hybrid_retriever, keyword_store). keyword_store is a BM25 index
+    sidecar that must be fed the same documents as the store; it persists
+    next to a named collection (so persistent stores keep reindexing
+    incrementally) and is None when the store supports BM25 itself.
+    Returns (None, None) when no dense retriever exists for the store.
+    """
+    if dense_retriever is None and isinstance(store, InMemoryDocumentStore):
+        dense_retriever = InMemoryEmbeddingRetriever(document_store=store, top_k=top_k)
+    if dense_retriever is None:
+        logger.warning(f"No embedding retriever for {type(store).__name__} — hybrid retrieval disabled")
+        return None, None
+
+    keyword_store = None
+    if isinstance(store, InMemoryDocumentStore):
+        keyword_retriever = InMemoryBM25Retriever(document_store=store, top_k=top_k)
+    else:
+        keyword_store = BM25DocumentStore(
+            collection=f"{collection}.keyword" if collection else None,
+            k1=dynamic_cfg.get("bm25K1", 1.5),
+            b=dynamic_cfg.get("bm25B", 0.75),
+        )
+        keyword_retriever = PersistentBM25Retriever(document_store=keyword_store, top_k=top_k)
+
+    aggregator = MultiRetrieverAggregator(
+        strategy=dynamic_cfg.get("hybridFusion", "rrf"),
+        weights=dynamic_cfg.get("hybridWeights", [0.5, 0.5]),
+        top_k=top_k,
+        rrf_k=dynamic_cfg.get("rrfK", 60),
+    )
+    candidate_k = dynamic_cfg.get("hybridCandidateK", top_k * 2)
+    logger.info(f"Hybrid retriever: fusion={aggregator.strategy}, weights={aggregator.weights}, "
+                f"candidates/branch={candidate_k}, bm25 sidecar={'yes' if keyword_store else 'no'}")
+    return HybridRetriever(keyword_retriever, dense_retriever, aggregator, candidate_k), keyword_store
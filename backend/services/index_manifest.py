@@ -0,0 +1,135 @@
+"""
+Index Manifest — Tracks which chunks are already indexed in a persistent store.
+Each row maps a stable chunk id to a fingerprint of (embedding model, content)
+and the generation (deploy) that last saw it. Incremental redeploys use it to
+upsert only new or changed chunks and delete the stale ones.
+"""
+import os
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .vector_store_manager import STORES_DIR
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = os.path.join(STORES_DIR, "index_manifest.sqlite3")
+
+_SQL_CHUNK = 500
+
+
+class IndexManifest:
+    """SQLite-backed manifest of indexed chunks, partitioned by index key."""
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " index_key TEXT NOT NULL, chunk_id TEXT NOT NULL, fingerprint TEXT NOT NULL,"
+            " generation INTEGER NOT NULL, PRIMARY KEY (index_key, chunk_id))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS generations (index_key TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def count(self, index_key: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM chunks WHERE index_key = ?", (index_key,)
+            ).fetchone()[0]
+
+    def begin(self, index_key: str, store_count: Optional[int] = None) -> int:
+        """
+        Start a new indexing generation for index_key and return its number.
+        If store_count disagrees with the manifest (store wiped or written
+        outside the manifest), the manifest is reset so every chunk is re-added.
+        """
+        if store_count is not None and store_count != self.count(index_key):
+            logger.warning(f"Index manifest for '{index_key}' out of sync with store "
+                           f"({store_count} stored) — falling back to a full reindex")
+            self.reset(index_key)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generation FROM generations WHERE index_key = ?", (index_key,)
+            ).fetchone()
+            generation = (row[0] if row else 0) + 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generations (index_key, generation) VALUES (?, ?)",
+                (index_key, generation),
+            )
+            self._conn.commit()
+        return generation
+
+    def lookup(self, index_key: str, chunk_ids: Iterable[str]) -> Dict[str, str]:
+        """Return {chunk_id: fingerprint} for the ids already indexed."""
+        ids = list(chunk_ids)
+        found = {}
+        with self._lock:
+            for i in range(0, len(ids), _SQL_CHUNK):
+                part = ids[i:i + _SQL_CHUNK]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT chunk_id, fingerprint FROM chunks WHERE index_key = ? AND chunk_id IN ({marks})",
+                    [index_key, *part],
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def mark(self, index_key: str, entries: Iterable[Tuple[str, str]], generation: int):
+        """Record (chunk_id, fingerprint) pairs as seen in this generation."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (index_key, chunk_id, fingerprint, generation) VALUES (?, ?, ?, ?)",
+                [(index_key, cid, fp, generation) for cid, fp in entries],
+            )
+            self._conn.commit()
+
+    def iter_stale(self, index_key: str, generation: int, batch_size: int = _SQL_CHUNK) -> Iterator[List[str]]:
+        """Yield batches of chunk ids that were not seen in the given generation."""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT chunk_id FROM chunks WHERE index_key = ? AND generation < ? LIMIT ?",
+                    (index_key, generation, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            ids = [r[0] for r in rows]
+            yield ids
+            self.remove(index_key, ids)
+
+    def remove(self, index_key: str, chunk_ids: List[str]):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE index_key = ? AND chunk_id = ?",
+                [(index_key, cid) for cid in chunk_ids],
+            )
+            self._conn.commit()
+
+    def reset(self, index_key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE index_key = ?", (index_key,))
+            self._conn.commit()
+
+
+_manifest: Optional[IndexManifest] = None
+_manifest_lock = threading.Lock()
+
+
+def get_index_manifest() -> Optional[IndexManifest]:
+    """Return the process-wide index manifest (None if it cannot be opened)."""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            try:
+                _manifest = IndexManifest()
+            except Exception as e:
+                logger.warning(f"Index manifest unavailable: {e}")
+                return None
+        return _manifest
@@ -0,0 +1,348 @@
+"""
+Ingestion Service — Streaming document ingestion for pipeline deployment.
+Pulls texts lazily from any iterable, splits them, embeds in fixed-size batches
+and writes each batch to the document store(s) before pulling more input.
+Peak memory depends on the batch size, not on the size of the corpus.
+
+Chunks get stable ids derived from their source and position, so persistent
+stores can be reindexed incrementally: with an IndexManifest only new or
+changed chunks are embedded and upserted, and stale chunks are deleted.
+
+Every chunk carries structured metadata: its source, the fields derived from
+it (domain / path / section or filename / file_type), any fields from the
+text's "Meta:" header line, the page it starts on and the ingestion time.
+"""
+import json
+import time
+import logging
+import itertools
+import dataclasses
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from haystack import Document
+from haystack.components.preprocessors import DocumentSplitter
+
+from .vector_store_manager import write_to_stores, delete_documents, count_documents, get_documents
+from .embedding_cache import content_hash
+from .source_metadata import parse_source, source_fields, now_iso
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 64
+MIN_CHUNKS_PER_WORKER = 16
+
+
+# ═══════════════════════════════════════════════════════════
+#  Helpers
+# ═══════════════════════════════════════════════════════════
+
+# Metadata that changes without the chunk changing: kept out of fingerprints
+_VOLATILE_META = ("ingested_at", "source_id", "duplicate_sources")
+
+
+def iter_documents(texts: Iterable[str]) -> Iterator[Document]:
+    """Lazily wrap raw texts into Haystack Documents (with source metadata), skipping blank entries."""
+    for text in texts:
+        if text and text.strip():
+            source, meta, content = parse_source(text)
+            yield Document(content=content, meta={**meta, **source_fields(source)})
+
+
+def source_key(document: Document) -> str:
+    """
+    Identify the source of a raw text. Scraped pages and uploads start with a
+    "Source: <url or filename>" line; anything else is keyed by its content.
+    """
+    first_line = document.content.split("\n", 1)[0].strip()
+    if first_line.startswith("Source:"):
+        return first_line[len("Source:"):].strip()
+    return f"sha256:{content_hash(document.content)}"
+
+
+def chunk_id(source: str, position: int) -> str:
+    """Stable chunk id: the same source and position always map to the same id."""
+    return content_hash(f"{source}#{position}")
+
+
+def _assign_chunk_ids(chunks: List[Document], source: str, meta: dict, ingested_at: str) -> List[Document]:
+    return [
+        dataclasses.replace(c, id=chunk_id(source, i),
+                            meta={**c.meta, **meta, "source": source, "ingested_at": ingested_at})
+        for i, c in enumerate(chunks)
+    ]
+
+
+def _fingerprint(chunk: Document, model_id: Optional[str]) -> str:
+    """Changes whenever the chunk text, its metadata or the embedding model changes."""
+    meta = {k: v for k, v in chunk.meta.items() if k not in _VOLATILE_META and not k.startswith("_")}
+    return content_hash(f"{model_id or ''}\x00{chunk.content}\x00{json.dumps(meta, sort_keys=True, default=str)}")
+
+
+def make_splitter(chunk_size: int) -> DocumentSplitter:
+    """Word splitter used for every deploy: chunk_size words with 10% overlap."""
+    return DocumentSplitter(
+        split_by="word",
+        split_length=chunk_size,
+        split_overlap=int(chunk_size * 0.1),  # 10% overlap
+    )
+
+
+def _new_report(batch_size: int, incremental: bool, workers: int) -> dict:
+    return {
+        "mode": "streaming",
+        "batch_size": batch_size,
+        "workers": workers,
+        "documents": 0,
+        "characters": 0,
+        "chunks": 0,
+        "embedding_cache": {"hits": 0, "misses": 0},
+        "index_changes": {
+            "mode": "incremental" if incremental else "full",
+            "added": 0, "updated": 0, "deleted": 0, "unchanged": 0,
+        },
+        "batches": [],
+        "stage_timings_ms": {"load_texts": 0.0, "split": 0.0, "dedup": 0.0, "embed": 0.0, "write": 0.0},
+    }
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def _embed_batch(chunks: List[Document], embed_fn: Callable[[List[Document]], List[Document]],
+                 cache=None, model_id: Optional[str] = None) -> Tuple[List[Document], int]:
+    """
+    Embed a batch of chunks, computing vectors only for embedding-cache misses.
+    Returns (embedded chunks in input order, number of cache hits).
+    """
+    if cache is None or not model_id or not chunks:
+        return embed_fn(chunks), 0
+
+    hashes = [content_hash(c.content) for c in chunks]
+    cached = cache.get_many(model_id, hashes)
+    misses = [c for c, h in zip(chunks, hashes) if h not in cached]
+
+    if misses:
+        embedded = embed_fn(misses)
+        fresh = [(content_hash(d.content), d.embedding) for d in embedded if d.embedding is not None]
+        cache.put_many(model_id, fresh)
+        cached.update(fresh)
+
+    result = [
+        dataclasses.replace(c, embedding=cached[h]) if h in cached else c
+        for c, h in zip(chunks, hashes)
+    ]
+    return result, len(chunks) - len(misses)
+
+
+def _finish_dedup(dedup, stores: List, embedder, embed_fn, cache, model_id: Optional[str], writer,
+                  embed_ms_per_chunk: float) -> dict:
+    """
+    Rewrite representatives whose stored copy lacks their duplicate sources:
+    those that gained sources after their batch was written, and those an
+    incremental deploy skipped as unchanged. They are read back from the
+    first store by id and their vectors mostly come back from the embedding
+    cache. Also summarizes what deduplication saved.
+    """
+    start = time.perf_counter()
+    sources = dedup.take_updates()
+    updates = []
+    if sources and stores:
+        stored = [doc for doc in get_documents(stores[0], list(sources)) if doc.id in sources]
+        if len(stored) < len(sources):
+            logger.warning(f"{len(sources) - len(stored)} deduplicated chunks not found for their rewrite")
+        updates = [dataclasses.replace(doc, meta={**doc.meta, "duplicate_sources": sources[doc.id]},
+                                       embedding=None, score=None)
+                   for doc in stored if doc.meta.get("duplicate_sources") != sources[doc.id]]
+    if updates:
+        if embedder is not None:
+            updates, _ = _embed_batch(updates, embed_fn, cache, model_id)
+        write_to_stores(stores, updates, writer=writer)
+    stats = dedup.stats()
+    saved_s = stats["duplicates"] * embed_ms_per_chunk / 1000 if embedder is not None else 0.0
+    logger.info(f"Deduplication dropped {stats['duplicates']} of {stats['chunks']} chunks "
+                f"(~{saved_s:.1f}s of embedding saved)")
+    return {**stats, "rewritten": len(updates), "rewrite_ms": round(_elapsed_ms(start), 2),
+            "est_embed_s_saved": round(saved_s, 2)}
+
+
+# ═══════════════════════════════════════════════════════════
+#  Streaming Ingestion
+# ═══════════════════════════════════════════════════════════
+
+def stream_ingest(texts: Iterable[str], stores: List, embedder=None,
+                  chunk_size: int = 500, batch_size: int = DEFAULT_BATCH_SIZE,
+                  cache=None, embedding_model_id: Optional[str] = None,
+                  manifest=None, index_key: Optional[str] = None,
+                  executor=None,
+                  writer=None,
+                  dedup=None,
+                  on_document: Optional[Callable[[Document], None]] = None,
+                  progress_callback: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Split, embed and write documents batch by batch.
+
+    Args:
+        texts: Any iterable of raw texts (list, generator, file reader...)
+        stores: Document stores that receive every embedded batch
+        embedder: Optional Haystack DocumentEmbedder
+        chunk_size: Words per chunk (10% overlap)
+        batch_size: Chunks embedded and written per batch
+        cache: Optional EmbeddingCache; only cache misses are embedded
+        embedding_model_id: Model id keying the embedding cache and chunk fingerprints
+        manifest: Optional IndexManifest enabling incremental reindexing of
+                  persistent stores (requires index_key)
+        index_key: Identifies the store collection inside the manifest
+        executor: Optional IngestionExecutor; splitting and embedding then run
+                  in its worker processes (each with its own embedder)
+        writer: Optional BulkWriter batching, parallelizing and retrying the
+                writes to remote stores (default settings if None)
+        dedup: Optional ChunkDeduplicator; near-duplicate chunks are dropped
+               before embedding and listed on the chunk they duplicate
+        on_document: Called with every source Document before it is split
+        progress_callback: Called with {"stage": "ingest", ...} after each batch (with
+                           cumulative stage timings) and once more on completion;
+                           it may raise to abort the ingestion
+
+    Returns:
+        Ingestion report with counts, per-batch progress and stage timings
+    """
+    batch_size = max(1, int(batch_size or DEFAULT_BATCH_SIZE))
+    workers = executor.workers if executor is not None else 1
+    if executor is not None:
+        # Give every worker a meaningful share of each batch
+        batch_size = max(batch_size, workers * MIN_CHUNKS_PER_WORKER)
+    incremental = manifest is not None and bool(index_key)
+    report = _new_report(batch_size, incremental, workers)
+    timings = report["stage_timings_ms"]
+    changes = report["index_changes"]
+
+    generation = None
+    if incremental:
+        generation = manifest.begin(index_key, store_count=count_documents(stores[0]) if stores else None)
+
+    splitter = make_splitter(chunk_size)
+    ingested_at = now_iso()
+    if executor is not None:
+        embed_fn = executor.embed
+    else:
+        if embedder is not None and hasattr(embedder, "warm_up"):
+            embedder.warm_up()
+
+        def embed_fn(docs: List[Document]) -> List[Document]:
+            return embedder.run(documents=docs).get("documents", docs)
+
+    embedded = 0
+
+    def flush(chunks: List[Document]):
+        nonlocal embedded
+        # Repeated sources collapse onto the same ids; keep the last copy
+        chunks = list({c.id: c for c in chunks}.values())
+        batch_info = {"batch": len(report["batches"]) + 1, "chunks": len(chunks)}
+
+        # Before the incremental check, so a chunk that became a duplicate counts as stale
+        if dedup is not None:
+            start = time.perf_counter()
+            kept = dedup.filter(chunks)
+            batch_info["duplicates"] = len(chunks) - len(kept)
+            chunks = kept
+            timings["dedup"] += _elapsed_ms(start)
+
+        fingerprints = {}
+        if incremental:
+            fingerprints = {c.id: _fingerprint(c, embedding_model_id) for c in chunks}
+            known = manifest.lookup(index_key, fingerprints)
+            changed = [c for c in chunks if known.get(c.id) != fingerprints[c.id]]
+            updated = sum(1 for c in changed if c.id in known)
+            changes["updated"] += updated
+            changes["added"] += len(changed) - updated
+            changes["unchanged"] += len(chunks) - len(changed)
+            batch_info["unchanged"] = len(chunks) - len(changed)
+            chunks = changed
+        else:
+            changes["added"] += len(chunks)
+
+        start = time.perf_counter()
+        if embedder is not None and chunks:
+            embedded += len(chunks)
+            chunks, hits = _embed_batch(chunks, embed_fn, cache, embedding_model_id)
+            batch_info["cache_hits"] = hits
+            report["embedding_cache"]["hits"] += hits
+            report["embedding_cache"]["misses"] += len(chunks) - hits
+        batch_info["embed_ms"] = round(_elapsed_ms(start), 2)
+        timings["embed"] += batch_info["embed_ms"]
+
+        start = time.perf_counter()
+        batch_info["writes"] = write_to_stores(stores, chunks, writer=writer)
+        batch_info["write_ms"] = round(_elapsed_ms(start), 2)
+        timings["write"] += batch_info["write_ms"]
+        if incremental:
+            manifest.mark(index_key, fingerprints.items(), generation)
+
+        report["chunks"] += batch_info["chunks"]
+        batch_info["chunks_done"] = report["chunks"]
+        batch_info["documents_done"] = report["documents"]
+        report["batches"].append(batch_info)
+        logger.info(f"Ingested batch {batch_info['batch']}: {len(chunks)} chunks "
+                    f"(embed {batch_info['embed_ms']:.0f}ms, write {batch_info['write_ms']:.0f}ms)")
+        if progress_callback:
+            progress_callback({"stage": "ingest", **batch_info, "stage_timings_ms": dict(timings)})
+
+    pending: List[Document] = []
+    source = iter_documents(texts)
+    # Workers split a small group of source documents at a time
+    group_size = workers * 4 if executor is not None else 1
+    while True:
+        start = time.perf_counter()
+        group = list(itertools.islice(source, group_size))
+        timings["load_texts"] += _elapsed_ms(start)
+        if not group:
+            break
+
+        for document in group:
+            report["documents"] += 1
+            report["characters"] += len(document.content)
+            if on_document:
+                on_document(document)
+
+        start = time.perf_counter()
+        if executor is not None:
+            split_groups = executor.split([d.content for d in group], chunk_size)
+        else:
+            split_groups = [splitter.run(documents=[d]).get("documents", [d]) for d in group]
+        for document, chunks in zip(group, split_groups):
+            pending.extend(_assign_chunk_ids(chunks, source_key(document), document.meta, ingested_at))
+        timings["split"] += _elapsed_ms(start)
+
+        while len(pending) >= batch_size:
+            flush(pending[:batch_size])
+            pending = pending[batch_size:]
+
+    if pending:
+        flush(pending)
+
+    if dedup is not None:
+        report["dedup"] = _finish_dedup(dedup, stores, embedder, embed_fn, cache, embedding_model_id, writer,
+                                        embed_ms_per_chunk=timings["embed"] / embedded if embedded else 0.0)
+        timings["write"] += report["dedup"]["rewrite_ms"]
+
+    # Chunks not seen in this generation belong to removed or shrunk sources
+    if incremental:
+        start = time.perf_counter()
+        for stale_ids in manifest.iter_stale(index_key, generation):
+            for store in stores:
+                delete_documents(store, stale_ids)
+            changes["deleted"] += len(stale_ids)
+        timings["write"] += _elapsed_ms(start)
+        logger.info(f"Incremental reindex of '{index_key}': {changes['added']} added, "
+                    f"{changes['updated']} updated, {changes['deleted']} deleted, "
+                    f"{changes['unchanged']} unchanged")
+
+    report["stage_timings_ms"] = {k: round(v, 2) for k, v in timings.items()}
+    if progress_callback:
+        progress_callback({"stage": "ingest", "status": "completed",
+                           "documents_done": report["documents"], "chunks_done": report["chunks"],
+                           "stage_timings_ms": dict(report["stage_timings_ms"])})
+    logger.info(f"Streaming ingestion complete: {report['documents']} documents → "
+                f"{report['chunks']} chunks in {len(report['batches'])} batches")
+    return report
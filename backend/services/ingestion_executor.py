@@ -0,0 +1,248 @@
+"""
+Ingestion Executor — Process pool for CPU-bound ingestion work.
+Parsing, splitting and embedding run in worker processes, each holding its own
+embedder, so a deploy can use every core instead of one Python thread.
+Work is sharded contiguously and results are always returned in input order.
+At most INGEST_MAX_POOLS pools (one per worker count, embedding model and
+credentials) are kept; the least recently used one is shut down beyond that.
+"""
+import os
+import hashlib
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Sequence, Tuple
+
+from haystack import Document
+
+logger = logging.getLogger(__name__)
+
+# Each pool holds one embedder per worker, so only a few are kept alive
+MAX_POOLS = int(os.environ.get("INGEST_MAX_POOLS", "2"))
+
+
+# ═══════════════════════════════════════════════════════════
+#  Worker-side State (one copy per process)
+# ═══════════════════════════════════════════════════════════
+
+_worker_state: dict = {}
+
+
+def _init_worker(embedding_model: Optional[str], api_key: Optional[str], torch_threads: int):
+    """Load the embedder once per worker and keep intra-op threads per worker low."""
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    embedder = None
+    if embedding_model:
+        from .embedding_service import get_document_embedder
+        embedder = get_document_embedder(embedding_model, api_key)
+        if embedder is not None and hasattr(embedder, "warm_up"):
+            embedder.warm_up()
+    _worker_state["embedder"] = embedder
+    _worker_state["splitters"] = {}
+
+
+def _split_texts(texts: List[str], chunk_size: int) -> List[List[Document]]:
+    from .ingestion import make_splitter
+    splitters = _worker_state.setdefault("splitters", {})
+    if chunk_size not in splitters:
+        splitters[chunk_size] = make_splitter(chunk_size)
+    splitter = splitters[chunk_size]
+    results = []
+    for text in texts:
+        doc = Document(content=text)
+        results.append(splitter.run(documents=[doc]).get("documents", [doc]))
+    return results
+
+
+def _embed_documents(documents: List[Document]) -> List[Document]:
+    embedder = _worker_state.get("embedder")
+    if embedder is None:
+        return documents
+    return embedder.run(documents=documents).get("documents", documents)
+
+
+def _parse_files(paths: List[str]) -> List[str]:
+    from .document_parser import parse_document
+    return [parse_document(path) for path in paths]
+
+
+def _shard(items: Sequence, n: int) -> List[list]:
+    """Split items into at most n contiguous, nearly equal, non-empty slices."""
+    items = list(items)
+    n = max(1, min(n, len(items)))
+    size, extra = divmod(len(items), n)
+    shards, start = [], 0
+    for i in range(n):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(items[start:end])
+        start = end
+    return [s for s in shards if s]
+
+
+# ═══════════════════════════════════════════════════════════
+#  Executor
+# ═══════════════════════════════════════════════════════════
+
+class IngestionExecutor:
+    """
+    Process pool whose workers each hold their own embedder.
+
+    Workers are started with the 'spawn' method so no model or thread state is
+    inherited from the API process, and each worker limits torch to its share
+    of the cores to avoid oversubscription.
+    """
+
+    def __init__(self, workers: int, embedding_model: Optional[str] = None,
+                 api_key: Optional[str] = None):
+        self.workers = max(1, int(workers))
+        self.embedding_model = embedding_model
+        # Deploys using the pool; an evicted pool is shut down by its last user
+        self._leases = 0
+        self._retired = False
+        self._lease_lock = threading.Lock()
+        torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(embedding_model, api_key, torch_threads),
+        )
+        logger.info(f"Ingestion executor started: {self.workers} workers, "
+                    f"embedder={embedding_model or 'none'}, torch threads/worker={torch_threads}")
+
+    def split(self, texts: List[str], chunk_size: int) -> List[List[Document]]:
+        """Split each text into chunks; returns one chunk list per text, in order."""
+        shards = _shard(texts, self.workers)
+        results = self._map(_split_texts, shards, [chunk_size] * len(shards))
+        return [chunks for shard in results for chunks in shard]
+
+    def embed(self, documents: List[Document]) -> List[Document]:
+        """Embed documents across all workers; output order matches input order."""
+        if not documents:
+            return []
+        shards = _shard(documents, self.workers)
+        return [doc for shard in self._map(_embed_documents, shards) for doc in shard]
+
+    def parse(self, paths: List[str]) -> List[str]:
+        """Parse files with document_parser across all workers, in order."""
+        if not paths:
+            return []
+        shards = _shard(paths, self.workers)
+        return [text for shard in self._map(_parse_files, shards) for text in shard]
+
+    def _map(self, fn, *iterables) -> list:
+        try:
+            return list(self._pool.map(fn, *iterables))
+        except BrokenProcessPool:
+            # A worker died (OOM, crash); the pool cannot be used again
+            logger.error(f"Ingestion executor with {self.workers} workers broke — discarding it")
+            _discard(self)
+            raise
+
+    def _acquire(self):
+        with self._lease_lock:
+            self._leases += 1
+
+    def release(self):
+        """Hand back the pool taken with get_ingestion_executor()."""
+        with self._lease_lock:
+            self._leases -= 1
+            stop = self._retired and self._leases <= 0
+        if stop:
+            self.shutdown(drain=True)
+
+    def _retire(self):
+        """Shut down once no deploy uses the pool any more."""
+        with self._lease_lock:
+            self._retired = True
+            stop = self._leases <= 0
+        if stop:
+            self.shutdown(drain=True)
+
+    def shutdown(self, drain: bool = False):
+        """Stop the workers; drain=True lets already submitted work finish in the background."""
+        if drain:
+            self._pool.shutdown(wait=False)
+        else:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ═══════════════════════════════════════════════════════════
+#  Public API
+# ═══════════════════════════════════════════════════════════
+
+_executors: "OrderedDict[Tuple, IngestionExecutor]" = OrderedDict()
+_executors_lock = threading.Lock()
+
+
+def resolve_workers(value=None) -> int:
+    """
+    Turn a worker setting into a process count, at most one per core.
+    Accepts an int, "auto" (all cores) or None (INGEST_WORKERS env, default 1).
+    """
+    cores = os.cpu_count() or 1
+    if value is None:
+        value = os.environ.get("INGEST_WORKERS", 1)
+    if str(value).lower() == "auto":
+        return cores
+    try:
+        workers = max(1, int(value))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid ingest worker count '{value}', using 1")
+        return 1
+    if workers > cores:
+        logger.warning(f"Ingest worker count {workers} exceeds the {cores} cores, using {cores}")
+        return cores
+    return workers
+
+
+def get_ingestion_executor(workers: int, embedding_model: Optional[str] = None,
+                           api_key: Optional[str] = None) -> IngestionExecutor:
+    """
+    Return a shared executor for (workers, embedding model, credentials);
+    hand it back with release() when done. Pools are reused across deploys so
+    worker models are loaded only once; beyond MAX_POOLS the least recently
+    used pool is shut down as soon as no deploy uses it.
+    """
+    workers = resolve_workers(workers)
+    key_fp = hashlib.sha256(api_key.encode()).hexdigest()[:12] if api_key else None
+    key = (workers, embedding_model, key_fp)
+    evicted = []
+    with _executors_lock:
+        if key in _executors:
+            _executors.move_to_end(key)
+        else:
+            _executors[key] = IngestionExecutor(workers, embedding_model, api_key)
+            while len(_executors) > max(1, MAX_POOLS):
+                evicted.append(_executors.popitem(last=False)[1])
+        executor = _executors[key]
+        executor._acquire()
+    for old in evicted:
+        logger.info(f"Ingestion executor with {old.workers} workers ({old.embedding_model or 'no embedder'}) evicted")
+        old._retire()
+    return executor
+
+
+def _discard(executor: IngestionExecutor):
+    """Drop a broken executor from the cache so the next deploy gets a fresh pool."""
+    with _executors_lock:
+        for key, cached in list(_executors.items()):
+            if cached is executor:
+                del _executors[key]
+    executor._retire()
+
+
+def shutdown_executors():
+    """Stop all worker pools (called on application shutdown)."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown()
+        _executors.clear()
@@ -0,0 +1,277 @@
+"""
+Job Manager — Background deployment jobs with progress and stage timings.
+Deploys run on a small thread pool so the API event loop keeps serving chat
+traffic while large RAGs are embedded. Jobs can be polled, streamed and
+cancelled; cancellation takes effect at the next ingestion batch. Deploys
+into the same collection never run at the same time: a second job for a
+collection that is already deploying is rejected, and jobs and direct
+deploys take the collection's lock while they run.
+"""
+import os
+import time
+import asyncio
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_DEPLOYS = int(os.environ.get("DEPLOY_JOB_WORKERS", "2"))
+MAX_RETAINED_JOBS = 200
+
+# Stages reported for every deploy, in execution order
+DEPLOY_STAGES = ["load_texts", "split", "embed", "write", "build_graph", "register"]
+
+TERMINAL_STATES = {"completed", "failed", "cancelled"}
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job when cancellation was requested."""
+
+
+class DeployInProgress(Exception):
+    """Raised when a deploy is submitted for a collection that is already deploying."""
+
+    def __init__(self, job: Optional["DeploymentJob"], key: str):
+        super().__init__(f"A deploy of '{key}' is already in progress")
+        self.job = job
+        self.key = key
+
+
+# ═══════════════════════════════════════════════════════════
+#  Deployment Job
+# ═══════════════════════════════════════════════════════════
+
+class DeploymentJob:
+    """State of one background deploy. Every update bumps `version` and wakes waiters."""
+
+    def __init__(self, rag_name: str = "", key: Optional[str] = None):
+        self.id = f"job_{uuid.uuid4().hex[:12]}"
+        self.rag_name = rag_name
+        self.key = key
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stages = {name: {"status": "pending", "ms": 0.0} for name in DEPLOY_STAGES}
+        self.progress = {"documents_done": 0, "chunks_done": 0, "batches": 0}
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.version = 0
+        self._cancel = threading.Event()
+        self._cond = threading.Condition()
+        # (loop, event) of async waiters, set from the updating thread
+        self._async_waiters: List[tuple] = []
+        self._future = None
+
+    # ── Updates ──────────────────────────────────────────
+    def _touch(self):
+        self.version += 1
+        self._cond.notify_all()
+        for loop, event in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # loop closed
+
+    def set_status(self, status: str, error: Optional[str] = None, result: Optional[dict] = None):
+        with self._cond:
+            self.status = status
+            if status == "running":
+                self.started_at = time.time()
+            if status in TERMINAL_STATES:
+                self.finished_at = time.time()
+                for stage in self.stages.values():
+                    if stage["status"] == "running":
+                        stage["status"] = "completed" if status == "completed" else status
+            self.error = error
+            self.result = result
+            self._touch()
+
+    def on_progress(self, event: dict):
+        """Progress callback handed to the deploy; raises JobCancelled when cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} cancelled")
+        with self._cond:
+            for name, ms in event.get("stage_timings_ms", {}).items():
+                if name in self.stages:
+                    self.stages[name]["ms"] = round(ms, 2)
+                    if self.stages[name]["status"] == "pending":
+                        self.stages[name]["status"] = "running"
+            stage = event.get("stage")
+            if stage in self.stages:
+                if "ms" in event:
+                    self.stages[stage]["ms"] = round(event["ms"], 2)
+                self.stages[stage]["status"] = event.get("status", "running")
+            if stage == "ingest" and event.get("status") == "completed":
+                for name in ("load_texts", "split", "embed", "write"):
+                    self.stages[name]["status"] = "completed"
+            for key in ("documents_done", "chunks_done"):
+                if key in event:
+                    self.progress[key] = event[key]
+            if "batch" in event:
+                self.progress["batches"] = event["batch"]
+            self._touch()
+
+    # ── Control ──────────────────────────────────────────
+    def cancel(self) -> bool:
+        """Request cancellation. Queued jobs stop immediately, running ones at the next batch."""
+        if self.status in TERMINAL_STATES:
+            return False
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():
+            self.set_status("cancelled")
+        return True
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    async def next_update(self, since_version: int, timeout: float = 15.0) -> int:
+        """
+        Wait until the job changes past since_version (or timeout); return the
+        current version. Runs on the event loop and holds no worker thread.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._cond:
+            if self.version > since_version or self.status in TERMINAL_STATES:
+                return self.version
+            self._async_waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._async_waiters.remove(waiter)
+        return self.version
+
+    def to_dict(self) -> dict:
+        with self._cond:
+            now = self.finished_at or time.time()
+            return {
+                "job_id": self.id,
+                "rag_name": self.rag_name,
+                "collection": self.key,
+                "status": self.status,
+                "cancel_requested": self._cancel.is_set(),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed_ms": round((now - self.started_at) * 1000, 2) if self.started_at else 0.0,
+                "stages": {k: dict(v) for k, v in self.stages.items()},
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "version": self.version,
+            }
+
+
+# ═══════════════════════════════════════════════════════════
+#  Job Registry
+# ═══════════════════════════════════════════════════════════
+
+_jobs: "OrderedDict[str, DeploymentJob]" = OrderedDict()
+_jobs_lock = threading.Lock()
+_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DEPLOYS, thread_name_prefix="deploy-job")
+# One lock per collection key, held for the whole deploy
+_collection_locks: Dict[str, threading.Lock] = {}
+
+
+def collection_lock(key: str) -> threading.Lock:
+    """The lock serializing deploys into the collection identified by key."""
+    with _jobs_lock:
+        return _collection_locks.setdefault(key, threading.Lock())
+
+
+def _active_job(key: str) -> Optional[DeploymentJob]:
+    """Queued or running job for key (caller holds _jobs_lock)."""
+    for job in _jobs.values():
+        if job.key == key and job.status not in TERMINAL_STATES:
+            return job
+    return None
+
+
+def _run(job: DeploymentJob, deploy_fn: Callable[[Callable[[dict], None]], dict]):
+    with collection_lock(job.key) if job.key else nullcontext():
+        _run_locked(job, deploy_fn)
+
+
+def _run_locked(job: DeploymentJob, deploy_fn: Callable[[Callable[[dict], None]], dict]):
+    # A direct deploy of the collection may have held the lock while the job waited
+    if job.cancel_requested:
+        job.set_status("cancelled")
+        return
+    job.set_status("running")
+    logger.info(f"Deployment job {job.id} started ({job.rag_name or 'unnamed'})")
+    try:
+        result = deploy_fn(job.on_progress)
+        job.set_status("completed", result=result)
+        logger.info(f"Deployment job {job.id} completed: {result.get('pipeline_id')}")
+    except JobCancelled:
+        job.set_status("cancelled")
+        logger.info(f"Deployment job {job.id} cancelled")
+    except Exception as e:
+        job.set_status("failed", error=str(e))
+        logger.error(f"Deployment job {job.id} failed: {e}")
+
+
+def _prune():
+    """Drop the oldest finished jobs beyond the retention limit."""
+    finished = [jid for jid, j in _jobs.items() if j.status in TERMINAL_STATES]
+    for jid in finished[:max(0, len(_jobs) - MAX_RETAINED_JOBS)]:
+        del _jobs[jid]
+
+
+# ═══════════════════════════════════════════════════════════
+#  Public API
+# ═══════════════════════════════════════════════════════════
+
+def submit_job(deploy_fn: Callable[[Callable[[dict], None]], dict], rag_name: str = "",
+               key: Optional[str] = None) -> DeploymentJob:
+    """
+    Queue a deploy. deploy_fn receives the job's progress callback and returns
+    the deployment info dict that becomes the job result. key identifies the
+    collection the deploy writes to (see collection_key); raises
+    DeployInProgress while another deploy into it is queued or running.
+    """
+    job = DeploymentJob(rag_name, key)
+    with _jobs_lock:
+        if key:
+            active = _active_job(key)
+            lock = _collection_locks.get(key)
+            if active is not None or (lock is not None and lock.locked()):
+                raise DeployInProgress(active, key)
+        _jobs[job.id] = job
+        _prune()
+    job._future = _pool.submit(_run, job, deploy_fn)
+    return job
+
+
+def is_deploying(key: str) -> bool:
+    """Whether a job or a direct deploy into the collection is in progress."""
+    with _jobs_lock:
+        if _active_job(key) is not None:
+            return True
+        lock = _collection_locks.get(key)
+    return lock is not None and lock.locked()
+
+
+def get_job(job_id: str) -> Optional[DeploymentJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def cancel_job(job_id: str) -> bool:
+    job = get_job(job_id)
+    return job.cancel() if job else False
+
+
+def list_jobs(limit: int = 50) -> List[dict]:
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+    return [j.to_dict() for j in reversed(jobs)][:limit]
@@ -0,0 +1,121 @@
+"""
+Metadata Index — Inverted lists over chunk metadata for filtered retrieval.
+Maps (field, value) to the sorted row ids holding that value, for the source
+fields ingestion attaches to every chunk. resolve_filter() turns a Haystack
+filter into the candidate rows it can possibly match, so a store scores only
+those instead of the whole collection; stores still check each hit with
+document_matches_filter, so the candidates only need to be a superset.
+"""
+import json
+import logging
+from functools import reduce
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("source", "source_type", "domain", "path", "section", "filename", "file_type", "page_number")
+
+# Returns the sorted rows holding any of the encoded values of a field
+Lookup = Callable[[str, List[str]], np.ndarray]
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def encode_value(value: Any) -> str:
+    """Canonical string for a metadata value (1 and 1.0 index alike)."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def index_terms(meta: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(field, encoded value) pairs of a document's indexed, scalar metadata."""
+    return [
+        (field, encode_value(meta[field]))
+        for field in INDEXED_FIELDS
+        if field in meta and isinstance(meta[field], (str, int, float, bool))
+    ]
+
+
+def resolve_filter(filters: Optional[Dict[str, Any]], lookup: Lookup) -> Optional[np.ndarray]:
+    """
+    Sorted candidate rows for filters, or None when the index cannot narrow
+    them down (unindexed field, range or negated condition...). AND narrows
+    with whichever conditions are indexed; OR needs all of its branches.
+    """
+    if not filters:
+        return None
+    if "conditions" in filters:
+        parts = [resolve_filter(condition, lookup) for condition in filters["conditions"]]
+        operator = filters.get("operator")
+        if operator == "AND":
+            known = [part for part in parts if part is not None]
+            return reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), known) if known else None
+        if operator == "OR" and parts and all(part is not None for part in parts):
+            return reduce(np.union1d, parts)
+        return None
+
+    field = filters.get("field", "")
+    if not field.startswith("meta.") or field[len("meta."):] not in INDEXED_FIELDS:
+        return None
+    name, operator, value = field[len("meta."):], filters.get("operator"), filters.get("value")
+    if operator == "==" and value is not None:
+        return lookup(name, [encode_value(value)])
+    if operator == "in" and isinstance(value, list) and None not in value:
+        return lookup(name, [encode_value(v) for v in value])
+    return None
+
+
+class MetadataIndex:
+    """In-memory inverted lists of row ids per (field, value)."""
+
+    def __init__(self):
+        self._postings: Dict[Tuple[str, str], List[int]] = {}
+        self._arrays: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def add(self, row: int, meta: Dict[str, Any]):
+        for term in index_terms(meta):
+            self._postings.setdefault(term, []).append(row)
+            self._arrays.pop(term, None)
+
+    def add_many(self, items: Iterable[Tuple[int, Dict[str, Any]]]):
+        for row, meta in items:
+            self.add(row, meta)
+
+    def add_postings(self, term: Tuple[str, str], rows: Iterable[int]):
+        self._postings.setdefault(term, []).extend(rows)
+        self._arrays.pop(term, None)
+
+    def postings(self) -> Iterator[Tuple[Tuple[str, str], np.ndarray]]:
+        for field, value in list(self._postings):
+            yield (field, value), self.lookup(field, [value])
+
+    def lookup(self, field: str, values: List[str]) -> np.ndarray:
+        arrays = []
+        for value in values:
+            term = (field, value)
+            if term not in self._postings:
+                continue
+            if term not in self._arrays:
+                self._arrays[term] = np.unique(np.asarray(self._postings[term], dtype=np.int64))
+            arrays.append(self._arrays[term])
+        if not arrays:
+            return _EMPTY
+        return arrays[0] if len(arrays) == 1 else reduce(np.union1d, arrays)
+
+    def candidates(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        return resolve_filter(filters, self.lookup)
+
+    # ── Persistence ──────────────────────────────────────
+    def to_json(self) -> dict:
+        return {f"{field}\t{value}": rows.tolist() for (field, value), rows in self.postings()}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "MetadataIndex":
+        index = cls()
+        for key, rows in data.items():
+            field, _, value = key.partition("\t")
+            index._postings[(field, value)] = rows
+        return index
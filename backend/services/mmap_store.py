@@ -0,0 +1,495 @@
+"""
+Mmap Store — Zero-dependency local vector store for large collections.
+Embeddings (L2-normalized float32) are appended to a flat file that is read
+through np.memmap; chunk text and metadata live in SQLite (WAL mode) next to
+it under STORES_DIR/mmap. Opening a store reads a few SQLite rows and maps
+the file, so it takes milliseconds whatever the size, and every process
+serving the same collection shares its pages through the OS page cache.
+Search is a blocked dot-product scan, optionally preceded by a binary-code
+(Hamming) candidate pass that is then rescored exactly. Filters on indexed
+source fields (see metadata_index) are answered from a SQLite inverted
+index first, so only the matching rows are scored.
+"""
+import os
+import json
+import shutil
+import sqlite3
+import logging
+import tempfile
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from haystack import Document, component, default_from_dict, default_to_dict
+from haystack.document_stores.errors import DuplicateDocumentError
+from haystack.document_stores.types import DuplicatePolicy
+from haystack.utils.filters import document_matches_filter
+
+from .metadata_index import index_terms, resolve_filter
+from .multi_retriever import top_k_indices
+from .vector_store_manager import STORES_DIR
+
+logger = logging.getLogger(__name__)
+
+MMAP_DIR = os.path.join(STORES_DIR, "mmap")
+
+ANN_MODES = (None, "binary")
+DEFAULT_RESCORE_MULTIPLIER = 10
+# Bytes of vectors scored per step, so a scan never materializes the whole file
+_BLOCK_BYTES = 16 * 1024 * 1024
+# Dead rows are compacted away once they make up this share of the file
+MAX_DEAD_RATIO = 0.25
+# Filter candidates are gathered row by row up to this share of the live rows;
+# above it a sequential scan with the non-candidates masked out is faster
+PREFILTER_MAX_SHARE = 0.5
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    row INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    content TEXT,
+    meta TEXT,
+    has_vector INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dead (row INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS meta_index (field TEXT NOT NULL, value TEXT NOT NULL, row INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS meta_index_term ON meta_index (field, value);
+CREATE INDEX IF NOT EXISTS meta_index_row ON meta_index (row);
+"""
+
+
+class _RowFile:
+    """Append-only matrix file of fixed-width rows, read through a memmap."""
+
+    def __init__(self, path: str, dtype, width: int):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        self.rows = 0
+        self._map = None
+
+    @property
+    def row_bytes(self) -> int:
+        return self.width * self.dtype.itemsize
+
+    def open(self, rows: int):
+        """
+        Adopt the committed row count. Only those rows are mapped; bytes past
+        them (an append not committed yet, or an interrupted one) are left alone,
+        so readers never change the file.
+        """
+        self.rows = rows
+        self._map = None
+
+    def append(self, matrix: np.ndarray):
+        """Write rows after the committed ones, over whatever an interrupted append left there."""
+        with open(self.path, "r+b" if os.path.exists(self.path) else "wb") as f:
+            f.seek(self.rows * self.row_bytes)
+            f.write(np.ascontiguousarray(matrix, dtype=self.dtype).tobytes())
+        self.rows += len(matrix)
+        self._map = None
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._map is None:
+            if self.rows == 0:
+                return np.zeros((0, self.width), dtype=self.dtype)
+            self._map = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(self.rows, self.width))
+        return self._map
+
+    def rewrite(self, keep: np.ndarray, block: int):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for start in range(0, len(keep), block):
+                f.write(np.asarray(self.matrix[keep[start:start + block]]).tobytes())
+        self._map = None
+        os.replace(tmp, self.path)
+        self.rows = len(keep)
+
+
+class MmapDocumentStore:
+    """
+    Document store backed by a memory-mapped vector file and SQLite (WAL).
+
+    Rows are append-only: an overwrite appends a new row and marks the old
+    one dead, and dead rows are reclaimed by compaction (commit_index() after
+    a deploy, or compact()). One process should write a collection at a
+    time; any number may read it, and readers pick up committed changes
+    through the info.version counter checked before every search.
+
+    With a collection name the files persist under MMAP_DIR/<collection>;
+    without one they live in a temporary directory removed with the store.
+    ann="binary" adds a sign-bit code file (32x smaller than the vectors)
+    that is Hamming-scanned first; the best top_k × rescore_multiplier rows
+    are then rescored exactly from the vector file.
+    """
+
+    def __init__(self, collection: Optional[str] = None, directory: str = MMAP_DIR,
+                 ann: Optional[str] = None, rescore_multiplier: int = DEFAULT_RESCORE_MULTIPLIER):
+        if ann not in ANN_MODES:
+            raise ValueError(f"Unknown ANN layer '{ann}' (expected one of {ANN_MODES})")
+        os.makedirs(directory, exist_ok=True)
+        self.collection = collection
+        self.directory = directory
+        self.ann = ann
+        self.rescore_multiplier = max(1, int(rescore_multiplier))
+        self.persistent = bool(collection)
+        if self.persistent:
+            self.path = os.path.join(directory, "".join(c if c.isalnum() or c in "-_." else "_" for c in collection))
+            os.makedirs(self.path, exist_ok=True)
+        else:
+            self.path = tempfile.mkdtemp(prefix="mmap_", dir=directory)
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self.path, True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(self.path, "chunks.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        if not self._info("meta_index"):
+            with self._conn:
+                self._reindex_meta()
+        self.dim: Optional[int] = None
+        self._vectors: Optional[_RowFile] = None
+        self._codes: Optional[_RowFile] = None
+        self._dead = np.zeros(0, dtype=bool)
+        self._version = -1
+        self._refresh()
+
+    # ── State ────────────────────────────────────────────
+    def _info(self, key: str, default=None):
+        row = self._conn.execute("SELECT value FROM info WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_info(self, **values):
+        self._conn.executemany("INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)",
+                               [(k, json.dumps(v)) for k, v in values.items()])
+
+    def _bump(self, rows: int):
+        self._version = self._info("version", 0) + 1
+        self._set_info(rows=rows, version=self._version)
+
+    def _open_files(self, dim: int):
+        self.dim = dim
+        self._vectors = _RowFile(os.path.join(self.path, "vectors.f32"), np.float32, dim)
+        if self.ann == "binary":
+            self._codes = _RowFile(os.path.join(self.path, "codes.u8"), np.uint8, (dim + 7) // 8)
+
+    def _refresh(self):
+        """Re-read row count and dead rows if another writer (or process) committed."""
+        with self._lock:
+            version = self._info("version", 0)
+            if version == self._version:
+                return
+            rows, dim = self._info("rows", 0), self._info("dim")
+            if dim is not None:
+                if self._vectors is None:
+                    self._open_files(dim)
+                self._vectors.open(rows)
+                if self._codes is not None:
+                    self._sync_codes(rows)
+            dead = np.zeros(rows, dtype=bool)
+            dead_rows = [r for (r,) in self._conn.execute(
+                "SELECT row FROM dead UNION ALL SELECT row FROM docs WHERE has_vector = 0")]
+            dead[[r for r in dead_rows if r < rows]] = True
+            self._dead = dead
+            self._version = version
+
+    def _sync_codes(self, rows: int):
+        """Open the code file, building codes for rows written before the ANN layer existed."""
+        committed = min(self._info("code_rows", 0), rows)
+        self._codes.open(committed)
+        block = self._block_rows()
+        for start in range(committed, rows, block):
+            end = min(start + block, rows)
+            self._codes.append(np.packbits(np.asarray(self._vectors.matrix[start:end]) > 0, axis=1))
+        if committed < rows:
+            self._set_info(code_rows=rows)
+            self._conn.commit()
+
+    def _reindex_meta(self):
+        """Rebuild the metadata index from docs (after compaction, or for stores created without one)."""
+        self._conn.execute("DELETE FROM meta_index")
+        cursor = self._conn.execute("SELECT row, meta FROM docs")
+        while True:
+            records = cursor.fetchmany(5000)
+            if not records:
+                break
+            self._index_meta([(row, json.loads(meta) if meta else {}) for row, meta in records])
+        self._set_info(meta_index=1)
+
+    def _index_meta(self, items):
+        self._conn.executemany("INSERT INTO meta_index (field, value, row) VALUES (?, ?, ?)",
+                               [(field, value, row) for row, meta in items for field, value in index_terms(meta)])
+
+    def _block_rows(self) -> int:
+        return max(1, _BLOCK_BYTES // (4 * (self.dim or 1)))
+
+    # ── Writes ───────────────────────────────────────────
+    def write_documents(self, documents: List[Document], policy: DuplicatePolicy = DuplicatePolicy.NONE) -> int:
+        batch = list({doc.id: doc for doc in documents}.values())  # last copy of an id wins
+        if not batch:
+            return 0
+        with self._lock:
+            self._refresh()
+            existing = self._rows_of([doc.id for doc in batch])
+            if existing and policy == DuplicatePolicy.SKIP:
+                batch = [doc for doc in batch if doc.id not in existing]
+            elif existing and policy in (DuplicatePolicy.FAIL, DuplicatePolicy.NONE):
+                raise DuplicateDocumentError(f"IDs '{list(existing)[:5]}' already exist in the mmap store.")
+            if not batch:
+                return 0
+
+            with_vectors = [doc.embedding for doc in batch if doc.embedding is not None]
+            if self.dim is None:
+                if not with_vectors:
+                    raise ValueError("The first documents written to an mmap store need embeddings")
+                self._open_files(len(with_vectors[0]))
+                self._set_info(dim=self.dim)
+            matrix = np.zeros((len(batch), self.dim), dtype=np.float32)
+            for i, doc in enumerate(batch):
+                if doc.embedding is not None:
+                    matrix[i] = doc.embedding
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+            # Vectors are appended before the SQLite commit that makes them visible
+            start = self._vectors.rows
+            self._vectors.append(matrix)
+            if self._codes is not None:
+                self._codes.append(np.packbits(matrix > 0, axis=1))
+            with self._conn:
+                if existing:
+                    self._retire(list(existing.values()))
+                self._conn.executemany(
+                    "INSERT INTO docs (row, id, content, meta, has_vector) VALUES (?, ?, ?, ?, ?)",
+                    [(start + i, doc.id, doc.content, json.dumps(doc.meta, default=str), int(doc.embedding is not None))
+                     for i, doc in enumerate(batch)])
+                self._index_meta((start + i, doc.meta) for i, doc in enumerate(batch))
+                if self._codes is not None:
+                    self._set_info(code_rows=self._codes.rows)
+                self._bump(self._vectors.rows)
+            dead = np.zeros(self._vectors.rows, dtype=bool)
+            dead[:len(self._dead)] = self._dead
+            dead[list(existing.values())] = True
+            dead[[start + i for i, doc in enumerate(batch) if doc.embedding is None]] = True
+            self._dead = dead
+            return len(batch)
+
+    def _rows_of(self, ids: List[str]) -> Dict[str, int]:
+        found = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            found.update(self._conn.execute(
+                f"SELECT id, row FROM docs WHERE id IN ({','.join('?' * len(chunk))})", chunk).fetchall())
+        return found
+
+    def _retire(self, rows: List[int]):
+        self._conn.executemany("DELETE FROM docs WHERE row = ?", [(r,) for r in rows])
+        self._conn.executemany("DELETE FROM meta_index WHERE row = ?", [(r,) for r in rows])
+        self._conn.executemany("INSERT OR IGNORE INTO dead (row) VALUES (?)", [(r,) for r in rows])
+
+    def delete_documents(self, document_ids: List[str]) -> None:
+        with self._lock:
+            self._refresh()
+            rows = list(self._rows_of(list(document_ids)).values())
+            if not rows:
+                return
+            with self._conn:
+                self._retire(rows)
+                self._bump(self._vectors.rows)
+            self._dead[rows] = True
+
+    def compact(self):
+        """Rewrite the files without dead rows and renumber the remaining ones."""
+        with self._lock:
+            self._refresh()
+            if self._vectors is None or not self._dead.any():
+                return
+            keep = np.flatnonzero(~self._dead)
+            block = self._block_rows()
+            # Rows without vectors stay in SQLite but get no slot in the new files
+            with self._conn:
+                self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS renumber (old INTEGER PRIMARY KEY, new INTEGER)")
+                self._conn.execute("DELETE FROM renumber")
+                self._conn.executemany("INSERT INTO renumber (old, new) VALUES (?, ?)",
+                                       zip(keep.tolist(), range(len(keep))))
+                # Rows are the primary key; shift them out of the way before renumbering
+                self._conn.execute("UPDATE docs SET row = -1 - row")
+                self._conn.execute("UPDATE docs SET row = (SELECT new FROM renumber WHERE old = -1 - docs.row) "
+                                   "WHERE -1 - row IN (SELECT old FROM renumber)")
+                orphans = self._conn.execute("SELECT id FROM docs WHERE row < 0").fetchall()
+                for offset, (doc_id,) in enumerate(orphans):
+                    self._conn.execute("UPDATE docs SET row = ? WHERE id = ?", (len(keep) + offset, doc_id))
+                self._conn.execute("DELETE FROM dead")
+                self._reindex_meta()
+                self._vectors.rewrite(keep, block)
+                if orphans:
+                    self._vectors.append(np.zeros((len(orphans), self.dim), dtype=np.float32))
+                if self._codes is not None:
+                    self._codes.rewrite(keep, block)
+                    if orphans:
+                        self._codes.append(np.zeros((len(orphans), self._codes.width), dtype=np.uint8))
+                    self._set_info(code_rows=self._codes.rows)
+                self._bump(self._vectors.rows)
+            self._version = -1
+            self._refresh()
+            logger.info(f"Mmap store '{self.collection}' compacted to {self._vectors.rows} rows")
+
+    def commit_index(self):
+        """End of a deploy: compact once dead rows make up MAX_DEAD_RATIO of the file."""
+        if len(self._dead) and self._dead.sum() > MAX_DEAD_RATIO * len(self._dead):
+            self.compact()
+
+    # ── Reads ────────────────────────────────────────────
+    def count_documents(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def _document(self, row: Tuple, score: Optional[float] = None) -> Document:
+        _, doc_id, content, meta = row
+        return Document(id=doc_id, content=content, meta=json.loads(meta) if meta else {}, score=score)
+
+    def filter_documents(self, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        cursor = self._conn.execute("SELECT row, id, content, meta FROM docs ORDER BY row")
+        documents = (self._document(r) for r in cursor)
+        if not filters:
+            return list(documents)
+        return [doc for doc in documents if document_matches_filter(filters=filters, document=doc)]
+
+    def _lookup(self, field: str, values: List[str]) -> np.ndarray:
+        rows = self._conn.execute(
+            f"SELECT row FROM meta_index WHERE field = ? AND value IN ({','.join('?' * len(values))})",
+            [field, *values]).fetchall()
+        return np.unique(np.fromiter((r for (r,) in rows), dtype=np.int64, count=len(rows)))
+
+    def _scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Exact cosine scores for all rows (blocked scan) or for the given rows."""
+        vectors = self._vectors.matrix
+        block = self._block_rows()
+        if rows is not None:
+            order = np.argsort(rows)  # read the file front to back
+            scores = np.empty(len(rows), dtype=np.float32)
+            for start in range(0, len(rows), block):
+                part = order[start:start + block]
+                scores[part] = np.asarray(vectors[rows[part]]) @ query
+            return scores
+        scores = np.empty(len(vectors), dtype=np.float32)
+        for start in range(0, len(vectors), block):
+            scores[start:start + block] = np.asarray(vectors[start:start + block]) @ query
+        return scores
+
+    def _hamming_candidates(self, query: np.ndarray, dead: np.ndarray, n: int) -> np.ndarray:
+        codes = self._codes.matrix
+        query_bits = np.packbits(query > 0)
+        approx = np.empty(len(codes), dtype=np.int32)
+        block = self._block_rows() * 32
+        for start in range(0, len(codes), block):
+            approx[start:start + block] = -_POPCOUNT[codes[start:start + block] ^ query_bits].sum(
+                axis=1, dtype=np.int32)
+        approx[dead] = np.iinfo(np.int32).min
+        return top_k_indices(approx, n)
+
+    def embedding_retrieval(self, query_embedding: List[float], filters: Optional[Dict[str, Any]] = None,
+                            top_k: int = 10) -> List[Document]:
+        """
+        Top-k documents by cosine similarity. Filters narrow the rows to score
+        through the metadata index when they can, and are applied along the
+        ranking in any case.
+        """
+        self._refresh()
+        if self._vectors is None or self._vectors.rows == 0:
+            return []
+        dead = self._dead
+        live = len(dead) - int(dead.sum())
+        if live == 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        candidates = resolve_filter(filters, self._lookup) if filters else None
+        if candidates is not None:
+            candidates = candidates[candidates < len(dead)]
+            candidates = candidates[~dead[candidates]]
+            live = len(candidates)
+            if live == 0:
+                return []
+
+        if candidates is not None and live <= PREFILTER_MAX_SHARE * len(dead):
+            rows = candidates
+            scores = self._scores(query, rows)
+        elif candidates is not None:
+            scores = np.full(len(dead), -np.inf, dtype=np.float32)
+            scores[candidates] = self._scores(query)[candidates]
+            rows = None
+        elif self._codes is not None:
+            wanted = top_k * self.rescore_multiplier * (10 if filters else 1)
+            rows = self._hamming_candidates(query, dead, min(live, wanted))
+            scores = self._scores(query, rows)
+        else:
+            scores = self._scores(query)
+            scores[dead] = -np.inf
+            rows = None
+        order = top_k_indices(scores, min(live, len(scores)) if filters else min(top_k, live))
+        ranked = order if rows is None else rows[order]
+
+        results, batch = [], max(top_k * 4, 32)
+        for i in range(0, len(ranked), batch):
+            chunk = ranked[i:i + batch]
+            chunk_scores = scores[order[i:i + batch]]
+            fetched = {r[0]: r for r in self._conn.execute(
+                f"SELECT row, id, content, meta FROM docs WHERE row IN ({','.join('?' * len(chunk))})",
+                chunk.tolist())}
+            for row, score in zip(chunk.tolist(), chunk_scores.tolist()):
+                record = fetched.get(row)
+                if record is None:
+                    continue
+                doc = self._document(record, score=score)
+                if filters and not document_matches_filter(filters=filters, document=doc):
+                    continue
+                results.append(doc)
+                if len(results) >= top_k:
+                    return results
+        return results
+
+    def stats(self) -> dict:
+        self._refresh()
+        rows = self._vectors.rows if self._vectors is not None else 0
+        return {
+            "documents": self.count_documents(),
+            "rows": rows,
+            "dead_rows": int(self._dead.sum()),
+            "dim": self.dim,
+            "ann": self.ann,
+            "vector_mb": round(rows * (self.dim or 0) * 4 / 1e6, 2),
+            "persistent": self.persistent,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return default_to_dict(self, collection=self.collection, directory=self.directory,
+                               ann=self.ann, rescore_multiplier=self.rescore_multiplier)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MmapDocumentStore":
+        return default_from_dict(cls, data)
+
+
+@component
+class MmapEmbeddingRetriever:
+    """Embedding retriever over an MmapDocumentStore."""
+
+    def __init__(self, document_store: MmapDocumentStore, top_k: int = 10,
+                 filters: Optional[Dict[str, Any]] = None):
+        self.document_store = document_store
+        self.top_k = top_k
+        self.filters = filters
+
+    @component.output_types(documents=List[Document])
+    def run(self, query_embedding: List[float], filters: Optional[Dict[str, Any]] = None,
+            top_k: Optional[int] = None):
+        documents = self.document_store.embedding_retrieval(
+            query_embedding, filters=filters or self.filters, top_k=top_k or self.top_k)
+        return {"documents": documents}
@@ -0,0 +1,384 @@
+"""
+Model Registry — Process-wide shared embedding and ranking models.
+Each (kind, model, device) is loaded and warmed up once and shared by every
+pipeline through lightweight proxy components. Entries are reference counted;
+models nobody holds are evicted (least recently used first) once the loaded
+set exceeds the memory budget.
+"""
+import os
+import time
+import logging
+import threading
+from functools import partial
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from haystack import Document, component
+
+from .query_batcher import batching_enabled, get_query_batcher
+from .query_embedding_cache import get_query_embedding_cache
+from .rerank_service import rerank
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BUDGET_MB = float(os.environ.get("MODEL_MEMORY_BUDGET_MB", "4096"))
+DEFAULT_DEVICE = os.environ.get("MODEL_DEVICE") or None
+# Reranker backend: "torch" (TransformersSimilarityRanker) or "onnx_int8"
+RERANK_BACKEND = os.environ.get("RERANK_BACKEND", "torch")
+RERANK_ONNX_FILE = os.environ.get("RERANK_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+
+ModelKey = Tuple[str, str, Optional[str]]
+
+
+# ═══════════════════════════════════════════════════════════
+#  Loaders
+# ═══════════════════════════════════════════════════════════
+
+def _component_device(device: Optional[str]):
+    if not device:
+        return None
+    from haystack.utils import ComponentDevice
+    return ComponentDevice.from_str(device)
+
+
+def _load_text_embedder(model: str, device: Optional[str]):
+    from haystack.components.embedders import SentenceTransformersTextEmbedder
+    return SentenceTransformersTextEmbedder(model=model, device=_component_device(device))
+
+
+def _load_document_embedder(model: str, device: Optional[str]):
+    from haystack.components.embedders import SentenceTransformersDocumentEmbedder
+    return SentenceTransformersDocumentEmbedder(model=model, device=_component_device(device))
+
+
+def _load_ranker(model: str, device: Optional[str]):
+    from haystack.components.rankers import TransformersSimilarityRanker
+    return TransformersSimilarityRanker(model=model, device=_component_device(device))
+
+
+class _OnnxCrossEncoder:
+    """Int8-quantized ONNX export of a cross-encoder, run on CPU by sentence-transformers."""
+
+    def __init__(self, model: str, file_name: str = RERANK_ONNX_FILE):
+        self.model_name = model
+        self.file_name = file_name
+        self.encoder = None
+
+    def warm_up(self):
+        if self.encoder is None:
+            from sentence_transformers import CrossEncoder
+            self.encoder = CrossEncoder(self.model_name, device="cpu", backend="onnx",
+                                        model_kwargs={"file_name": self.file_name})
+
+    def score_pairs(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        # Single-label cross-encoders get a sigmoid, like TransformersSimilarityRanker's scale_score
+        return self.encoder.predict(pairs, batch_size=max(1, len(pairs)), show_progress_bar=False).tolist()
+
+
+def _load_onnx_ranker(model: str, device: Optional[str]):
+    if device and device != "cpu":
+        logger.warning(f"ONNX int8 reranker runs on CPU — ignoring device '{device}'")
+    return _OnnxCrossEncoder(model)
+
+
+_LOADERS = {
+    "text_embedder": _load_text_embedder,
+    "document_embedder": _load_document_embedder,
+    "ranker": _load_ranker,
+    "ranker_onnx": _load_onnx_ranker,
+}
+RANKER_KINDS = {"torch": "ranker", "onnx_int8": "ranker_onnx"}
+
+
+def _torch_module(instance) -> Any:
+    """The torch module holding a component's weights, if it has one."""
+    backend = getattr(instance, "embedding_backend", None)
+    for candidate in (getattr(backend, "model", None), getattr(instance, "model", None)):
+        if hasattr(candidate, "parameters"):
+            return candidate
+    return None
+
+
+def _module_bytes(module) -> int:
+    if module is None:
+        return 0
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        return 0
+
+
+def _drop_backend_cache(instance):
+    """
+    Sentence-Transformers embedders keep their backend in a Haystack-level
+    factory cache; drop it there too so evicted weights are really freed.
+    """
+    backend = getattr(instance, "embedding_backend", None)
+    if backend is None:
+        return
+    try:
+        from haystack.components.embedders.backends.sentence_transformers_backend import (
+            _SentenceTransformersEmbeddingBackendFactory as factory,
+        )
+        for key in [k for k, v in factory._instances.items() if v is backend]:
+            del factory._instances[key]
+    except Exception:
+        pass
+
+
+# ═══════════════════════════════════════════════════════════
+#  Registry
+# ═══════════════════════════════════════════════════════════
+
+@dataclass
+class _Entry:
+    kind: str
+    model: str
+    device: Optional[str]
+    refs: int = 0
+    instance: Any = None
+    module: Any = None
+    memory_bytes: int = 0
+    load_ms: float = 0.0
+    loads: int = 0
+    uses: int = 0
+    last_used: float = field(default_factory=time.time)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ModelRegistry:
+    """Reference-counted, memory-budgeted cache of warmed-up model components."""
+
+    def __init__(self, budget_mb: float = MEMORY_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries: Dict[ModelKey, _Entry] = {}
+        self._lock = threading.Lock()
+        self._evictions = 0
+
+    @staticmethod
+    def key(kind: str, model: str, device: Optional[str] = None) -> ModelKey:
+        if kind not in _LOADERS:
+            raise ValueError(f"Unknown model kind '{kind}'")
+        return (kind, model, device or DEFAULT_DEVICE)
+
+    def acquire(self, kind: str, model: str, device: Optional[str] = None) -> ModelKey:
+        """Take a reference on a model. Loading happens on first use."""
+        key = self.key(kind, model, device)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(kind, model, key[2])
+            entry.refs += 1
+        return key
+
+    def release(self, key: ModelKey):
+        """Drop a reference; unreferenced models stay loaded until the budget needs room."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+        self._enforce_budget()
+
+    def get(self, key: ModelKey, use: bool = True):
+        """Return the warmed-up component for key, loading it if needed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(*key)
+        with entry.lock:
+            if entry.instance is None:
+                start = time.perf_counter()
+                instance = _LOADERS[entry.kind](entry.model, entry.device)
+                instance.warm_up()
+                entry.instance = instance
+                entry.module = _torch_module(instance)
+                entry.memory_bytes = _module_bytes(entry.module)
+                entry.load_ms = (time.perf_counter() - start) * 1000
+                entry.loads += 1
+                logger.info(f"Model registry loaded {entry.kind} '{entry.model}' "
+                            f"({entry.memory_bytes / 1e6:.1f} MB, {entry.load_ms:.0f} ms)")
+                loaded = True
+            else:
+                loaded = False
+            entry.uses += int(use)
+            entry.last_used = time.time()
+            instance = entry.instance
+        if loaded:
+            self._enforce_budget(keep=key)
+        return instance
+
+    # ── Memory accounting ────────────────────────────────
+    def _used_bytes(self) -> int:
+        # Text and document embedders of one model share a backend: count it once
+        modules = {}
+        for entry in self._entries.values():
+            if entry.instance is not None:
+                modules[id(entry.module) if entry.module is not None else id(entry)] = entry.memory_bytes
+        return sum(modules.values())
+
+    def _enforce_budget(self, keep: Optional[ModelKey] = None):
+        with self._lock:
+            if self._used_bytes() <= self.budget_bytes:
+                return
+            idle = sorted(
+                (e for k, e in self._entries.items() if e.refs == 0 and e.instance is not None and k != keep),
+                key=lambda e: e.last_used,
+            )
+            for entry in idle:
+                if self._used_bytes() <= self.budget_bytes:
+                    break
+                self._evict(entry)
+            if self._used_bytes() > self.budget_bytes:
+                logger.warning(f"Loaded models use {self._used_bytes() / 1e6:.0f} MB, over the "
+                               f"{self.budget_bytes / 1e6:.0f} MB budget, and all are in use")
+
+    def _evict(self, entry: _Entry):
+        shared = any(e is not entry and e.instance is not None and e.module is entry.module
+                     and entry.module is not None for e in self._entries.values())
+        if not shared:
+            _drop_backend_cache(entry.instance)
+        logger.info(f"Model registry evicted {entry.kind} '{entry.model}' ({entry.memory_bytes / 1e6:.1f} MB)")
+        entry.instance, entry.module, entry.memory_bytes = None, None, 0
+        self._evictions += 1
+        if entry.refs == 0:
+            self._entries.pop((entry.kind, entry.model, entry.device), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = [
+                {
+                    "kind": e.kind,
+                    "model": e.model,
+                    "device": e.device or "auto",
+                    "loaded": e.instance is not None,
+                    "refs": e.refs,
+                    "memory_mb": round(e.memory_bytes / 1e6, 1),
+                    "load_ms": round(e.load_ms, 1),
+                    "loads": e.loads,
+                    "uses": e.uses,
+                    "idle_s": round(time.time() - e.last_used, 1),
+                }
+                for e in self._entries.values()
+            ]
+            return {
+                "budget_mb": round(self.budget_bytes / 1e6, 1),
+                "used_mb": round(self._used_bytes() / 1e6, 1),
+                "evictions": self._evictions,
+                "models": models,
+            }
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    return _registry
+
+
+# ═══════════════════════════════════════════════════════════
+#  Shared Proxy Components
+# ═══════════════════════════════════════════════════════════
+# Haystack lets a component instance belong to one pipeline only, so each
+# pipeline gets its own proxy while the weights live in the registry.
+
+class _SharedModel:
+    kind = ""
+
+    def __init__(self, model: str, device: Optional[str] = None):
+        self.model = model
+        self.device = device
+        self._key = _registry.acquire(self.kind, model, device)
+        self._released = False
+
+    def warm_up(self):
+        _registry.get(self._key, use=False)
+
+    def release(self):
+        """Give the model reference back (call when the owning pipeline is dropped)."""
+        if not self._released:
+            self._released = True
+            _registry.release(self._key)
+
+    def _instance(self):
+        return _registry.get(self._key)
+
+
+def _embed_queries(key: ModelKey, texts: List[str]) -> List[List[float]]:
+    """One forward pass for a micro-batch of queries, honouring the embedder's settings."""
+    instance = _registry.get(key)
+    backend = getattr(instance, "embedding_backend", None)
+    if backend is None:
+        return [instance.run(text=text)["embedding"] for text in texts]
+    return backend.embed(
+        [instance.prefix + text + instance.suffix for text in texts],
+        batch_size=len(texts),
+        show_progress_bar=False,
+        normalize_embeddings=instance.normalize_embeddings,
+        precision=instance.precision,
+        **(instance.encode_kwargs or {}),
+    )
+
+
+@component
+class SharedTextEmbedder(_SharedModel):
+    """
+    Query embedder backed by the shared registry model. Repeated queries are
+    served from the query embedding cache; the rest are micro-batched.
+    """
+    kind = "text_embedder"
+
+    @component.output_types(embedding=List[float])
+    def run(self, text: str):
+        cache = get_query_embedding_cache()
+        embedding = cache.get(self._key, text)
+        if embedding is None:
+            if batching_enabled():
+                batcher = get_query_batcher(self._key, partial(_embed_queries, self._key))
+                embedding = batcher.embed(text)
+            else:
+                embedding = self._instance().run(text=text)["embedding"]
+            cache.put(self._key, text, embedding)
+        return {"embedding": embedding}
+
+
+@component
+class SharedDocumentEmbedder(_SharedModel):
+    """Document embedder backed by the shared registry model."""
+    kind = "document_embedder"
+
+    @component.output_types(documents=List[Document], meta=Dict[str, Any])
+    def run(self, documents: List[Document]):
+        result = self._instance().run(documents=documents)
+        return {"documents": result["documents"], "meta": result.get("meta", {})}
+
+
+@component
+class SharedRanker(_SharedModel):
+    """
+    Cross-encoder ranker backed by the shared registry model; top_k stays per
+    pipeline. Scoring goes through the rerank service (pair-score cache and
+    cross-request batching). backend is "torch" or "onnx_int8".
+    cascade=(margin, band) reranks only what the first-stage scores leave
+    uncertain, and budget_ms caps the time spent per request.
+    """
+    kind = "ranker"
+
+    def __init__(self, model: str, top_k: int = 10, device: Optional[str] = None,
+                 backend: Optional[str] = None, cascade: Optional[Tuple[float, float]] = None,
+                 budget_ms: Optional[float] = None, pipeline_id: Optional[str] = None):
+        backend = backend or RERANK_BACKEND
+        if backend not in RANKER_KINDS:
+            raise ValueError(f"Unknown reranker backend '{backend}' (expected one of {list(RANKER_KINDS)})")
+        self.kind = RANKER_KINDS[backend]
+        self.backend = backend
+        _SharedModel.__init__(self, model, device)
+        self.top_k = top_k
+        self.cascade = cascade
+        self.budget_ms = budget_ms
+        self.pipeline_id = pipeline_id
+
+    @component.output_types(documents=List[Document])
+    def run(self, query: str, documents: List[Document], top_k: Optional[int] = None):
+        return {"documents": rerank(self._key, query, documents, top_k or self.top_k, cascade=self.cascade,
+                                    budget_ms=self.budget_ms, pipeline_id=self.pipeline_id)}
@@ -1,46 +1,85 @@
 """
 Multi-Retriever Aggregator — Merges results from multiple retrievers.
 Implements score normalization and configurable merge strategies for hybrid mode.
+Result sets are laid out as a (documents × retrievers) NumPy matrix through a
+single id → row map, so normalization and fusion are vectorized and the final
+top-k is selected with a partial partition instead of a full sort.
 """
 import logging
-from typing import List, Optional
-from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+from dataclasses import dataclass, replace
 
+import numpy as np
 from haystack import Document
 
 logger = logging.getLogger(__name__)
 
+STRATEGIES = ("union", "intersection", "weighted", "rrf", "combsum", "combmnz")
+
 
 # ═══════════════════════════════════════════════════════════
 #  Score Normalization
 # ═══════════════════════════════════════════════════════════
 
+def _min_max(scores: np.ndarray) -> np.ndarray:
+    if scores.size == 0:
+        return scores
+    low, high = scores.min(), scores.max()
+    if high == low:
+        return np.ones_like(scores)
+    return (scores - low) / (high - low)
+
+
+def _z_score(scores: np.ndarray) -> np.ndarray:
+    if scores.size < 2:
+        return np.ones_like(scores)
+    std = scores.std()
+    if std == 0:
+        return np.ones_like(scores)
+    return (scores - scores.mean()) / std
+
+
 def min_max_normalize(scores: List[float]) -> List[float]:
     """Normalize scores to [0, 1] range using min-max."""
-    if not scores:
-        return []
-    min_s = min(scores)
-    max_s = max(scores)
-    if max_s == min_s:
-        return [1.0] * len(scores)
-    return [(s - min_s) / (max_s - min_s) for s in scores]
+    return _min_max(np.asarray(scores, dtype=np.float64)).tolist()
 
 
 def z_score_normalize(scores: List[float]) -> List[float]:
     """Normalize scores using z-score normalization."""
-    if not scores or len(scores) < 2:
-        return [1.0] * len(scores)
-    mean = sum(scores) / len(scores)
-    std = (sum((s - mean) ** 2 for s in scores) / len(scores)) ** 0.5
-    if std == 0:
-        return [1.0] * len(scores)
-    return [(s - mean) / std for s in scores]
+    return _z_score(np.asarray(scores, dtype=np.float64)).tolist()
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first. Finds the k-th score with a
+    partition (O(n)) and sorts only the k winners; ties keep their original
+    order, including ties straddling the cut-off.
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        above = np.flatnonzero(scores > kth)
+        candidates = np.concatenate([above, np.flatnonzero(scores == kth)[:k - above.size]])
+    else:
+        candidates = np.arange(n)
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
 
 
 # ═══════════════════════════════════════════════════════════
 #  Multi-Retriever Aggregator
 # ═══════════════════════════════════════════════════════════
 
+@dataclass
+class _FusionInput:
+    """Result sets aligned on one row per unique document."""
+    documents: List[Document]
+    raw: np.ndarray          # raw scores, NaN where a retriever missed the document
+    normalized: np.ndarray   # per-retriever normalized scores, NaN where missing
+    ranks: np.ndarray        # 1-based rank per retriever, 0 where missing
+
+
 class MultiRetrieverAggregator:
     """
     Aggregates results from multiple retrievers with score normalization.
@@ -49,6 +88,10 @@ class MultiRetrieverAggregator:
       - union:        All results from all retrievers (deduplicated)
       - intersection: Only results appearing in all retrievers
       - weighted:     Weighted combination of scores from each retriever
+      - rrf:          Weighted reciprocal rank fusion, sum(w / (rrf_k + rank));
+                      ignores raw scores, so BM25 and cosine mix safely
+      - combsum:      Sum of weighted normalized scores (CombSUM)
+      - combmnz:      CombSUM × number of retrievers that found the document
 
     Score normalization:
       - min_max:  Scale to [0, 1]
@@ -56,11 +99,15 @@ class MultiRetrieverAggregator:
     """
 
     def __init__(self, strategy: str = "union", normalization: str = "min_max",
-                 weights: Optional[List[float]] = None, top_k: int = 10):
+                 weights: Optional[List[float]] = None, top_k: int = 10, rrf_k: int = 60):
+        if strategy not in STRATEGIES:
+            logger.warning(f"Unknown merge strategy '{strategy}', using union")
+            strategy = "union"
         self.strategy = strategy
         self.normalization = normalization
         self.weights = weights
         self.top_k = top_k
+        self.rrf_k = rrf_k
 
     def aggregate(self, result_sets: List[List[Document]]) -> List[Document]:
         """
@@ -79,14 +126,21 @@ class MultiRetrieverAggregator:
             return result_sets[0][:self.top_k]
 
         # Set default weights (equal weighting)
-        weights = self.weights or [1.0 / len(result_sets)] * len(result_sets)
+        weights = np.asarray(self.weights or [1.0 / len(result_sets)] * len(result_sets), dtype=np.float64)
+        fusion = self._align(result_sets)
+        if not fusion.documents:
+            return []
 
         if self.strategy == "intersection":
-            return self._intersection_merge(result_sets, weights)
+            return self._intersection_merge(fusion, weights)
         elif self.strategy == "weighted":
-            return self._weighted_merge(result_sets, weights)
+            return self._select(fusion, np.nansum(fusion.normalized * weights, axis=1))
+        elif self.strategy == "rrf":
+            return self._rrf_merge(fusion, weights)
+        elif self.strategy in ("combsum", "combmnz"):
+            return self._comb_merge(fusion, weights)
         else:  # union (default)
-            return self._union_merge(result_sets, weights)
+            return self._union_merge(fusion, weights)
 
     def _get_doc_key(self, doc: Document) -> str:
         """Generate a unique key for a document (for deduplication)."""
@@ -104,77 +158,76 @@ class MultiRetrieverAggregator:
             return doc.meta['score']
         return 0.5  # default score
 
+    def _normalize(self, scores: np.ndarray) -> np.ndarray:
+        if self.normalization == "z_score":
+            return _z_score(scores)
+        return _min_max(scores)
+
     def _normalize_scores(self, docs: List[Document]) -> List[float]:
         """Normalize scores for a set of documents."""
-        scores = [self._get_score(doc) for doc in docs]
-        if self.normalization == "z_score":
-            return z_score_normalize(scores)
-        return min_max_normalize(scores)
+        return self._normalize(np.array([self._get_score(doc) for doc in docs], dtype=np.float64)).tolist()
 
-    def _union_merge(self, result_sets: List[List[Document]],
-                     weights: List[float]) -> List[Document]:
-        """Union: all unique documents, scored by max weighted score."""
-        doc_scores = {}  # key -> (Document, max_weighted_score)
-
-        for i, docs in enumerate(result_sets):
-            norm_scores = self._normalize_scores(docs)
-            for doc, score in zip(docs, norm_scores):
-                key = self._get_doc_key(doc)
-                weighted_score = score * weights[i]
-                if key not in doc_scores or weighted_score > doc_scores[key][1]:
-                    doc_scores[key] = (doc, weighted_score)
-
-        # Sort by score descending
-        sorted_docs = sorted(doc_scores.values(), key=lambda x: x[1], reverse=True)
-        return [doc for doc, _ in sorted_docs[:self.top_k]]
-
-    def _intersection_merge(self, result_sets: List[List[Document]],
-                            weights: List[float]) -> List[Document]:
-        """Intersection: only documents appearing in all result sets."""
-        # Find keys in each set
-        key_sets = []
-        doc_map = {}
+    # ── Alignment ────────────────────────────────────────
+    def _align(self, result_sets: Sequence[List[Document]]) -> _FusionInput:
+        """Map every unique document to one row; the first instance seen is kept."""
+        row_of, documents = {}, []
+        placements: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
         for docs in result_sets:
-            keys = set()
-            for doc in docs:
-                key = self._get_doc_key(doc)
-                keys.add(key)
-                doc_map[key] = doc
-            key_sets.append(keys)
-
-        # Intersection of all key sets
-        common_keys = key_sets[0]
-        for ks in key_sets[1:]:
-            common_keys = common_keys.intersection(ks)
-
-        # Score the intersection documents
-        scored_docs = []
-        for key in common_keys:
-            total_score = 0.0
-            for i, docs in enumerate(result_sets):
-                for doc in docs:
-                    if self._get_doc_key(doc) == key:
-                        total_score += self._get_score(doc) * weights[i]
-                        break
-            scored_docs.append((doc_map[key], total_score))
-
-        sorted_docs = sorted(scored_docs, key=lambda x: x[1], reverse=True)
-        return [doc for doc, _ in sorted_docs[:self.top_k]]
-
-    def _weighted_merge(self, result_sets: List[List[Document]],
-                        weights: List[float]) -> List[Document]:
-        """Weighted: combine normalized scores from all retrievers."""
-        doc_scores = {}  # key -> (Document, total_weighted_score)
-
-        for i, docs in enumerate(result_sets):
-            norm_scores = self._normalize_scores(docs)
-            for doc, score in zip(docs, norm_scores):
-                key = self._get_doc_key(doc)
-                weighted_score = score * weights[i]
-                if key in doc_scores:
-                    doc_scores[key] = (doc, doc_scores[key][1] + weighted_score)
-                else:
-                    doc_scores[key] = (doc, weighted_score)
-
-        sorted_docs = sorted(doc_scores.values(), key=lambda x: x[1], reverse=True)
-        return [doc for doc, _ in sorted_docs[:self.top_k]]
+            keys = [doc.id or self._get_doc_key(doc) for doc in docs]
+            # key → first position; a retriever's best-ranked copy wins over later duplicates
+            first = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+            positions = np.sort(np.fromiter(first.values(), dtype=np.int64, count=len(first)))
+            ordered = positions.tolist()
+            known = len(row_of)
+            rows = np.fromiter((row_of.setdefault(keys[p], len(row_of)) for p in ordered),
+                               dtype=np.int64, count=len(ordered))
+            documents.extend(docs[p] for p in positions[rows >= known].tolist())
+            scores = np.array([doc.score if doc.score is not None else self._get_score(doc) for doc in docs],
+                              dtype=np.float64)
+            placements.append((rows, positions, scores[positions] if docs else scores))
+
+        n_docs, n_sets = len(documents), len(result_sets)
+        raw = np.full((n_docs, n_sets), np.nan)
+        normalized = np.full((n_docs, n_sets), np.nan)
+        ranks = np.zeros((n_docs, n_sets), dtype=np.int64)
+        for i, (rows, positions, scores) in enumerate(placements):
+            raw[rows, i] = scores
+            normalized[rows, i] = self._normalize(scores)
+            ranks[rows, i] = positions + 1
+        return _FusionInput(documents, raw, normalized, ranks)
+
+    def _select(self, fusion: _FusionInput, fused: np.ndarray, rows: Optional[np.ndarray] = None,
+                set_score: bool = False) -> List[Document]:
+        """Top-k of fused scores (optionally restricted to rows), best first."""
+        if rows is None:
+            rows = np.arange(len(fusion.documents))
+        best = top_k_indices(fused, self.top_k)
+        winners = rows[best]
+        if set_score:
+            return [replace(fusion.documents[r], score=float(s)) for r, s in zip(winners, fused[best])]
+        return [fusion.documents[r] for r in winners]
+
+    # ── Strategies ───────────────────────────────────────
+    def _union_merge(self, fusion: _FusionInput, weights: np.ndarray) -> List[Document]:
+        """Union: all unique documents, scored by max weighted score."""
+        weighted = np.where(np.isnan(fusion.normalized), -np.inf, fusion.normalized * weights)
+        return self._select(fusion, weighted.max(axis=1))
+
+    def _intersection_merge(self, fusion: _FusionInput, weights: np.ndarray) -> List[Document]:
+        """Intersection: only documents appearing in all result sets, scored by weighted raw score."""
+        common = np.flatnonzero(~np.isnan(fusion.raw).any(axis=1))
+        if common.size == 0:
+            return []
+        return self._select(fusion, (fusion.raw[common] * weights).sum(axis=1), rows=common)
+
+    def _rrf_merge(self, fusion: _FusionInput, weights: np.ndarray) -> List[Document]:
+        """Reciprocal rank fusion: each list contributes weight / (rrf_k + rank)."""
+        contributions = np.where(fusion.ranks > 0, weights / (self.rrf_k + fusion.ranks), 0.0)
+        return self._select(fusion, contributions.sum(axis=1), set_score=True)
+
+    def _comb_merge(self, fusion: _FusionInput, weights: np.ndarray) -> List[Document]:
+        """CombSUM (sum of weighted normalized scores) and CombMNZ (× hit count)."""
+        fused = np.nansum(fusion.normalized * weights, axis=1)
+        if self.strategy == "combmnz":
+            fused = fused * (~np.isnan(fusion.normalized)).sum(axis=1)
+        return self._select(fusion, fused, set_score=True)
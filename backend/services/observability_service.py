@@ -20,8 +20,14 @@ _system_metrics = {
     "total_tokens": 0,
     "average_latency_ms": 0.0,
     "rag_type_counts": {},
-    "model_usage": {}
+    "model_usage": {},
+    "retrieval_latency_ms": {}
 }
+# Recent reranker calls (ms), kept apart from end-to-end latency for percentiles
+_rerank_latencies = deque(maxlen=2048)
+_rerank_totals = {"calls": 0, "pairs": 0, "computed_pairs": 0}
+# Cascade decisions per pipeline: skipped / band / budget_cut / full
+_rerank_cascade: Dict[str, Dict[str, Any]] = {}
 
 
 class QueryContext:
@@ -37,6 +43,7 @@ class QueryContext:
         self.error = None
         self.response = None
         self.tokens = 0
+        self.cache = None  # "exact" / "semantic" when answered from a cache
         
     def __enter__(self):
         self.start_time = time.time()
@@ -54,13 +61,13 @@ class QueryContext:
             self.tokens = len(self.query.split()) + len(str(self.response).split())
             
         _record_query(self.pipeline_id, self.query, self.response, self.error, 
-                     latency_ms, self.tokens, self.rag_type, self.model)
+                     latency_ms, self.tokens, self.rag_type, self.model, self.cache)
         
         return False  # Do not swallow exceptions
 
 
 def _record_query(pipeline_id: str, query: str, response: Any, error: str, 
-                  latency_ms: float, tokens: int, rag_type: str, model: str):
+                  latency_ms: float, tokens: int, rag_type: str, model: str, cache: str = None):
     """Record a completed query into the observability stores."""
     
     # 1. Update Metrics
@@ -92,12 +99,74 @@ def _record_query(pipeline_id: str, query: str, response: Any, error: str,
         "response": str(response) if response else None,
         "error": error,
         "latency_ms": round(latency_ms, 2),
-        "tokens": tokens
+        "tokens": tokens,
+        "cache": cache
     }
     _query_logs.appendleft(log_entry)
     
     status = "ERROR" if error else "SUCCESS"
-    logger.info(f"OBSERVABILITY | {status} | Latency: {latency_ms:.1f}ms | Tokens: {tokens} | Model: {model} | Pipeline: {pipeline_id}")
+    cached = f" | Cache: {cache}" if cache else ""
+    logger.info(f"OBSERVABILITY | {status} | Latency: {latency_ms:.3f}ms | Tokens: {tokens} | Model: {model} | Pipeline: {pipeline_id}{cached}")
+
+
+def record_retrieval_latency(branch: str, latency_ms: float):
+    """Record one retrieval branch execution (e.g. bm25 / dense in hybrid mode)."""
+    stats = _system_metrics["retrieval_latency_ms"].setdefault(
+        branch, {"count": 0, "average_ms": 0.0, "max_ms": 0.0}
+    )
+    stats["count"] += 1
+    stats["average_ms"] += (latency_ms - stats["average_ms"]) / stats["count"]
+    stats["max_ms"] = max(stats["max_ms"], latency_ms)
+
+
+def record_rerank_latency(latency_ms: float, pairs: int, computed: int):
+    """Record one reranker call: pairs scored in total and how many missed the pair cache."""
+    _rerank_latencies.append(latency_ms)
+    _rerank_totals["calls"] += 1
+    _rerank_totals["pairs"] += pairs
+    _rerank_totals["computed_pairs"] += computed
+
+
+def record_rerank_cascade(pipeline_id: str, decision: str, pairs: int, avoided: int, saved_ms: float):
+    """Record one cascade decision and the (estimated) model time it saved."""
+    stats = _rerank_cascade.setdefault(pipeline_id, {
+        "calls": 0, "skipped": 0, "band": 0, "budget_cut": 0, "full": 0,
+        "pairs": 0, "pairs_avoided": 0, "est_saved_ms": 0.0,
+    })
+    stats["calls"] += 1
+    stats[decision] += 1
+    stats["pairs"] += pairs
+    stats["pairs_avoided"] += avoided
+    stats["est_saved_ms"] += saved_ms
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def _rerank_metrics() -> dict:
+    from .rerank_service import get_rerank_stats
+    samples = list(_rerank_latencies)
+    return {
+        **_rerank_totals,
+        "p50_ms": round(_percentile(samples, 50), 2),
+        "p95_ms": round(_percentile(samples, 95), 2),
+        "max_ms": round(max(samples), 2) if samples else 0.0,
+        "window": len(samples),
+        "cascade": {
+            pipeline_id: {
+                **stats,
+                "skip_rate": round(stats["skipped"] / stats["calls"], 4),
+                "est_saved_ms": round(stats["est_saved_ms"], 1),
+                "avg_saved_ms": round(stats["est_saved_ms"] / stats["calls"], 2),
+            }
+            for pipeline_id, stats in list(_rerank_cascade.items())
+        },
+        **get_rerank_stats(),
+    }
 
 
 # ═══════════════════════════════════════════════════════════
@@ -105,8 +174,27 @@ def _record_query(pipeline_id: str, query: str, response: Any, error: str,
 # ═══════════════════════════════════════════════════════════
 
 def get_metrics() -> dict:
-    """Get aggregated system metrics."""
-    return dict(_system_metrics)
+    """Get aggregated system metrics, including shared models, query embedding, reranking and answer caches."""
+    from .model_registry import get_model_registry
+    from .query_batcher import get_batching_stats
+    from .query_embedding_cache import get_query_embedding_cache
+    from .semantic_cache import get_semantic_cache_stats
+    from .response_cache import get_response_cache
+    from .client_pool import get_client_pool
+    metrics = dict(_system_metrics)
+    metrics["models"] = get_model_registry().stats()
+    metrics["query_batching"] = get_batching_stats()
+    metrics["query_embedding_cache"] = get_query_embedding_cache().stats()
+    metrics["reranker"] = _rerank_metrics()
+    metrics["semantic_cache"] = get_semantic_cache_stats()
+    metrics["response_cache"] = get_response_cache().stats()
+    metrics["vector_clients"] = get_client_pool().stats()
+    try:
+        from .chroma_pool import get_chroma_pool_stats
+        metrics["chroma_pool"] = get_chroma_pool_stats()
+    except ImportError:
+        pass
+    return metrics
 
 
 def get_logs(limit: int = 50, pipeline_id: str = None) -> List[dict]:
@@ -0,0 +1,111 @@
+"""
+PGVector Store — PgvectorDocumentStore on pooled Postgres connections.
+Stores on the same database borrow connections from one psycopg_pool
+ConnectionPool instead of each opening their own. A connection is held only
+for the duration of one store operation, so the pool's size bounds concurrent
+queries, not the number of deployed pipelines. Used for both PGVector and
+Supabase.
+"""
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+
+from psycopg.rows import dict_row
+from psycopg.sql import SQL, Literal
+from haystack_integrations.document_stores.pgvector import PgvectorDocumentStore
+
+from .client_pool import credential_fingerprint, get_client_pool, open_pg_pool, pg_pool_connections
+
+logger = logging.getLogger(__name__)
+
+# PgvectorDocumentStore methods that run SQL; each borrows a connection for its duration
+_OPERATIONS = (
+    "count_documents", "count_documents_by_filter", "count_unique_metadata_by_filter",
+    "filter_documents", "write_documents", "delete_documents", "delete_all_documents",
+    "delete_by_filter", "update_by_filter", "delete_table", "get_metadata_fields_info",
+    "get_metadata_field_min_max", "get_metadata_field_unique_values",
+    "_embedding_retrieval", "_keyword_retrieval",
+)
+
+
+def _borrowing(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._operation():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class PooledPgvectorDocumentStore(PgvectorDocumentStore):
+    """
+    PgvectorDocumentStore that borrows a connection of the shared pool for
+    its database per operation and returns it when the operation ends. The
+    pool validates connections as it hands them out. Operations on one store
+    are serialized, as they were on its single connection.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._pool = None
+        self._operation_lock = threading.RLock()
+        self._depth = 0
+
+    @contextmanager
+    def _operation(self):
+        with self._operation_lock:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._return_connection()
+
+    def _ensure_db_setup(self) -> None:
+        if self._connection and self._cursor and self._dict_cursor:
+            return  # already borrowed for the running operation
+
+        conn_str = self.connection_string.resolve_value() or ""
+        # Connection strings carry the password, so only their fingerprint is shown
+        self._pool = get_client_pool().checkout(
+            "pgvector", f"postgres:{credential_fingerprint(conn_str)}", conn_str,
+            create=lambda: open_pg_pool(conn_str, self.create_extension),
+            close=lambda p: p.close(),
+            connections=pg_pool_connections,
+        )
+        connection = self._pool.getconn()
+        self._connection = connection
+        self._cursor = connection.cursor()
+        self._dict_cursor = connection.cursor(row_factory=dict_row)
+
+        if not self._table_initialized:
+            self._initialize_table()
+        elif self.search_strategy == "hnsw" and self.hnsw_ef_search:
+            # Session settings are reset when a connection goes back to the pool
+            self._execute_sql(cursor=self._cursor,
+                              sql_query=SQL("SET hnsw.ef_search = {}").format(Literal(int(self.hnsw_ef_search))),
+                              error_msg="Could not set hnsw.ef_search")
+
+    def _return_connection(self):
+        connection, pool = self._connection, self._pool
+        self._connection = None
+        self._cursor = None
+        self._dict_cursor = None
+        if connection is None or pool is None:
+            return
+        try:
+            pool.putconn(connection)
+        except Exception as e:
+            # Pool closed in the meantime
+            logger.debug(f"Returning Postgres connection failed: {e}")
+
+    def close(self) -> None:
+        """Hand back a connection still borrowed outside an operation."""
+        with self._operation_lock:
+            self._return_connection()
+
+
+for _name in _OPERATIONS:
+    if hasattr(PgvectorDocumentStore, _name):
+        setattr(PooledPgvectorDocumentStore, _name, _borrowing(getattr(PgvectorDocumentStore, _name)))
@@ -0,0 +1,44 @@
+"""
+Pinecone Store — PineconeDocumentStore on a pooled index connection.
+Stores on the same Pinecone index and API key (any namespace) share one
+Index client and its keep-alive HTTP connections.
+"""
+import logging
+
+from haystack_integrations.document_stores.pinecone import PineconeDocumentStore
+
+from .client_pool import get_client_pool
+
+logger = logging.getLogger(__name__)
+
+
+class PooledPineconeDocumentStore(PineconeDocumentStore):
+    """PineconeDocumentStore that checks its index out of the shared pool before each operation."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._index_ready = False
+
+    def _open_index(self):
+        # The parent creates the index if needed and connects to it
+        self._index = None
+        PineconeDocumentStore._initialize_index(self)
+        self._index_ready = True
+        return self._index
+
+    def _initialize_index(self) -> None:
+        self._index = get_client_pool().checkout(
+            "pinecone", self.index_name, self.api_key.resolve_value(),
+            create=self._open_index,
+            health_check=lambda index: index.describe_index_stats(),
+            close=lambda index: index.close(),
+        )
+        if not self._index_ready:
+            # Index opened by another store: pick up its dimension like the parent does
+            self.dimension = self._index.describe_index_stats().get("dimension") or self.dimension
+            self._dummy_vector = [-10.0] * self.dimension
+            self._index_ready = True
+
+    def close(self) -> None:
+        """Drop the reference; the pooled index stays open for other stores."""
+        self._index = None
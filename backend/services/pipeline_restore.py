@@ -0,0 +1,166 @@
+"""
+Pipeline Restore — Rebuilds deployed pipelines after a server restart.
+The pipeline registries in haystack_service live in process memory, but every
+deploy leaves data/deployments/<pipeline_id>.json behind and named RAGs keep
+their collections on disk. On the first query for an unknown id the pipeline
+is rebuilt from the saved config on top of those stores (no parsing, no
+embedding); PIPELINE_PREWARM=N restores the N most recently used at startup.
+Stopping a pipeline marks its record, so it is not restored again.
+"""
+import os
+import re
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Same directory rag_builder writes deployment records to
+DEPLOY_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "deployments")
+PREWARM_PIPELINES = int(os.environ.get("PIPELINE_PREWARM", "0"))
+# Record mtimes double as "last used"; refresh them at most this often
+_TOUCH_INTERVAL_S = 60.0
+
+_PIPELINE_ID = re.compile(r"pipe_[0-9a-f]+")
+
+_guard = threading.Lock()
+_locks: Dict[str, threading.Lock] = {}
+# pipeline_id -> record mtime of a failed restore, so it is not retried per query
+_unrestorable: Dict[str, float] = {}
+_last_touch: Dict[str, float] = {}
+
+
+def _record_path(pipeline_id: str) -> Optional[str]:
+    # Ids come from request bodies: never let one escape DEPLOY_DIR
+    if not _PIPELINE_ID.fullmatch(pipeline_id or ""):
+        return None
+    return os.path.join(DEPLOY_DIR, f"{pipeline_id}.json")
+
+
+def load_deployment(pipeline_id: str) -> Optional[dict]:
+    """The saved deployment record of a pipeline, or None."""
+    path = _record_path(pipeline_id)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable deployment record {path}: {e}")
+        return None
+
+
+def restore_pipeline(pipeline_id: str) -> bool:
+    """
+    Make pipeline_id queryable again if its deployment can be rebuilt.
+    Returns True if the pipeline is registered afterwards. Concurrent calls for
+    the same id wait for a single rebuild.
+    """
+    from .haystack_service import active_pipelines, build_and_deploy_pipeline
+
+    if pipeline_id in active_pipelines:
+        return True
+    path = _record_path(pipeline_id)
+    if path is None or not os.path.exists(path):
+        return False
+    mtime = os.path.getmtime(path)
+    if _unrestorable.get(pipeline_id) == mtime:
+        return False
+
+    with _guard:
+        lock = _locks.setdefault(pipeline_id, threading.Lock())
+    with lock:
+        if pipeline_id in active_pipelines:
+            return True
+        record = load_deployment(pipeline_id)
+        if (record or {}).get("stopped_at"):
+            _unrestorable[pipeline_id] = mtime
+            return False
+        config = (record or {}).get("config") or {}
+        if not config.get("ragName"):
+            # Unnamed RAGs index into a random collection that cannot be found again
+            logger.info(f"Pipeline {pipeline_id} cannot be restored: it was deployed without a RAG name")
+            _unrestorable[pipeline_id] = mtime
+            return False
+        start = time.perf_counter()
+        try:
+            build_and_deploy_pipeline(config, pipeline_id=pipeline_id,
+                                      restore=record.get("deployment", {}).get("ingestion", {}))
+        except Exception as e:
+            logger.warning(f"Pipeline {pipeline_id} could not be restored: {e}")
+            _unrestorable[pipeline_id] = mtime
+            return False
+        logger.info(f"Pipeline {pipeline_id} restored from its deployment record "
+                    f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return True
+
+
+def forget_pipeline(pipeline_id: str) -> bool:
+    """
+    A stopped pipeline stays stopped: its record is marked so that neither
+    queries, prewarming nor a restart restore it (a new deploy gets a new id).
+    Waits for a restore of the pipeline in progress. Returns False if there
+    is no record or it was already stopped.
+    """
+    path = _record_path(pipeline_id)
+    if path is None:
+        return False
+    with _guard:
+        lock = _locks.setdefault(pipeline_id, threading.Lock())
+    with lock:
+        record = load_deployment(pipeline_id)
+        if record is None or record.get("stopped_at"):
+            return False
+        record["stopped_at"] = time.time()
+        try:
+            with open(f"{path}.tmp", "w") as f:
+                json.dump(record, f, indent=2, default=str)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"Could not mark deployment record {path} stopped: {e}")
+        if os.path.exists(path):
+            _unrestorable[pipeline_id] = os.path.getmtime(path)
+        return True
+
+
+def mark_used(pipeline_id: str):
+    """Bump the record's mtime so prewarming prefers recently queried pipelines."""
+    now = time.time()
+    if now - _last_touch.get(pipeline_id, 0.0) < _TOUCH_INTERVAL_S:
+        return
+    _last_touch[pipeline_id] = now
+    path = _record_path(pipeline_id)
+    try:
+        if path:
+            os.utime(path)
+    except OSError:
+        pass
+
+
+def recent_deployments(limit: Optional[int] = None) -> List[str]:
+    """Pipeline ids with a deployment record, most recently used first."""
+    if not os.path.isdir(DEPLOY_DIR):
+        return []
+    entries = []
+    for name in os.listdir(DEPLOY_DIR):
+        pipeline_id, ext = os.path.splitext(name)
+        if ext == ".json" and _PIPELINE_ID.fullmatch(pipeline_id):
+            entries.append((os.path.getmtime(os.path.join(DEPLOY_DIR, name)), pipeline_id))
+    entries.sort(reverse=True)
+    return [pipeline_id for _, pipeline_id in entries[:limit]]
+
+
+def prewarm_pipelines(limit: int = PREWARM_PIPELINES) -> List[str]:
+    """Restore up to `limit` of the most recently used pipelines; returns their ids."""
+    restored = []
+    if limit <= 0:
+        return restored
+    for pipeline_id in recent_deployments():
+        if restore_pipeline(pipeline_id):
+            restored.append(pipeline_id)
+            if len(restored) >= limit:
+                break
+    logger.info(f"Prewarmed {len(restored)} pipeline(s): {restored}")
+    return restored
@@ -0,0 +1,72 @@
+"""
+Qdrant Store — QdrantDocumentStore on a pooled QdrantClient.
+Stores on the same Qdrant endpoint and API key share one client (and its
+keep-alive HTTP connections); local mode stores on the same path share the
+one QdrantLocal that may hold that path.
+"""
+import logging
+import threading
+from typing import Any, Dict
+
+from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
+
+from .client_pool import POOL_CONNECTIONS, get_client_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _endpoint(params: Dict[str, Any]) -> str:
+    target = params["url"] or params["location"] or params["path"] or f"{params['host'] or 'localhost'}:{params['port']}"
+    return f"{target} (grpc)" if params["prefer_grpc"] else target
+
+
+def _connect(params: Dict[str, Any]):
+    import httpx
+    import qdrant_client
+    # limits only reaches the REST transport; local mode ignores it
+    limits = httpx.Limits(max_connections=POOL_CONNECTIONS, max_keepalive_connections=POOL_CONNECTIONS)
+    return qdrant_client.QdrantClient(**params, limits=limits)
+
+
+class PooledQdrantDocumentStore(QdrantDocumentStore):
+    """QdrantDocumentStore that checks its client out of the shared pool before each operation."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._collection_ready = False
+        self._setup_lock = threading.RLock()
+        self._setup_thread = None
+
+    def _initialize_client(self) -> None:
+        params = self._prepare_client_params()
+        self._client = get_client_pool().checkout(
+            "qdrant", _endpoint(params), params["api_key"],
+            create=lambda: _connect(params),
+            health_check=lambda client: client.get_collections(),
+            close=lambda client: client.close(),
+        )
+        if self._collection_ready:
+            return
+        with self._setup_lock:
+            # _set_up_collection calls back into _initialize_client
+            if self._collection_ready or self._setup_thread == threading.get_ident():
+                return
+            self._setup_thread = threading.get_ident()
+            try:
+                self._set_up_collection(
+                    self.index,
+                    self.embedding_dim,
+                    self.recreate_index,
+                    self.similarity,
+                    self.use_sparse_embeddings,
+                    self.sparse_idf,
+                    self.on_disk,
+                    self.payload_fields_to_index,
+                )
+                self._collection_ready = True
+            finally:
+                self._setup_thread = None
+
+    def close(self) -> None:
+        """Drop the reference; the pooled client stays open for other stores."""
+        self._client = None
@@ -0,0 +1,341 @@
+"""
+Quantized Store — In-process document store with compressed embeddings.
+Embeddings are held in RAM as float16 (2x smaller), per-row scaled int8 (4x)
+or sign bits (32x) instead of per-document float lists. A query first ranks
+all rows on the quantized codes (Hamming distance for binary), then rescores
+rescore_multiplier × top_k candidates exactly against full-precision vectors
+kept in an on-disk memmap, and returns the final top_k.
+"""
+import os
+import logging
+import tempfile
+import weakref
+from dataclasses import replace
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from haystack import Document
+from haystack.document_stores.in_memory import InMemoryDocumentStore
+from haystack.document_stores.types import DuplicatePolicy
+
+from .vector_store_manager import STORES_DIR
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_DIR = os.path.join(STORES_DIR, "quantized")
+
+QUANTIZATION_MODES = ("float32", "float16", "int8", "binary")
+DEFAULT_RESCORE_MULTIPLIER = 4
+
+# Rows scored per step, so int8/float16 codes are never widened all at once
+_SCORE_CHUNK = 32768
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# ═══════════════════════════════════════════════════════════
+#  Full-precision Sidecar
+# ═══════════════════════════════════════════════════════════
+
+class _FloatSidecar:
+    """Full-precision vectors in an append-only file, read back only for rescoring."""
+
+    def __init__(self, dim: int, directory: str = SIDECAR_DIR):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(suffix=".f32", dir=directory)
+        os.close(fd)
+        self._finalizer = weakref.finalize(self, _remove_file, self.path)
+        self.dim = dim
+        self.rows = 0
+        self._map = None
+
+    def append(self, matrix: np.ndarray):
+        with open(self.path, "ab") as f:
+            f.write(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+        self.rows += len(matrix)
+        self._map = None
+
+    def read(self, rows: np.ndarray) -> np.ndarray:
+        if self._map is None:
+            self._map = np.memmap(self.path, dtype=np.float32, mode="r", shape=(self.rows, self.dim))
+        return np.asarray(self._map[rows])
+
+    def compact(self, keep: np.ndarray):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for start in range(0, len(keep), _SCORE_CHUNK):
+                f.write(self.read(keep[start:start + _SCORE_CHUNK]).tobytes())
+        self._map = None
+        os.replace(tmp_path, self.path)
+        self.rows = len(keep)
+
+    def disk_bytes(self) -> int:
+        return self.rows * self.dim * 4
+
+
+# ═══════════════════════════════════════════════════════════
+#  Quantized Vector Index
+# ═══════════════════════════════════════════════════════════
+
+class QuantizedVectorIndex:
+    """
+    Cosine-similarity index over quantized, L2-normalized vectors.
+    Rows live in capacity-doubling arrays; deleted rows are tombstoned and
+    reclaimed by compaction once they make up a quarter of the index.
+    With exact_rescore the float32 vectors go to a disk sidecar used to
+    rescore candidates; without it, binary candidates are rescored against
+    their sign vectors and int8/float16 scores are used as they are.
+    """
+
+    def __init__(self, mode: str = "int8", rescore_multiplier: int = DEFAULT_RESCORE_MULTIPLIER,
+                 exact_rescore: bool = True):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization '{mode}' (expected one of {QUANTIZATION_MODES})")
+        self.mode = mode
+        self.rescore_multiplier = max(1, int(rescore_multiplier))
+        self.exact_rescore = exact_rescore and mode != "float32"
+        self._sidecar: Optional[_FloatSidecar] = None
+        self.dim: Optional[int] = None
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ── Encoding ─────────────────────────────────────────
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.mode == "float32":
+            return vectors, None
+        if self.mode == "float16":
+            return vectors.astype(np.float16), None
+        if self.mode == "int8":
+            scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+            codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            return codes, scales.astype(np.float32)
+        return np.packbits(vectors > 0, axis=1), None
+
+    def _decode(self, rows: np.ndarray) -> np.ndarray:
+        codes = self._codes[rows]
+        if self.mode == "int8":
+            return codes.astype(np.float32) * self._scales[rows][:, None]
+        if self.mode == "binary":
+            signs = np.unpackbits(codes, axis=1, count=self.dim).astype(np.float32) * 2 - 1
+            return signs / np.sqrt(self.dim)
+        return codes.astype(np.float32)
+
+    def _reserve(self, extra: int, code_shape: Tuple[int, ...], code_dtype):
+        needed = self._size + extra
+        capacity = 0 if self._codes is None else len(self._codes)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 1024)
+        codes = np.zeros((new_capacity, *code_shape), dtype=code_dtype)
+        alive = np.zeros(new_capacity, dtype=bool)
+        if self._codes is not None:
+            codes[:self._size] = self._codes[:self._size]
+            alive[:self._size] = self._alive[:self._size]
+        self._codes, self._alive = codes, alive
+        if self.mode == "int8":
+            scales = np.zeros(new_capacity, dtype=np.float32)
+            if self._scales is not None:
+                scales[:self._size] = self._scales[:self._size]
+            self._scales = scales
+
+    # ── Writes ───────────────────────────────────────────
+    def add(self, ids: List[str], vectors) -> None:
+        """Insert or replace the vectors for ids."""
+        if not ids:
+            return
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+            if self.exact_rescore:
+                self._sidecar = _FloatSidecar(self.dim)
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match index dimension {self.dim}")
+        self.remove(ids)
+        codes, scales = self._encode(matrix)
+        self._reserve(len(ids), codes.shape[1:], codes.dtype)
+        start, end = self._size, self._size + len(ids)
+        self._codes[start:end] = codes
+        if scales is not None:
+            self._scales[start:end] = scales
+        self._alive[start:end] = True
+        if self._sidecar is not None:
+            self._sidecar.append(matrix)
+        for offset, doc_id in enumerate(ids):
+            self._rows[doc_id] = start + offset
+        self._ids.extend(ids)
+        self._size = end
+
+    def remove(self, ids: Iterable[str]) -> None:
+        for doc_id in ids:
+            row = self._rows.pop(doc_id, None)
+            if row is not None:
+                self._alive[row] = False
+                self._ids[row] = None
+        if self._size and self._size - len(self._rows) > self._size // 4:
+            self._compact()
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive[:self._size])
+        if self._sidecar is not None:
+            self._sidecar.compact(keep)
+        self._codes = self._codes[keep].copy()
+        if self._scales is not None:
+            self._scales = self._scales[keep].copy()
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._ids = [self._ids[r] for r in keep]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._size = len(keep)
+
+    # ── Search ───────────────────────────────────────────
+    def _dense_scores(self, query: np.ndarray) -> np.ndarray:
+        scores = np.empty(self._size, dtype=np.float32)
+        for start in range(0, self._size, _SCORE_CHUNK):
+            end = min(start + _SCORE_CHUNK, self._size)
+            block = self._codes[start:end].astype(np.float32)
+            scores[start:end] = block @ query
+            if self._scales is not None:
+                scores[start:end] *= self._scales[start:end]
+        return scores
+
+    def search(self, query_embedding, top_k: int = 10,
+               allowed_ids: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Return up to top_k (id, cosine score) pairs, best first."""
+        if not self._rows or top_k <= 0:
+            return []
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        mask = self._alive[:self._size].copy()
+        if allowed_ids is not None:
+            allowed = np.zeros(self._size, dtype=bool)
+            allowed[[self._rows[i] for i in allowed_ids if i in self._rows]] = True
+            mask &= allowed
+        live = int(mask.sum())
+        if live == 0:
+            return []
+
+        if self.mode == "binary":
+            query_bits = np.packbits(query > 0)
+            approx = np.empty(self._size, dtype=np.float32)
+            for start in range(0, self._size, _SCORE_CHUNK):
+                end = min(start + _SCORE_CHUNK, self._size)
+                approx[start:end] = -_POPCOUNT[self._codes[start:end] ^ query_bits].sum(axis=1, dtype=np.int32)
+        else:
+            approx = self._dense_scores(query)
+        approx[~mask] = -np.inf
+
+        rescore = self._sidecar is not None or self.mode == "binary"
+        n_candidates = min(live, top_k * self.rescore_multiplier if rescore else top_k)
+        rows = np.argpartition(-approx, n_candidates - 1)[:n_candidates]
+        if self._sidecar is not None:
+            scores = self._sidecar.read(rows) @ query
+        elif self.mode == "binary":
+            scores = self._decode(rows) @ query
+        else:
+            scores = approx[rows]
+
+        k = min(top_k, n_candidates)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self._ids[rows[i]], float(scores[i])) for i in best]
+
+    def reconstruct(self, doc_id: str) -> Optional[List[float]]:
+        """Normalized embedding for doc_id (exact with a sidecar, dequantized otherwise)."""
+        row = self._rows.get(doc_id)
+        if row is None:
+            return None
+        if self._sidecar is not None:
+            return self._sidecar.read(np.array([row]))[0].tolist()
+        return self._decode(np.array([row]))[0].tolist()
+
+    def memory_bytes(self) -> int:
+        used = self._codes[:self._size].nbytes if self._codes is not None else 0
+        if self._scales is not None:
+            used += self._scales[:self._size].nbytes
+        return used
+
+    def stats(self) -> dict:
+        float32_bytes = len(self._rows) * (self.dim or 0) * 4
+        used = self.memory_bytes()
+        return {
+            "quantization": self.mode,
+            "vectors": len(self._rows),
+            "dim": self.dim,
+            "memory_kb": round(used / 1024, 1),
+            "float32_kb": round(float32_bytes / 1024, 1),
+            "compression": round(float32_bytes / used, 1) if used else None,
+            "exact_rescore": self.exact_rescore,
+            "rescore_multiplier": self.rescore_multiplier,
+            "disk_kb": round(self._sidecar.disk_bytes() / 1024, 1) if self._sidecar else 0.0,
+        }
+
+
+# ═══════════════════════════════════════════════════════════
+#  Document Store
+# ═══════════════════════════════════════════════════════════
+
+class QuantizedDocumentStore(InMemoryDocumentStore):
+    """
+    InMemoryDocumentStore whose embeddings live in a QuantizedVectorIndex.
+    Documents are stored without their float embeddings; BM25 and filters
+    behave as in the parent store, and InMemoryEmbeddingRetriever works
+    unchanged through embedding_retrieval.
+    """
+
+    def __init__(self, quantization: str = "int8", rescore_multiplier: int = DEFAULT_RESCORE_MULTIPLIER,
+                 exact_rescore: bool = True, **kwargs: Any):
+        kwargs.setdefault("embedding_similarity_function", "cosine")
+        super().__init__(**kwargs)
+        self.vector_index = QuantizedVectorIndex(quantization, rescore_multiplier, exact_rescore)
+
+    def write_documents(self, documents: List[Document], policy: DuplicatePolicy = DuplicatePolicy.NONE) -> int:
+        existing = set(self.storage.keys()) if policy == DuplicatePolicy.SKIP else set()
+        written = super().write_documents([replace(doc, embedding=None) for doc in documents], policy=policy)
+        accepted = [doc for doc in documents if doc.id not in existing]
+        with_embedding = [doc for doc in accepted if doc.embedding is not None]
+        self.vector_index.remove(doc.id for doc in accepted if doc.embedding is None)
+        self.vector_index.add([doc.id for doc in with_embedding], [doc.embedding for doc in with_embedding])
+        return written
+
+    def delete_documents(self, document_ids: List[str]) -> None:
+        super().delete_documents(document_ids)
+        self.vector_index.remove(document_ids)
+
+    def embedding_retrieval(self, query_embedding: List[float], filters: Optional[Dict[str, Any]] = None,
+                            top_k: int = 10, scale_score: bool = False,
+                            return_embedding: Optional[bool] = False) -> List[Document]:
+        if len(query_embedding) == 0:
+            raise ValueError("query_embedding should be a non-empty list of floats.")
+        allowed_ids = None
+        if filters:
+            allowed_ids = {doc.id for doc in self.filter_documents(filters=filters)}
+        hits = self.vector_index.search(query_embedding, top_k=top_k, allowed_ids=allowed_ids)
+
+        resolved_return_embedding = self.return_embedding if return_embedding is None else return_embedding
+        results = []
+        for doc_id, score in hits:
+            doc = self.storage.get(doc_id)
+            if doc is None:
+                continue
+            results.append(replace(
+                doc,
+                score=(score + 1) / 2 if scale_score else score,
+                embedding=self.vector_index.reconstruct(doc_id) if resolved_return_embedding else None,
+            ))
+        return results
@@ -0,0 +1,138 @@
+"""
+Query Batcher — Micro-batching of concurrent query embeddings.
+Requests for the same model that arrive within a short window (or until the
+batch is full) are embedded in a single forward pass and the vectors are
+fanned back out to the waiting callers. Batch sizes are recorded in a
+histogram so the window and size limits can be tuned.
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = int(os.environ.get("QUERY_BATCH_MAX_SIZE", "32"))
+MAX_WAIT_MS = float(os.environ.get("QUERY_BATCH_MAX_WAIT_MS", "3"))
+
+# Histogram bucket upper bounds for batch sizes
+_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def _bucket(size: int) -> str:
+    for bound in _BUCKETS:
+        if size <= bound:
+            return f"<={bound}"
+    return f">{_BUCKETS[-1]}"
+
+
+class EmbeddingMicroBatcher:
+    """
+    Collects embedding requests on a queue; a single worker thread drains up
+    to max_batch_size of them (waiting at most max_wait_ms after the first)
+    and embeds them together with embed_batch(texts) -> vectors.
+    """
+
+    def __init__(self, embed_batch: Callable[[List[str]], List[List[float]]], name: str = "",
+                 max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS):
+        self.embed_batch = embed_batch
+        self.name = name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._histogram = {_bucket(b): 0 for b in _BUCKETS}
+        self._histogram[f">{_BUCKETS[-1]}"] = 0
+        self._batches = 0
+        self._requests = 0
+        self._wait_ms_total = 0.0
+        self._embed_ms_total = 0.0
+        self._worker = threading.Thread(target=self._loop, name=f"query-batcher-{name}", daemon=True)
+        self._worker.start()
+
+    def embed(self, text: str) -> List[float]:
+        """Embed one query; blocks until its batch has been computed."""
+        return self.submit(text).result()
+
+    def submit(self, item) -> Future:
+        """Queue one item without waiting; callers with several items wait on all futures."""
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            start = time.perf_counter()
+            try:
+                vectors = self.embed_batch([text for text, _, _ in batch])
+                if len(vectors) != len(batch):
+                    raise ValueError(f"expected {len(batch)} embeddings, got {len(vectors)}")
+                for (_, future, _), vector in zip(batch, vectors):
+                    future.set_result(vector)
+            except Exception as e:
+                logger.error(f"Micro-batch failed ({self.name}): {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            embed_ms = (time.perf_counter() - start) * 1000
+            with self._stats_lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._histogram[_bucket(len(batch))] += 1
+                self._wait_ms_total += sum((start - queued) * 1000 for _, _, queued in batch)
+                self._embed_ms_total += embed_ms
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "avg_queue_wait_ms": round(self._wait_ms_total / self._requests, 3) if self._requests else 0.0,
+                "avg_batch_embed_ms": round(self._embed_ms_total / self._batches, 3) if self._batches else 0.0,
+                "batch_size_histogram": dict(self._histogram),
+            }
+
+
+# ═══════════════════════════════════════════════════════════
+#  Public API
+# ═══════════════════════════════════════════════════════════
+
+_batchers: Dict[Hashable, EmbeddingMicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_query_batcher(key: Hashable, embed_batch: Callable[[List[str]], List[List[float]]]) -> EmbeddingMicroBatcher:
+    """Return the batcher shared by every pipeline embedding queries with this model key."""
+    with _batchers_lock:
+        if key not in _batchers:
+            name = "/".join(str(part) for part in key if part) if isinstance(key, tuple) else str(key)
+            _batchers[key] = EmbeddingMicroBatcher(embed_batch, name=name)
+        return _batchers[key]
+
+
+def batching_enabled() -> bool:
+    return MAX_WAIT_MS > 0 and MAX_BATCH_SIZE > 1
+
+
+def get_batching_stats() -> dict:
+    with _batchers_lock:
+        batchers = dict(_batchers)
+    return {b.name: b.stats() for b in batchers.values()}
@@ -0,0 +1,100 @@
+"""
+Query Embedding Cache — Bounded LRU/TTL cache of query vectors.
+Keyed by (embedding model, normalized query text) and shared by every
+pipeline using that model, so popular questions are embedded once. Vectors
+are kept as float32 NumPy arrays rather than Python float lists.
+"""
+import os
+import time
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Hashable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = int(os.environ.get("QUERY_EMBED_CACHE_SIZE", "10000"))
+TTL_SECONDS = float(os.environ.get("QUERY_EMBED_CACHE_TTL_S", "3600"))
+
+
+def normalize_query(text: str) -> str:
+    """Unicode-normalize, trim and collapse whitespace so trivial variants share an entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU of float32 vectors with an optional time-to-live (ttl_seconds <= 0 disables it)."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def get(self, model_key: Hashable, text: str) -> Optional[List[float]]:
+        key = (model_key, normalize_query(text))
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and self.ttl_seconds > 0 and time.time() - item[1] > self.ttl_seconds:
+                self._drop(key)
+                self.expired += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0].tolist()
+
+    def put(self, model_key: Hashable, text: str, vector: List[float]):
+        if self.max_entries <= 0:
+            return
+        key = (model_key, normalize_query(text))
+        array = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (array, time.time())
+            self._bytes += array.nbytes
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: tuple):
+        array, _ = self._entries.pop(key)
+        self._bytes -= array.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "memory_kb": round(self._bytes / 1024, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+_cache = QueryEmbeddingCache()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    return _cache
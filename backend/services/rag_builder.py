@@ -8,7 +8,7 @@ import json
 import logging
 from typing import Dict
 
-from .haystack_service import build_and_deploy_pipeline
+from .haystack_service import build_and_deploy_pipeline, pipeline_metadata
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +17,15 @@ DEPLOY_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "d
 os.makedirs(DEPLOY_DIR, exist_ok=True)
 
 
-def deploy_rag_system(config: dict) -> Dict:
+def deploy_rag_system(config: dict, progress_callback=None) -> Dict:
     """
     Deploys the RAG system based on user configuration.
     Supports 'api', 'offline', and 'hybrid' deployment types.
+    extracted_texts may be any iterable (e.g. a generator); it is consumed once.
     """
     deployment_type = config.get("deploymentType", "api")
-    pipeline_id, pipeline = build_and_deploy_pipeline(config)
+    pipeline_id, pipeline = build_and_deploy_pipeline(config, progress_callback=progress_callback)
+    ingestion = pipeline_metadata.get(pipeline_id, {}).get("ingestion", {})
 
     endpoint = f"http://localhost:8010/api/test-chat"
 
@@ -31,9 +33,12 @@ def deploy_rag_system(config: dict) -> Dict:
         "pipeline_id": pipeline_id,
         "type": config.get("ragType"),
         "db_type": config.get("dbType"),
-        "documents_processed": len(config.get("extracted_texts", [])),
-        "total_characters": sum(len(t) for t in config.get("extracted_texts", [])),
+        "documents_processed": ingestion.get("documents", 0),
+        "total_characters": ingestion.get("characters", 0),
+        "chunks_indexed": ingestion.get("chunks", 0),
+        "index_changes": ingestion.get("index_changes", {}),
         "deployment_type": deployment_type,
+        "ingestion": ingestion,
     }
 
     # ── API deployment ───────────────────────────────────
@@ -0,0 +1,272 @@
+"""
+Rerank Service — Shared, batched, cached cross-encoder scoring.
+Every SharedRanker in the process scores through here: (query, document)
+pairs are looked up in an LRU of pair scores first, and the misses from all
+concurrent requests are micro-batched into single forward passes of the one
+registry model. Request latency is reported to observability separately
+from end-to-end query latency.
+
+In cascade mode the first-stage scores decide how much reranking a request
+gets: none when the retriever has a clear winner, only the uncertain band
+near the top otherwise, and never more than a per-request time budget.
+"""
+import os
+import time
+import hashlib
+import logging
+import dataclasses
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from haystack import Document
+
+from .query_batcher import EmbeddingMicroBatcher
+from .query_embedding_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+PAIR_CACHE_SIZE = int(os.environ.get("RERANK_CACHE_SIZE", "100000"))
+MAX_BATCH_PAIRS = int(os.environ.get("RERANK_BATCH_MAX_PAIRS", "64"))
+MAX_WAIT_MS = float(os.environ.get("RERANK_BATCH_MAX_WAIT_MS", "2"))
+
+# Cascade: top-1/top-2 gap that skips reranking, and the band below the top
+# score that is reranked otherwise, both as a fraction of |top score|
+DEFAULT_CASCADE_MARGIN = 0.3
+DEFAULT_CASCADE_BAND = 0.5
+# Shorter candidate lists are always reranked in full: too few scores to
+# trust a gap, and cheap to score anyway
+MIN_CASCADE_CANDIDATES = 3
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=8).digest()
+
+
+class PairScoreCache:
+    """
+    Thread-safe LRU of cross-encoder scores keyed by (model, query hash,
+    document id, content hash). The content hash keeps a re-indexed chunk
+    that kept its id from being served a stale score.
+    """
+
+    def __init__(self, max_entries: int = PAIR_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, keys: List[tuple]) -> List[Optional[float]]:
+        with self._lock:
+            scores = []
+            for key in keys:
+                score = self._entries.get(key)
+                if score is not None:
+                    self._entries.move_to_end(key)
+                scores.append(score)
+            found = sum(score is not None for score in scores)
+            self.hits += found
+            self.misses += len(keys) - found
+            return scores
+
+    def put_many(self, items: List[Tuple[tuple, float]]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, score in items:
+                self._entries[key] = score
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+# ═══════════════════════════════════════════════════════════
+#  Scoring
+# ═══════════════════════════════════════════════════════════
+
+def _score_pairs(key: Hashable, pairs: List[Tuple[str, str]]) -> List[float]:
+    """One forward pass over a micro-batch of (query, document text) pairs."""
+    from .model_registry import get_model_registry
+    instance = get_model_registry().get(key)
+    if hasattr(instance, "score_pairs"):
+        return instance.score_pairs(pairs)
+
+    # TransformersSimilarityRanker: same tokenization and scaling as its run()
+    import torch
+    features = instance.tokenizer(
+        [[instance.query_prefix + query, instance.document_prefix + text] for query, text in pairs],
+        padding=True, truncation=True, return_tensors="pt",
+    ).to(instance.device.first_device.to_torch())
+    with torch.inference_mode():
+        scores = instance.model(**features).logits.squeeze(dim=1)
+    if instance.scale_score and instance.calibration_factor is not None:
+        scores = torch.sigmoid(scores * instance.calibration_factor)
+    return scores.cpu().tolist()
+
+
+_batchers: Dict[Hashable, EmbeddingMicroBatcher] = {}
+_batchers_lock = threading.Lock()
+_cache = PairScoreCache()
+
+
+def _get_batcher(key: Hashable) -> EmbeddingMicroBatcher:
+    with _batchers_lock:
+        if key not in _batchers:
+            name = "rerank/" + "/".join(str(part) for part in key if part)
+            _batchers[key] = EmbeddingMicroBatcher(lambda pairs: _score_pairs(key, pairs), name=name,
+                                                   max_batch_size=MAX_BATCH_PAIRS, max_wait_ms=MAX_WAIT_MS)
+        return _batchers[key]
+
+
+def _dedupe(documents: List[Document]) -> List[Document]:
+    """Keep one document per id (the highest-scored), as Haystack's rankers do."""
+    best: Dict[str, Document] = {}
+    for doc in documents:
+        kept = best.get(doc.id)
+        if kept is None or (doc.score or float("-inf")) > (kept.score or float("-inf")):
+            best[doc.id] = doc
+    return list(best.values())
+
+
+# Moving average of model time per computed pair, used to estimate time saved
+_pair_ms = 0.0
+
+
+def _score_documents(key: Hashable, query: str, documents: List[Document],
+                     deadline: Optional[float] = None) -> Tuple[List[Optional[float]], int]:
+    """
+    Cross-encoder scores for documents, from the pair cache or the model.
+    Pairs still running at the deadline come back as None (their scores are
+    cached once they finish). Returns (scores, pairs computed by the model).
+    """
+    global _pair_ms
+    start = time.perf_counter()
+    query_hash = _digest(normalize_query(query))
+    keys = [(key, query_hash, doc.id, _digest(doc.content)) for doc in documents]
+    scores = _cache.get_many(keys)
+    missing = [i for i, score in enumerate(scores) if score is None]
+    if not missing:
+        return scores, 0
+
+    pairs = [(query, documents[i].content or "") for i in missing]
+    computed = 0
+    if MAX_WAIT_MS > 0 and MAX_BATCH_PAIRS > 1:
+        batcher = _get_batcher(key)
+        futures: List[Future] = [batcher.submit(pair) for pair in pairs]
+        timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        wait(futures, timeout=timeout)
+        for i, future in zip(missing, futures):
+            if future.done():
+                scores[i] = float(future.result())
+                computed += 1
+            else:
+                future.add_done_callback(
+                    lambda f, k=keys[i]: f.exception() is None and _cache.put_many([(k, float(f.result()))]))
+    else:
+        for offset in range(0, len(missing), MAX_BATCH_PAIRS):
+            if deadline is not None and offset and time.perf_counter() >= deadline:
+                break
+            chunk = missing[offset:offset + MAX_BATCH_PAIRS]
+            for i, score in zip(chunk, _score_pairs(key, pairs[offset:offset + len(chunk)])):
+                scores[i] = float(score)
+                computed += 1
+    _cache.put_many([(keys[i], scores[i]) for i in missing if scores[i] is not None])
+    if computed:
+        per_pair = (time.perf_counter() - start) * 1000 / computed
+        _pair_ms = per_pair if _pair_ms == 0.0 else 0.9 * _pair_ms + 0.1 * per_pair
+    return scores, computed
+
+
+def cascade_depth(documents: List[Document], margin: float = DEFAULT_CASCADE_MARGIN,
+                  band: float = DEFAULT_CASCADE_BAND) -> int:
+    """
+    How many leading candidates (sorted by first-stage score) need the
+    cross-encoder. Gaps are measured relative to the top score's magnitude,
+    so the rule works for BM25, cosine and fused scores alike without
+    stretching near-ties the way normalizing by the list's own spread does:
+    0 when the top-1 leads top-2 by at least margin, else the candidates
+    within band of the top score. Lists shorter than MIN_CASCADE_CANDIDATES
+    are reranked in full.
+    """
+    scores = [doc.score for doc in documents]
+    if len(scores) < MIN_CASCADE_CANDIDATES or any(score is None for score in scores):
+        return len(scores)
+    scale = max(abs(scores[0]), abs(scores[1]))
+    if scale == 0:
+        return len(scores)
+    if (scores[0] - scores[1]) / scale >= margin:
+        return 0
+    return max(2, sum(1 for score in scores if score >= scores[0] - band * scale))
+
+
+def rerank(key: Hashable, query: str, documents: List[Document], top_k: int,
+           cascade: Optional[Tuple[float, float]] = None, budget_ms: Optional[float] = None,
+           pipeline_id: Optional[str] = None) -> List[Document]:
+    """
+    Score documents against query with the registry model `key`; best top_k first.
+    cascade=(margin, band) enables the confidence cascade and budget_ms caps the
+    time spent waiting for the model. Documents left unscored keep their
+    first-stage order and score, after the reranked ones.
+    """
+    from .observability_service import record_rerank_latency, record_rerank_cascade
+    if not documents:
+        return []
+    start = time.perf_counter()
+    documents = _dedupe(documents)
+    if cascade is not None:
+        documents.sort(key=lambda doc: doc.score if doc.score is not None else float("-inf"), reverse=True)
+        depth = cascade_depth(documents, *cascade)
+    else:
+        depth = len(documents)
+    head, tail = documents[:depth], documents[depth:]
+    deadline = start + budget_ms / 1000 if budget_ms else None
+    scores, computed = _score_documents(key, query, head, deadline) if head else ([], 0)
+
+    scored = sorted((i for i, score in enumerate(scores) if score is not None), key=lambda i: -scores[i])
+    unscored = [head[i] for i, score in enumerate(scores) if score is None]
+    ranked = [dataclasses.replace(head[i], score=scores[i]) for i in scored] + unscored + tail
+
+    if cascade is not None or budget_ms:
+        decision = ("skipped" if not head else "budget_cut" if unscored
+                    else "band" if tail else "full")
+        record_rerank_cascade(pipeline_id or "unknown", decision, pairs=len(documents),
+                              avoided=len(tail), saved_ms=len(tail) * _pair_ms)
+    record_rerank_latency((time.perf_counter() - start) * 1000, pairs=len(documents), computed=computed)
+    return ranked[:top_k]
+
+
+# ═══════════════════════════════════════════════════════════
+#  Public API
+# ═══════════════════════════════════════════════════════════
+
+def get_pair_score_cache() -> PairScoreCache:
+    return _cache
+
+
+def get_rerank_stats() -> dict:
+    with _batchers_lock:
+        batchers = dict(_batchers)
+    return {
+        "pair_cache": _cache.stats(),
+        "batching": {b.name: b.stats() for b in batchers.values()},
+    }
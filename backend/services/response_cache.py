@@ -0,0 +1,122 @@
+"""
+Response Cache — Exact-match cache of query_pipeline answers.
+Keyed by (pipeline id, normalized query, variant, data version), so repeated
+questions from dashboards and health probes skip the pipeline entirely.
+Every pipeline belongs to a data scope (the collections it reads); a deploy
+that changes a scope bumps the data version of all its pipelines, which
+makes their older entries unreachable, and stopping a pipeline drops its
+entries. Bounded by RESPONSE_CACHE_SIZE entries and RESPONSE_CACHE_TTL_S.
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .query_embedding_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_SIZE", "5000"))
+TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_S", "300"))
+
+
+class ResponseCache:
+    """Thread-safe LRU of answer dicts with a time-to-live (ttl_seconds <= 0 disables it)."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # pipeline_id -> (scope, data version)
+        self._pipelines: Dict[str, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    # ── Pipelines and data versions ──────────────────────
+    def register(self, pipeline_id: str, scope: str):
+        with self._lock:
+            _, version = self._pipelines.get(pipeline_id, (scope, 0))
+            self._pipelines[pipeline_id] = (scope, version + 1)
+
+    def invalidate_scope(self, scope: str) -> int:
+        """New data version for every pipeline reading scope; returns how many."""
+        with self._lock:
+            pipelines = [pid for pid, (s, _) in self._pipelines.items() if s == scope]
+            for pipeline_id in pipelines:
+                self._pipelines[pipeline_id] = (scope, self._pipelines[pipeline_id][1] + 1)
+            return len(pipelines)
+
+    def forget(self, pipeline_id: str):
+        """Drop a stopped pipeline and its entries."""
+        with self._lock:
+            self._pipelines.pop(pipeline_id, None)
+            for key in [key for key in self._entries if key[0] == pipeline_id]:
+                del self._entries[key]
+
+    def _key(self, pipeline_id: str, query: str, variant: str) -> Optional[tuple]:
+        registered = self._pipelines.get(pipeline_id)
+        if registered is None:
+            return None
+        return pipeline_id, normalize_query(query), variant, registered[1]
+
+    # ── Entries ──────────────────────────────────────────
+    def get(self, pipeline_id: str, query: str, variant: str = "") -> Optional[dict]:
+        with self._lock:
+            key = self._key(pipeline_id, query, variant)
+            if key is None:
+                return None
+            item = self._entries.get(key)
+            if item is not None and self.ttl_seconds > 0 and time.time() - item[1] > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, pipeline_id: str, query: str, answer: dict, variant: str = ""):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            key = self._key(pipeline_id, query, variant)
+            if key is None:
+                return
+            self._entries[key] = (answer, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "pipelines": len(self._pipelines),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+_cache = ResponseCache()
+
+
+def get_response_cache() -> ResponseCache:
+    return _cache
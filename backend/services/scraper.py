@@ -9,6 +9,8 @@ from urllib.parse import urljoin, urlparse
 import re
 import logging
 
+from .source_metadata import format_source
+
 logger = logging.getLogger(__name__)
 
 
@@ -223,7 +225,8 @@ def _extract_text_from_html(html: str, url: str) -> str:
         text = content.get_text(separator='\n', strip=True)
         text = re.sub(r'\n{3,}', '\n\n', text)  # collapse multiple newlines
         text = re.sub(r'[ \t]+', ' ', text)  # collapse whitespace
-        return f"Source: {url}\n{text}"
+        title = soup.title.get_text(strip=True) if soup.title else None
+        return format_source(url, text, title=title)
     else:
         return f"Source: {url}\nNo content found."
 
@@ -0,0 +1,214 @@
+"""
+Semantic Cache — Per-pipeline cache of answers to similar questions.
+query_pipeline embeds the incoming question and looks for a recent question
+to the same pipeline whose embedding is at least `threshold` cosine-similar;
+its answer is returned without retrieval or generation. Entries expire after
+a TTL, the least recently used are evicted first, and a redeploy that
+changes a collection clears the cache of every pipeline reading it.
+Enabled per pipeline with dynamicConfig.semanticCache.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .client_pool import credential_fingerprint
+from .query_embedding_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = int(os.environ.get("SEMANTIC_CACHE_SIZE", "1000"))
+TTL_SECONDS = float(os.environ.get("SEMANTIC_CACHE_TTL_S", "3600"))
+DEFAULT_THRESHOLD = 0.93
+
+# Answers depend on more than the question (chat history, audio)
+UNCACHED_RAG_TYPES = ("conversational", "voice")
+
+
+class SemanticAnswerCache:
+    """
+    Thread-safe LRU of (question embedding, answer) pairs with a TTL.
+
+    Entries are grouped by variant (LLM override, filters...), which must
+    match exactly; within a variant the nearest question wins if it clears
+    the threshold. Questions are embedded by the pipeline's own query
+    embedder, so vectors of one cache always share a model.
+    """
+
+    def __init__(self, scope: str, threshold: float = DEFAULT_THRESHOLD,
+                 max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS):
+        self.scope = scope
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        # variant -> (keys, stacked vectors), rebuilt after that variant changes
+        self._matrices: Dict[str, Tuple[List[Tuple[str, str]], np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.embedder = None  # fallback for pipelines without a query embedder
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.invalidations = 0
+        self.saved_ms = 0.0
+        # Moving average of full (uncached) query time, the latency a hit saves
+        self.miss_ms = 0.0
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created > self.ttl_seconds
+
+    def _drop(self, key: Tuple[str, str]):
+        del self._entries[key]
+        self._matrices.pop(key[0], None)
+
+    def _matrix(self, variant: str) -> Tuple[List[Tuple[str, str]], np.ndarray]:
+        if variant not in self._matrices:
+            keys = [key for key in self._entries if key[0] == variant]
+            vectors = np.stack([self._entries[key][0] for key in keys]) if keys else None
+            self._matrices[variant] = (keys, vectors)
+        return self._matrices[variant]
+
+    def lookup(self, query: str, vector: List[float], variant: str = "") -> Optional[Tuple[dict, float]]:
+        """(answer, similarity) of the closest cached question, or None."""
+        query_vector = _normalized(vector)
+        with self._lock:
+            key = (variant, normalize_query(query))
+            if key not in self._entries:
+                keys, vectors = self._matrix(variant)
+                if keys:
+                    similarities = vectors @ query_vector
+                    best = int(np.argmax(similarities))
+                    key = keys[best] if similarities[best] >= self.threshold else None
+                else:
+                    key = None
+            if key is not None and self._expired(self._entries[key][2]):
+                self._drop(key)
+                self.expired += 1
+                key = None
+            if key is None:
+                self.misses += 1
+                return None
+            cached_vector, answer, _ = self._entries[key]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer, float(cached_vector @ query_vector)
+
+    def put(self, query: str, vector: List[float], answer: dict, variant: str = "", latency_ms: float = 0.0):
+        if latency_ms:
+            self.miss_ms = latency_ms if self.miss_ms == 0.0 else 0.9 * self.miss_ms + 0.1 * latency_ms
+        if self.max_entries <= 0:
+            return
+        key = (variant, normalize_query(query))
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (_normalized(vector), answer, time.time())
+            self._matrices.pop(variant, None)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def record_saved(self, lookup_ms: float):
+        self.saved_ms += max(0.0, self.miss_ms - lookup_ms)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "scope": self.scope,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "avg_miss_ms": round(self.miss_ms, 1),
+                "est_saved_ms": round(self.saved_ms, 1),
+            }
+
+
+def _normalized(vector: List[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    return array / max(float(np.linalg.norm(array)), 1e-12)
+
+
+# ═══════════════════════════════════════════════════════════
+#  Registry
+# ═══════════════════════════════════════════════════════════
+
+_caches: Dict[str, SemanticAnswerCache] = {}
+_caches_lock = threading.Lock()
+
+
+def configure_semantic_cache(pipeline_id: str, scope: str, rag_type: str,
+                             dynamic_cfg: Dict[str, Any]) -> Optional[SemanticAnswerCache]:
+    """Create (or drop) the cache of a pipeline being registered, from its dynamicConfig."""
+    with _caches_lock:
+        _caches.pop(pipeline_id, None)
+        if not dynamic_cfg.get("semanticCache", False) or rag_type in UNCACHED_RAG_TYPES:
+            return None
+        cache = SemanticAnswerCache(
+            scope,
+            threshold=float(dynamic_cfg.get("semanticCacheThreshold", DEFAULT_THRESHOLD)),
+            max_entries=int(dynamic_cfg.get("semanticCacheSize", MAX_ENTRIES)),
+            ttl_seconds=float(dynamic_cfg.get("semanticCacheTtlS", TTL_SECONDS)),
+        )
+        _caches[pipeline_id] = cache
+        return cache
+
+
+def get_semantic_cache(pipeline_id: str) -> Optional[SemanticAnswerCache]:
+    return _caches.get(pipeline_id)
+
+
+def drop_semantic_cache(pipeline_id: str):
+    with _caches_lock:
+        _caches.pop(pipeline_id, None)
+
+
+def invalidate_scope(scope: str) -> int:
+    """Clear the caches of every pipeline answering from scope; returns how many."""
+    with _caches_lock:
+        caches = [cache for cache in _caches.values() if cache.scope == scope]
+    for cache in caches:
+        cache.clear()
+    if caches:
+        logger.info(f"Semantic cache cleared for {len(caches)} pipeline(s) on '{scope}'")
+    return len(caches)
+
+
+def cache_variant(llm_override: Optional[dict], filters: Optional[dict]) -> str:
+    """
+    Everything besides the question that changes the answer: the override
+    LLM's model, endpoint and credential (as a fingerprint, never the key
+    itself), and the filters. Used by both the exact and the semantic cache.
+    """
+    llm = llm_override or {}
+    return json.dumps({
+        "llm": llm.get("model"),
+        "base_url": llm.get("base_url"),
+        "credential": credential_fingerprint(llm.get("api_key")),
+        "filters": filters,
+    }, sort_keys=True, default=str)
+
+
+def get_semantic_cache_stats() -> dict:
+    with _caches_lock:
+        caches = dict(_caches)
+    return {pipeline_id: cache.stats() for pipeline_id, cache in caches.items()}
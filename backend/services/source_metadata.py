@@ -0,0 +1,81 @@
+"""
+Source Metadata — Structured metadata carried alongside raw source texts.
+Raw texts travel through scraping, uploads, the corpus store and ingestion
+jobs as plain strings headed by a "Source: <url or filename>" line. Extra
+fields (page title, fetch or upload time...) ride along on an optional
+"Meta: {json}" line right after it, which ingestion strips from the content
+and turns, together with fields derived from the source itself, into chunk
+metadata.
+"""
+import os
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+SOURCE_PREFIX = "Source:"
+META_PREFIX = "Meta:"
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def format_source(source: str, text: str, **meta) -> str:
+    """Head text with its source line and, if given, a metadata line."""
+    header = f"{SOURCE_PREFIX} {source}\n"
+    fields = {k: v for k, v in meta.items() if v not in (None, "")}
+    if fields:
+        header += f"{META_PREFIX} {json.dumps(fields, ensure_ascii=False, default=str)}\n"
+    return header + text
+
+
+def parse_source(text: str) -> Tuple[Optional[str], dict, str]:
+    """
+    Split a raw text into (source, metadata, content). The content keeps the
+    source line (it is part of what gets embedded and cited) but not the
+    metadata line. Texts without a source line come back unchanged.
+    """
+    first, _, rest = text.partition("\n")
+    if not first.strip().startswith(SOURCE_PREFIX):
+        return None, {}, text
+    source = first.strip()[len(SOURCE_PREFIX):].strip() or None
+    meta = {}
+    second, _, body = rest.partition("\n")
+    if second.startswith(META_PREFIX):
+        try:
+            meta = json.loads(second[len(META_PREFIX):])
+            rest = body
+        except ValueError:
+            logger.warning(f"Ignoring malformed metadata line for source {source}")
+    return source, meta if isinstance(meta, dict) else {}, f"{first}\n{rest}"
+
+
+def source_fields(source: Optional[str]) -> dict:
+    """
+    Fields derived from the source name. URLs give domain, path and section
+    (first path segment, so "/pricing/enterprise" is in section "/pricing");
+    anything else is treated as a file name.
+    """
+    if not source:
+        return {}
+    parsed = urlparse(source)
+    if parsed.scheme in ("http", "https") and parsed.netloc:
+        path = parsed.path.rstrip("/") or "/"
+        segments = [part for part in path.split("/") if part]
+        return {
+            "source_type": "url",
+            "domain": parsed.netloc.lower(),
+            "path": path,
+            "section": f"/{segments[0]}" if segments else "/",
+        }
+    filename = os.path.basename(source)
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    return {
+        "source_type": "file",
+        "filename": filename,
+        **({"file_type": extension} if extension else {}),
+    }
@@ -20,6 +20,9 @@ TUNING_PRESETS = {
         "useReranker": False,
         "splitOverlapRatio": 0.05,
         "maxTokens": 512,
+        "faissEfSearch": 16,
+        "chromaEfSearch": 16,
+        "faissNprobe": 4,
     },
     "balanced": {
         "label": "⚖️ Balanced",
@@ -29,6 +32,9 @@ TUNING_PRESETS = {
         "useReranker": False,
         "splitOverlapRatio": 0.1,
         "maxTokens": 1024,
+        "faissEfSearch": 64,
+        "chromaEfSearch": 64,
+        "faissNprobe": 16,
     },
     "high_accuracy": {
         "label": "🎯 High Accuracy",
@@ -38,6 +44,11 @@ TUNING_PRESETS = {
         "useReranker": True,
         "splitOverlapRatio": 0.15,
         "maxTokens": 2048,
+        "faissEfSearch": 128,
+        "chromaEfSearch": 128,
+        "faissNprobe": 48,
+        "rerankCascade": True,
+        "rerankBudgetMs": 250,
     },
     "deep_analysis": {
         "label": "🔬 Deep Analysis",
@@ -47,9 +58,18 @@ TUNING_PRESETS = {
         "useReranker": True,
         "splitOverlapRatio": 0.2,
         "maxTokens": 4096,
+        "faissEfSearch": 256,
+        "chromaEfSearch": 256,
+        "faissNprobe": 96,
     },
 }
 
+# Preset keys applied to dynamicConfig (recall vs latency of search and reranking).
+# vectorQuantization is left to explicit configuration: it swaps the store, which only suits
+# the in-process embedding store. semanticCache is opt-in per RAG: it answers near-duplicate
+# questions with one stored answer
+PRESET_DYNAMIC_KEYS = ("faissEfSearch", "faissNprobe", "chromaEfSearch", "rerankCascade", "rerankBudgetMs")
+
 # ═══════════════════════════════════════════════════════════
 #  Per-RAG-Type Default Configs
 # ═══════════════════════════════════════════════════════════
@@ -153,7 +173,10 @@ RAG_TYPE_DEFAULTS = {
 def apply_tuning_preset(config: dict) -> dict:
     """
     Apply a tuning preset to the configuration if one is specified.
-    Simple mode overrides chunkSize, topK, useReranker with preset values.
+    Simple mode overrides chunkSize, topK, useReranker with preset values and
+    fills in the dynamicConfig search and rerank knobs (faissEfSearch,
+    faissNprobe, chromaEfSearch, rerankCascade, rerankBudgetMs) unless they
+    are set explicitly.
     Expert mode (no preset) uses raw values from the frontend.
     """
     preset_name = config.get("tuningPreset")
@@ -165,6 +188,12 @@ def apply_tuning_preset(config: dict) -> dict:
     updated["chunkSize"] = preset["chunkSize"]
     updated["topK"] = preset["topK"]
     updated["useReranker"] = preset["useReranker"]
+    # Explicit dynamicConfig choices win over the preset
+    dynamic_cfg = dict(updated.get("dynamicConfig") or {})
+    for key in PRESET_DYNAMIC_KEYS:
+        if preset.get(key):
+            dynamic_cfg.setdefault(key, preset[key])
+    updated["dynamicConfig"] = dynamic_cfg
 
     logger.info(f"Applied tuning preset '{preset_name}': chunk={preset['chunkSize']}, topK={preset['topK']}, reranker={preset['useReranker']}")
     return updated
@@ -184,6 +213,11 @@ def list_presets() -> dict:
             "chunkSize": p["chunkSize"],
             "topK": p["topK"],
             "useReranker": p["useReranker"],
+            "faissEfSearch": p.get("faissEfSearch"),
+            "faissNprobe": p.get("faissNprobe"),
+            "chromaEfSearch": p.get("chromaEfSearch"),
+            "rerankCascade": p.get("rerankCascade", False),
+            "rerankBudgetMs": p.get("rerankBudgetMs"),
         }
         for name, p in TUNING_PRESETS.items()
     }
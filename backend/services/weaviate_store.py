@@ -0,0 +1,59 @@
+"""
+Weaviate Store — WeaviateDocumentStore on a pooled WeaviateClient.
+Stores on the same Weaviate URL and credentials share one connected client
+(HTTP keep-alive and gRPC channel) instead of each connecting on their own.
+"""
+import logging
+import threading
+
+from haystack_integrations.document_stores.weaviate import WeaviateDocumentStore
+
+from .client_pool import get_client_pool
+
+logger = logging.getLogger(__name__)
+
+
+class PooledWeaviateDocumentStore(WeaviateDocumentStore):
+    """WeaviateDocumentStore that checks its client out of the shared pool before each operation."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._collection_ready = False
+        self._setup_lock = threading.Lock()
+
+    def _connect(self):
+        # The parent property builds, connects and caches a new client when none is cached
+        self._client = None
+        return WeaviateDocumentStore.client.fget(self)
+
+    @property
+    def client(self):
+        auth = self._auth_client_secret.resolve_value() if self._auth_client_secret else None
+        client = get_client_pool().checkout(
+            "weaviate", self._url or "embedded", (auth, sorted(self._connection_headers().items())),
+            create=self._connect,
+            health_check=lambda c: c.is_ready(),
+            close=lambda c: c.close(),
+        )
+        if client is not self._client:
+            self._client = client
+            self._collection = None
+        if not self._collection_ready:
+            with self._setup_lock:
+                if not self._collection_ready:
+                    if not client.collections.exists(self._collection_settings["class"]):
+                        client.collections.create_from_dict(self._collection_settings)
+                    self._collection_ready = True
+        return client
+
+    @property
+    def collection(self):
+        client = self.client
+        if self._collection is None:
+            self._collection = client.collections.get(self._collection_settings["class"])
+        return self._collection
+
+    def close(self) -> None:
+        """Drop the references; the pooled client stays open for other stores."""
+        self._client = None
+        self._collection = None
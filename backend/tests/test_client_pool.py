@@ -0,0 +1,86 @@
+"""Client reuse, health-check rebuilds and credential separation, on Qdrant local mode."""
+import pytest
+from haystack import Document
+
+qdrant_client = pytest.importorskip("qdrant_client")
+pytest.importorskip("haystack_integrations.document_stores.qdrant")
+
+from services import qdrant_store
+from services.client_pool import ClientPool, credential_fingerprint
+from services.qdrant_store import PooledQdrantDocumentStore
+
+DIM = 4
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ClientPool(health_check_s=3600)
+    monkeypatch.setattr(qdrant_store, "get_client_pool", lambda: pool)
+    yield pool
+    pool.close_all()
+
+
+def _store(index: str, **kwargs) -> PooledQdrantDocumentStore:
+    return PooledQdrantDocumentStore(location=":memory:", index=index, embedding_dim=DIM, **kwargs)
+
+
+def _documents(n: int, prefix: str) -> list:
+    return [Document(id=f"{prefix}{i}", content=f"{prefix} {i}", embedding=[float(i + 1)] * DIM) for i in range(n)]
+
+
+def _checkout(pool: ClientPool, credential=None):
+    return pool.checkout("qdrant", ":memory:", credential,
+                         create=lambda: qdrant_client.QdrantClient(location=":memory:"),
+                         health_check=lambda client: client.get_collections(),
+                         close=lambda client: client.close())
+
+
+def test_stores_on_one_endpoint_share_a_client(pool):
+    first, second = _store("first"), _store("second")
+    first.write_documents(_documents(3, "a"))
+    second.write_documents(_documents(2, "b"))
+
+    assert first._client is second._client
+    assert {c.name for c in first._client.get_collections().collections} == {"first", "second"}
+    assert (first.count_documents(), second.count_documents()) == (3, 2)
+    [entry] = pool.stats()["clients"]
+    assert entry["open"] and entry["rebuilds"] == 0
+    assert entry["checkouts"] >= 4  # every operation checks the client out
+
+
+def test_failed_health_check_rebuilds_the_client(pool):
+    client = _checkout(pool)
+    assert _checkout(pool) is client
+
+    client.close()
+    pool.health_check_s = 0
+    rebuilt = _checkout(pool)
+
+    assert rebuilt is not client
+    assert rebuilt.get_collections().collections == []
+    [entry] = pool.stats()["clients"]
+    assert entry["rebuilds"] == 1 and entry["failed_health_checks"] == 1
+
+    # A healthy client is checked and kept
+    assert _checkout(pool) is rebuilt
+    assert pool.stats()["clients"][0]["rebuilds"] == 1
+
+
+def test_clients_are_keyed_by_credential(pool):
+    first, second = _checkout(pool, "key-a"), _checkout(pool, "key-b")
+
+    assert first is not second
+    assert _checkout(pool, "key-a") is first
+    fingerprints = {entry["credential"] for entry in pool.stats()["clients"]}
+    assert fingerprints == {credential_fingerprint("key-a"), credential_fingerprint("key-b")}
+    assert "key-a" not in str(pool.stats())
+
+
+def test_close_all_closes_pooled_clients(pool):
+    client = _checkout(pool)
+    pool.close_all()
+
+    with pytest.raises(RuntimeError):
+        client.get_collections()
+    assert pool.stats()["clients"] == []
+    assert _checkout(pool) is not client
@@ -0,0 +1,83 @@
+"""Deletes and overwrites on every FAISS index type, in memory and after a reload."""
+import numpy as np
+import pytest
+from haystack import Document
+from haystack.document_stores.types import DuplicatePolicy
+
+from services.faiss_store import INDEX_TYPES, MAX_TOMBSTONE_RATIO, TunedFAISSDocumentStore
+
+DIM = 32
+COUNT = 3000
+# Small PQ codebooks keep training fast
+SPECS = [*INDEX_TYPES[:3], {"type": "ivf_pq", "nbits": 6}, {"type": "ivf_pq", "nbits": 6, "refine": True}]
+
+
+def _vectors(n: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _documents(vectors: np.ndarray, prefix: str = "d") -> list:
+    return [Document(id=f"{prefix}{i}", content=f"doc {i}", embedding=v.tolist()) for i, v in enumerate(vectors)]
+
+
+def _deployed(spec, index_path=None):
+    store = TunedFAISSDocumentStore(index_path=index_path, spec=spec, nprobe=64)
+    vectors = _vectors(COUNT)
+    store.write_documents(_documents(vectors), policy=DuplicatePolicy.OVERWRITE)
+    store.commit_index()
+    return store, vectors
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=str)
+def test_delete_after_commit(spec):
+    store, vectors = _deployed(spec)
+    deleted = [f"d{i}" for i in range(100)]
+    store.delete_documents(deleted)
+
+    assert store.count_documents() == COUNT - 100
+    assert store._tombstones == 100
+    for i in (0, 50, 99):
+        assert not {doc.id for doc in store.search(vectors[i].tolist(), top_k=10)} & set(deleted)
+    hits = store.search(vectors[500].tolist(), top_k=10)
+    assert len(hits) == 10 and hits[0].id == "d500"
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=str)
+def test_overwrite_after_commit(spec):
+    store, vectors = _deployed(spec)
+    replacement = _vectors(100, seed=1)
+    store.write_documents([Document(id=f"d{i}", content="new", embedding=replacement[i].tolist())
+                           for i in range(100)], policy=DuplicatePolicy.OVERWRITE)
+
+    assert store.count_documents() == COUNT
+    hits = store.search(replacement[7].tolist(), top_k=5)
+    assert hits[0].id == "d7" and hits[0].content == "new"
+    assert len({doc.id for doc in hits}) == len(hits)
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=str)
+def test_commit_compacts_deleted_vectors(spec):
+    store, vectors = _deployed(spec)
+    dead = int(COUNT * MAX_TOMBSTONE_RATIO) + 100
+    store.delete_documents([f"d{i}" for i in range(dead)])
+    store.commit_index()
+
+    assert store.index.ntotal == COUNT - dead
+    assert store._tombstones == 0
+    hits = store.search(vectors[COUNT - 1].tolist(), top_k=10)
+    assert len(hits) == 10 and hits[0].id == f"d{COUNT - 1}"
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=str)
+def test_tombstones_survive_reload(spec, tmp_path):
+    index_path = str(tmp_path / "store")
+    store, vectors = _deployed(spec, index_path)
+    store.delete_documents([f"d{i}" for i in range(100)])
+    store.commit_index()  # below the compaction ratio: deleted vectors stay in the index
+
+    reloaded = TunedFAISSDocumentStore(index_path=index_path, spec=spec, nprobe=64)
+    assert reloaded._tombstones == 100
+    # Every document near a deleted one must still fill the top_k
+    for i in range(0, 100, 10):
+        assert len(reloaded.search(vectors[i].tolist(), top_k=10)) == 10
@@ -0,0 +1,38 @@
+"""Cascade depth on tied, small and clear-winner candidate lists."""
+from haystack import Document
+
+from services.rerank_service import MIN_CASCADE_CANDIDATES, cascade_depth
+
+
+def _candidates(*scores):
+    return [Document(id=str(i), content=str(i), score=score) for i, score in enumerate(scores)]
+
+
+def test_near_ties_are_reranked():
+    assert cascade_depth(_candidates(0.501, 0.5, 0.499)) == 3
+    assert cascade_depth(_candidates(0.82, 0.80, 0.79)) == 3
+    assert cascade_depth(_candidates(7.0, 7.0, 7.0, 7.0)) == 4
+
+
+def test_small_lists_are_reranked_in_full():
+    assert MIN_CASCADE_CANDIDATES > 2
+    assert cascade_depth(_candidates(0.501, 0.5)) == 2
+    assert cascade_depth(_candidates(0.9, 0.1)) == 2
+    assert cascade_depth(_candidates(0.9)) == 1
+    assert cascade_depth([]) == 0
+
+
+def test_clear_winner_skips_reranking():
+    assert cascade_depth(_candidates(14.2, 6.1, 5.9, 5.0)) == 0  # BM25
+    assert cascade_depth(_candidates(0.91, 0.42, 0.40)) == 0  # cosine
+    assert cascade_depth(_candidates(0.0328, 0.0161, 0.0159)) == 0  # reciprocal rank fusion
+
+
+def test_band_keeps_candidates_near_the_top():
+    assert cascade_depth(_candidates(0.8, 0.7, 0.65, 0.3, 0.1)) == 3
+    assert cascade_depth(_candidates(0.8, 0.7, 0.65, 0.3, 0.1), band=0.05) == 2
+
+
+def test_missing_or_zero_scores_rerank_everything():
+    assert cascade_depth(_candidates(0.9, None, 0.1)) == 3
+    assert cascade_depth(_candidates(0.0, 0.0, 0.0)) == 3